@@ -2,37 +2,20 @@
 Script to add remaining 61 clauses (106-166) to complete all 166 SMK3 audit clauses
 """
 
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-import uuid
-from datetime import datetime, timezone
+import logging
+from typing import Dict
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from seeding import SeedDiff, criteria_ids_by_order, run_cli, seed_clauses
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-async def add_remaining_clauses():
+async def add_remaining_clauses(db, dry_run: bool = False) -> Dict[str, SeedDiff]:
     """Add remaining 61 clauses (106-166)"""
     
-    # Get all criteria
-    criteria_list = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    
-    if not criteria_list:
-        print("ERROR: No criteria found!")
-        return
-    
     # Map criteria by order
-    criteria_map = {c['order']: c['id'] for c in criteria_list}
+    criteria_map = await criteria_ids_by_order(db)
     
-    print(f"Found {len(criteria_list)} criteria")
-    print(f"Current clauses count: {await db.clauses.count_documents({})}")
-    print("Adding remaining 61 clauses (106-166)...")
+    if not criteria_map:
+        logging.error("No criteria found, seed criteria first")
+        return {}
     
     # REMAINING 61 CLAUSES (106-166)
     remaining_clauses = [
@@ -476,15 +459,13 @@ async def add_remaining_clauses():
         },
     ]
     
-    print(f"Total remaining clauses to insert: {len(remaining_clauses)}")
-    
-    # Insert all remaining clauses
-    inserted_count = 0
+    # Upsert semua clauses dalam satu bulk_write (keyed on clause_number)
+    clause_records = []
     for clause_data in remaining_clauses:
         criteria_id = criteria_map.get(clause_data['criteria_order'])
         
         if not criteria_id:
-            print(f"Warning: No criteria found for order {clause_data['criteria_order']}")
+            logging.warning(f"No criteria found for order {clause_data['criteria_order']}")
             continue
         
         # Create knowledge base from description and catatan
@@ -505,33 +486,16 @@ CATATAN KHUSUS:
 Ini adalah persyaratan spesifik untuk PLN Nusantara Power (sebelumnya PJB) PLTU Tenayan. Pastikan semua dokumen mengacu pada struktur organisasi dan prosedur PLN Nusantara Power yang terbaru.
 """
         
-        clause_doc = {
-            "id": str(uuid.uuid4()),
+        clause_records.append({
             "criteria_id": criteria_id,
             "clause_number": clause_data['clause_number'],
             "title": clause_data['title'],
             "description": clause_data['description'],
-            "knowledge_base": knowledge_base.strip(),
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        await db.clauses.insert_one(clause_doc)
-        inserted_count += 1
-        
-        if inserted_count % 10 == 0:
-            print(f"  Inserted {inserted_count} clauses...")
-    
-    total_clauses = await db.clauses.count_documents({})
-    print(f"\n✅ Successfully inserted {inserted_count} remaining clauses!")
-    print(f"Total criteria: {await db.criteria.count_documents({})}")
-    print(f"TOTAL CLAUSES NOW: {total_clauses}")
+            "knowledge_base": knowledge_base.strip()
+        })
     
-    # Show distribution by criteria
-    print("\n📊 Distribution by criteria:")
-    for c in criteria_list:
-        count = await db.clauses.count_documents({'criteria_id': c['id']})
-        print(f"  Kriteria {c['order']}: {count} klausul - {c['name']}")
+    diff = await seed_clauses(db, clause_records, dry_run)
+    return {"Clauses": diff}
 
 if __name__ == "__main__":
-    asyncio.run(add_remaining_clauses())
-    client.close()
+    run_cli(add_remaining_clauses, "Add remaining 61 SMK3 clauses (106-166)")
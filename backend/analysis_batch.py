@@ -0,0 +1,233 @@
+"""
+Batch analisis AI untuk banyak klausul sekaligus.
+
+Satu batch berisi daftar klausul yang dianalisis paralel dengan batas
+parallelism, retry dengan exponential backoff, dan jeda bersama ketika provider
+LLM membalas rate limit. Progress setiap klausul disimpan di koleksi
+`analysis_batches` sehingga frontend cukup mem-poll endpoint status.
+
+Batch dijalankan sebagai job `analysis_batch` di JobQueue (lihat jobs.py).
+Jika proses mati di tengah batch, job-nya diambil ulang setelah lease habis
+dan klausul yang sudah selesai tidak dianalisis lagi. Batch yang job-nya sudah
+berakhir tanpa menyelesaikan batch ditandai gagal oleh recover_orphaned.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from jobs import TERMINAL_STATUSES, JobCancelledError, JobContext, JobQueue
+
+RATE_LIMIT_MARKERS = ("429", "rate limit", "ratelimit", "quota", "resource_exhausted", "too many requests")
+FINISHED_ITEM_STATUSES = ("completed", "failed", "skipped")
+BATCH_JOB_TYPE = "analysis_batch"
+
+
+def is_rate_limit_error(message: str) -> bool:
+    message = message.lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AnalysisBatchRunner:
+    """Menyimpan batch dan menjalankannya lewat job queue"""
+
+    def __init__(
+        self,
+        db,
+        job_queue: JobQueue,
+        analyze: Callable[..., Awaitable[Any]],
+        max_retries: int = 3,
+        retry_base_delay: float = 2.0,
+        rate_limit_cooldown: float = 30.0
+    ):
+        self.db = db
+        self.job_queue = job_queue
+        self.analyze = analyze
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.rate_limit_cooldown = rate_limit_cooldown
+        # Dipakai bersama semua batch di proses ini: satu 429 menahan semua request berikutnya
+        self._rate_limited_until = 0.0
+
+    async def submit(
+        self,
+        clauses: List[dict],
+        created_by: str,
+        parallelism: int,
+        force_refresh: bool = False
+    ) -> Dict[str, Any]:
+        """Simpan batch baru lalu antrekan job-nya; `clauses` berisi id dan clause_number"""
+        batch = {
+            "id": str(uuid.uuid4()),
+            "job_id": None,
+            "status": "queued",
+            "parallelism": parallelism,
+            "force_refresh": force_refresh,
+            "total": len(clauses),
+            "completed_count": 0,
+            "failed_count": 0,
+            "skipped_count": 0,
+            "items": [
+                {
+                    "clause_id": clause['id'],
+                    "clause_number": clause.get('clause_number'),
+                    "status": "pending",
+                    "attempts": 0,
+                    "error": None,
+                    "score": None,
+                    "result_status": None,
+                    "finished_at": None
+                }
+                for clause in clauses
+            ],
+            "created_by": created_by,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None
+        }
+        await self.db.analysis_batches.insert_one(dict(batch))
+
+        job = await self.job_queue.submit(BATCH_JOB_TYPE, {"batch_id": batch["id"]}, created_by)
+        await self.db.analysis_batches.update_one({"id": batch["id"]}, {"$set": {"job_id": job["id"]}})
+        batch["job_id"] = job["id"]
+        return batch
+
+    async def run_job(self, job: JobContext) -> Dict[str, Any]:
+        """Handler job: jalankan (atau lanjutkan) klausul batch yang belum selesai"""
+        batch_id = job.params["batch_id"]
+        batch = await self.db.analysis_batches.find_one({"id": batch_id}, {"_id": 0})
+        if batch is None:
+            raise HTTPException(status_code=404, detail="Analysis batch not found")
+
+        pending = [item["clause_id"] for item in batch["items"] if item["status"] not in FINISHED_ITEM_STATUSES]
+        await self.db.analysis_batches.update_one(
+            {"id": batch_id},
+            {"$set": {"status": "running", "started_at": batch.get("started_at") or _now()}}
+        )
+        finished = batch["total"] - len(pending)
+        await job.progress(finished, batch["total"])
+
+        async def run_item(clause_id: str) -> None:
+            nonlocal finished
+            await self._run_item(batch_id, clause_id, batch["created_by"], semaphore, batch["force_refresh"])
+            finished += 1
+            await job.progress(finished, batch["total"])
+
+        semaphore = asyncio.Semaphore(batch["parallelism"])
+        tasks = [asyncio.create_task(run_item(clause_id)) for clause_id in pending]
+        try:
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # gather tidak menghentikan klausul lain saat satu task gagal / job dibatalkan
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            status = "completed"
+        except (asyncio.CancelledError, JobCancelledError):
+            # Dibatalkan pengguna, atau proses berhenti (job diambil ulang dan batch dilanjutkan)
+            current = await self.job_queue.get(job.job_id)
+            if current and current.get("cancel_requested"):
+                await self._finish_batch(batch_id, "cancelled")
+            raise
+        except Exception as e:
+            logging.error(f"Analysis batch {batch_id} crashed: {str(e)}")
+            status = "failed"
+        await self._finish_batch(batch_id, status)
+        return {"data": {"batch_id": batch_id, "status": status}}
+
+    async def _finish_batch(self, batch_id: str, status: str, error: Optional[str] = None) -> None:
+        fields = {"status": status, "finished_at": _now()}
+        if error:
+            fields["error"] = error
+        await self.db.analysis_batches.update_one({"id": batch_id}, {"$set": fields})
+
+    async def recover_orphaned(self) -> int:
+        """Tandai gagal batch yang masih queued/running tetapi job-nya sudah berakhir atau tidak ada"""
+        recovered = 0
+        async for batch in self.db.analysis_batches.find(
+            {"status": {"$in": ["queued", "running"]}},
+            {"_id": 0, "id": 1, "job_id": 1}
+        ):
+            job = await self.job_queue.get(batch["job_id"]) if batch.get("job_id") else None
+            if job is not None and job["status"] not in TERMINAL_STATUSES:
+                continue
+            if job is not None and job["status"] == "cancelled":
+                await self._finish_batch(batch["id"], "cancelled")
+            else:
+                error = job.get("error") if job else None
+                await self._finish_batch(batch["id"], "failed", error or "Batch was interrupted before it finished")
+            recovered += 1
+        if recovered:
+            logging.warning(f"Marked {recovered} interrupted analysis batches as failed")
+        return recovered
+
+    async def _set_item(self, batch_id: str, clause_id: str, fields: Dict[str, Any], counter: str = None) -> None:
+        update: Dict[str, Any] = {"$set": {f"items.$.{key}": value for key, value in fields.items()}}
+        if counter:
+            update["$inc"] = {counter: 1}
+        await self.db.analysis_batches.update_one({"id": batch_id, "items.clause_id": clause_id}, update)
+
+    async def _wait_for_rate_limit(self) -> None:
+        delay = self._rate_limited_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _run_item(
+        self,
+        batch_id: str,
+        clause_id: str,
+        created_by: str,
+        semaphore: asyncio.Semaphore,
+        force_refresh: bool
+    ) -> None:
+        attempts = 0
+        while True:
+            async with semaphore:
+                await self._wait_for_rate_limit()
+                attempts += 1
+                await self._set_item(batch_id, clause_id, {"status": "running", "attempts": attempts})
+                try:
+                    result = await self.analyze(clause_id, created_by, force_refresh=force_refresh)
+                except HTTPException as e:
+                    if e.status_code < 500:
+                        # Klausul tanpa dokumen / knowledge base: tidak ada gunanya di-retry
+                        await self._set_item(batch_id, clause_id, {
+                            "status": "skipped", "error": str(e.detail), "finished_at": _now()
+                        }, counter="skipped_count")
+                        return
+                    error = str(e.detail)
+                except Exception as e:
+                    error = str(e)
+                else:
+                    await self._set_item(batch_id, clause_id, {
+                        "status": "completed",
+                        "error": None,
+                        "score": result.score,
+                        "result_status": result.status,
+                        "finished_at": _now()
+                    }, counter="completed_count")
+                    return
+
+            if attempts > self.max_retries:
+                await self._set_item(batch_id, clause_id, {
+                    "status": "failed", "error": error, "finished_at": _now()
+                }, counter="failed_count")
+                return
+
+            delay = self.retry_base_delay * (2 ** (attempts - 1)) + random.uniform(0, self.retry_base_delay)
+            if is_rate_limit_error(error):
+                self._rate_limited_until = max(self._rate_limited_until, time.monotonic() + self.rate_limit_cooldown)
+            logging.warning(f"Analysis of clause {clause_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {error}")
+            await self._set_item(batch_id, clause_id, {"status": "retrying", "error": error})
+            await asyncio.sleep(delay)
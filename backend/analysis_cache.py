@@ -0,0 +1,69 @@
+"""
+Cache hasil analisis AI per klausul.
+
+Hasil LLM hanya bergantung pada knowledge base, teks prompt, model dan evidence
+yang benar-benar dikirim: isi dokumen beserta artifact pra-prosesnya (dokumen
+yang belum selesai dipra-proses dikirim mentah) dan setelan budget konteks yang
+menentukan dokumen mana yang ikut. Kombinasi itu di-hash menjadi fingerprint;
+selama fingerprint sama, hasil yang tersimpan di koleksi `analysis_cache`
+dipakai ulang tanpa memanggil LLM lagi.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+CACHED_RESULT_FIELDS = ("score", "status", "reasoning", "feedback", "improvement_suggestions")
+
+
+def document_fingerprint(doc: dict) -> str:
+    # Upload lama belum punya sha256; isi file GridFS per file_id tidak pernah berubah
+    return doc.get('sha256') or f"file:{doc['file_id']}"
+
+
+def evidence_fingerprint(doc: dict) -> str:
+    # artifact_key memuat versi artifact; tanpa artifact dokumen dikirim apa adanya
+    artifact_key = (doc.get('preprocessing') or {}).get('artifact_key')
+    return f"{document_fingerprint(doc)}@{artifact_key or 'raw'}"
+
+
+def analysis_fingerprint(
+    clause: dict,
+    documents: List[dict],
+    prompt_templates: List[str],
+    model: str,
+    context_settings: Dict[str, Any]
+) -> str:
+    """Hash knowledge base, template prompt, model, evidence per dokumen (terurut) dan setelan budget konteks"""
+    payload = {
+        "knowledge_base": clause.get('knowledge_base', ''),
+        "title": clause.get('title', ''),
+        "description": clause.get('description', ''),
+        "prompts": [hashlib.sha256(template.encode('utf-8')).hexdigest() for template in prompt_templates],
+        "model": model,
+        "documents": sorted(set(evidence_fingerprint(doc) for doc in documents)),
+        "context": context_settings,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+async def ensure_indexes(db) -> None:
+    await db.analysis_cache.create_index("fingerprint", unique=True)
+
+
+async def get_cached_analysis(db, fingerprint: str) -> Optional[Dict[str, Any]]:
+    return await db.analysis_cache.find_one({"fingerprint": fingerprint}, {"_id": 0})
+
+
+async def store_cached_analysis(db, fingerprint: str, clause_id: str, result: Dict[str, Any]) -> None:
+    await db.analysis_cache.update_one(
+        {"fingerprint": fingerprint},
+        {"$set": {
+            **{field: result[field] for field in CACHED_RESULT_FIELDS},
+            "clause_id": clause_id,
+            "cached_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
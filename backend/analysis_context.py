@@ -0,0 +1,125 @@
+"""
+Perencanaan konteks LLM untuk analisis klausul dengan banyak dokumen.
+
+Biaya setiap dokumen evidence diperkirakan dalam token dari artifact hasil
+pra-proses (lihat evidence_ingest): teks dihitung dari jumlah karakter, gambar
+dan halaman PDF dengan biaya tetap per gambar/halaman. Dokumen diurutkan
+menurut relevansinya terhadap klausul (nama file dan teks yang cocok dengan
+kata kunci knowledge base) lalu dikemas ke dalam budget:
+
+- Semua muat dalam budget: satu panggilan LLM seperti biasa.
+- Tidak muat: dokumen dibagi ke beberapa batch (map), masing-masing dinilai
+  terpisah, lalu hasil parsialnya digabung dalam satu panggilan akhir (reduce).
+  Jika jumlah batch mencapai batas, dokumen paling tidak relevan dilewati dan
+  dicatat di hasil analisis.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+from evidence_ingest import PDF_MIME_TYPE, relevance_score, relevance_terms
+
+CHARS_PER_TOKEN = 4
+# Perkiraan biaya token satu gambar / satu halaman PDF di model multimodal
+IMAGE_TOKENS = 258
+PDF_PAGE_TOKENS = 258
+# File yang jumlah halamannya tidak diketahui: perkiraan kasar dari ukuran file
+BYTES_PER_TOKEN = 16
+# Bobot kata kunci di nama file dibanding kepadatan kata kunci per 1000 karakter teks
+FILENAME_WEIGHT = 3.0
+
+
+class PlannedDocument(NamedTuple):
+    doc: dict
+    cost: int
+    relevance: float
+
+
+class ContextPlan(NamedTuple):
+    # Dokumen per panggilan LLM; lebih dari satu batch berarti analisis map-reduce
+    batches: List[List[PlannedDocument]]
+    skipped: List[PlannedDocument]
+
+    @property
+    def is_map_reduce(self) -> bool:
+        return len(self.batches) > 1
+
+    @property
+    def total_cost(self) -> int:
+        return sum(item.cost for batch in self.batches for item in batch)
+
+    def documents(self, index: int) -> List[dict]:
+        return [item.doc for item in self.batches[index]]
+
+
+def estimate_cost(doc: dict, artifact: Optional[dict]) -> int:
+    """Perkiraan token satu dokumen sebagaimana dikirim ke LLM"""
+    if artifact and artifact['kind'] == "text":
+        chars = sum(len(page['text']) for page in artifact['pages']) + len(doc.get('filename') or "")
+        return max(1, chars // CHARS_PER_TOKEN)
+    if artifact and artifact['kind'] == "image":
+        return IMAGE_TOKENS
+    if artifact and artifact['kind'] == "pdf_pages":
+        return PDF_PAGE_TOKENS * len((doc.get('preprocessing') or {}).get('selected_pages') or [1])
+
+    mime_type = doc.get('mime_type') or ""
+    if mime_type.startswith("image/"):
+        return IMAGE_TOKENS
+    page_count = (doc.get('preprocessing') or {}).get('page_count')
+    if mime_type == PDF_MIME_TYPE and page_count:
+        return PDF_PAGE_TOKENS * page_count
+    return max(1, (doc.get('size') or 0) // BYTES_PER_TOKEN)
+
+
+def document_relevance(doc: dict, artifact: Optional[dict], terms: set) -> float:
+    filename = (doc.get('filename') or "").replace("_", " ").replace("-", " ")
+    score = FILENAME_WEIGHT * relevance_score(filename, terms)
+    if artifact and artifact['kind'] == "text":
+        text = "\n".join(page['text'] for page in artifact['pages'])
+        if text:
+            score += relevance_score(text, terms) * 1000 / len(text)
+    return score
+
+
+def plan_context(
+    clause: dict,
+    documents: List[dict],
+    artifacts: Dict[str, dict],
+    budget_tokens: int,
+    max_batches: int
+) -> ContextPlan:
+    """Urutkan dokumen menurut relevansi dan kemas ke batch berukuran `budget_tokens`"""
+    terms = relevance_terms(clause)
+    planned = []
+    seen_hashes = set()
+    for doc in documents:
+        # Dokumen dengan isi identik cukup dikirim sekali
+        if doc.get('sha256'):
+            if doc['sha256'] in seen_hashes:
+                continue
+            seen_hashes.add(doc['sha256'])
+        artifact = artifacts.get(doc['id'])
+        planned.append(PlannedDocument(doc, estimate_cost(doc, artifact), document_relevance(doc, artifact, terms)))
+
+    # Urutan stabil: relevansi tertinggi dulu, lalu urutan upload
+    ranked = sorted(planned, key=lambda item: -item.relevance)
+    if sum(item.cost for item in ranked) <= budget_tokens:
+        return ContextPlan([ranked], [])
+
+    batches: List[List[PlannedDocument]] = []
+    used: List[int] = []
+    skipped = []
+    for item in ranked:
+        # First-fit: dokumen relevan mengisi batch awal; dokumen yang lebih besar dari
+        # budget tetap dikirim sendirian dalam satu batch
+        for index, batch in enumerate(batches):
+            if used[index] + item.cost <= budget_tokens:
+                batch.append(item)
+                used[index] += item.cost
+                break
+        else:
+            if len(batches) < max_batches:
+                batches.append([item])
+                used.append(item.cost)
+            else:
+                skipped.append(item)
+    return ContextPlan(batches, skipped)
@@ -0,0 +1,217 @@
+"""
+Parser jawaban LLM untuk analisis klausul.
+
+Model diminta menjawab satu objek JSON sesuai ANALYSIS_RESPONSE_SCHEMA. Jawaban
+divalidasi dengan pydantic; jika JSON-nya rusak (code fence, trailing comma,
+kutip miring, teks pengantar) dilakukan perbaikan ringan sebelum validasi.
+Jawaban yang sama sekali bukan JSON diurai dari label teks lama ("Status:",
+"Skor:", "Alasan:", ...) dengan pembacaan skor yang benar: "85/100" menjadi 85,
+"8.5/10" menjadi 85, dan seterusnya.
+"""
+
+import json
+import re
+from typing import Any, Dict, Literal, NamedTuple, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+COMPLIANT_SCORE = 70
+
+ANALYSIS_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["Sesuai", "Belum Sesuai"]},
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "reasoning": {"type": "string"},
+        "feedback": {"type": "string"},
+        "improvement_suggestions": {"type": "string"},
+    },
+    "required": ["status", "score", "reasoning", "feedback", "improvement_suggestions"],
+    "additionalProperties": False,
+}
+
+FIELD_ALIASES = {
+    "status": "status",
+    "skor": "score",
+    "score": "score",
+    "nilai": "score",
+    "alasan": "reasoning",
+    "reasoning": "reasoning",
+    "feedback": "feedback",
+    "feedback_positif": "feedback",
+    "positive_feedback": "feedback",
+    "saran_perbaikan": "improvement_suggestions",
+    "improvement": "improvement_suggestions",
+    "improvements": "improvement_suggestions",
+    "improvement_suggestions": "improvement_suggestions",
+}
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_SCORE_RE = re.compile(r"(-?\d+(?:[.,]\d+)?)\s*(?:/\s*(\d+(?:[.,]\d+)?))?")
+_LABEL_RE = re.compile(
+    r"^[\s\-*•#>\d.)]*\**\s*"
+    r"(status|skor|score|nilai|alasan|reasoning|feedback positif|positive feedback|saran perbaikan|improvements?)"
+    r"\s*\**\s*[:：]\s*\**\s*(.*)$",
+    re.IGNORECASE
+)
+_LABEL_FIELDS = {
+    "status": "status",
+    "skor": "score",
+    "score": "score",
+    "nilai": "score",
+    "alasan": "reasoning",
+    "reasoning": "reasoning",
+    "feedback positif": "feedback",
+    "positive feedback": "feedback",
+    "saran perbaikan": "improvement_suggestions",
+    "improvement": "improvement_suggestions",
+    "improvements": "improvement_suggestions",
+}
+
+
+class AnalysisResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    status: Literal["Sesuai", "Belum Sesuai"]
+    score: float = Field(ge=0, le=100)
+    reasoning: str = ""
+    feedback: str = ""
+    improvement_suggestions: str = ""
+
+
+class ParsedAnalysis(NamedTuple):
+    result: AnalysisResponse
+    # "json", "repaired_json", "text" atau "unstructured"
+    method: str
+
+
+def parse_score(value: Any) -> Optional[float]:
+    """Baca skor 0-100 dari angka atau teks seperti "85", "85/100", "8.5/10", "85%"."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        score = float(value)
+    else:
+        match = _SCORE_RE.search(str(value))
+        if not match:
+            return None
+        score = float(match.group(1).replace(',', '.'))
+        if match.group(2):
+            scale = float(match.group(2).replace(',', '.'))
+            if scale > 0:
+                score = score / scale * 100
+    return min(max(score, 0.0), 100.0)
+
+
+def parse_status(value: Any) -> str:
+    text = str(value or "").lower()
+    return "Sesuai" if "sesuai" in text and "belum" not in text and "tidak" not in text else "Belum Sesuai"
+
+
+def _finalize(status: str, score: float, reasoning: str, feedback: str, improvements: str) -> AnalysisResponse:
+    if score >= COMPLIANT_SCORE:
+        status = "Sesuai"
+    return AnalysisResponse(
+        status=status,
+        score=round(score, 2),
+        reasoning=reasoning.strip(),
+        feedback=feedback.strip(),
+        improvement_suggestions=improvements.strip()
+    )
+
+
+def _json_candidates(text: str):
+    stripped = text.strip()
+    yield stripped, False
+    for fenced in _FENCE_RE.findall(stripped):
+        yield fenced.strip(), True
+    start, end = stripped.find("{"), stripped.rfind("}")
+    if start != -1 and end > start:
+        yield stripped[start:end + 1], True
+
+
+def _repair_json(candidate: str) -> str:
+    candidate = candidate.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+    return _TRAILING_COMMA_RE.sub(r"\1", candidate)
+
+
+def _load_json(text: str):
+    """Return (objek JSON, diperbaiki?) atau (None, False)"""
+    for candidate, extracted in _json_candidates(text):
+        for repaired in (False, True):
+            try:
+                data = json.loads(_repair_json(candidate) if repaired else candidate)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                return data, extracted or repaired
+    return None, False
+
+
+def _from_json(data: Dict[str, Any]) -> AnalysisResponse:
+    fields: Dict[str, Any] = {}
+    for key, value in data.items():
+        field = FIELD_ALIASES.get(str(key).strip().lower().replace(" ", "_"))
+        if field and field not in fields:
+            fields[field] = value
+
+    score = parse_score(fields.get("score"))
+    if score is None or "status" not in fields:
+        raise ValueError("Missing status or score")
+    return _finalize(
+        parse_status(fields["status"]),
+        score,
+        *(str(fields.get(name) or "") for name in ("reasoning", "feedback", "improvement_suggestions"))
+    )
+
+
+def _from_labeled_text(text: str) -> ParsedAnalysis:
+    sections = {"reasoning": "", "feedback": "", "improvement_suggestions": ""}
+    status = "Belum Sesuai"
+    score = 0.0
+    found = False
+    current = None
+
+    for raw_line in text.strip().split('\n'):
+        line = raw_line.strip()
+        match = _LABEL_RE.match(line)
+        if match:
+            found = True
+            field = _LABEL_FIELDS[match.group(1).lower()]
+            value = match.group(2).strip().strip("*").strip()
+            if field == "status":
+                status = parse_status(value)
+                current = None
+            elif field == "score":
+                score = parse_score(value) or 0.0
+                current = None
+            else:
+                current = field
+                sections[field] = value
+        elif current and line:
+            sections[current] += " " + line
+
+    if not sections["reasoning"] and not sections["feedback"]:
+        return ParsedAnalysis(_finalize(
+            status,
+            score,
+            text[:500],
+            "Dokumen telah dianalisis. Silakan periksa detail lengkap.",
+            "Pastikan semua dokumen lengkap dan sesuai standar."
+        ), "text" if found else "unstructured")
+
+    return ParsedAnalysis(
+        _finalize(status, score, sections["reasoning"], sections["feedback"], sections["improvement_suggestions"]),
+        "text"
+    )
+
+
+def parse_analysis_response(text: str) -> ParsedAnalysis:
+    """Ubah jawaban mentah LLM menjadi AnalysisResponse yang tervalidasi"""
+    data, repaired = _load_json(text)
+    if data is not None:
+        try:
+            return ParsedAnalysis(_from_json(data), "repaired_json" if repaired else "json")
+        except (ValueError, ValidationError):
+            pass
+    return _from_labeled_text(text)
@@ -0,0 +1,112 @@
+"""
+Regresi dan benchmark parser jawaban LLM analisis klausul.
+
+Memakai korpus jawaban LLM terekam di benchmarks/data/analysis_responses.json
+(JSON valid, JSON rusak, format label teks lama, jawaban bebas). Setiap entri
+dicek terhadap skor/status/metode yang diharapkan; script keluar dengan kode 1
+jika ada yang meleset. Parser lama (scan substring per baris) ikut diukur
+sebagai pembanding akurasi dan kecepatan.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_analysis_parser.py --iterations 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis_response import parse_analysis_response  # noqa: E402
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "analysis_responses.json"
+
+
+def legacy_parse(response: str):
+    """Salinan parser analyze_clause sebelum refactor; return (score, status)"""
+    score = 0
+    status = "Belum Sesuai"
+    reasoning = ""
+    feedback = ""
+
+    current_section = None
+    for line in response.strip().split('\n'):
+        line = line.strip()
+        if "status:" in line.lower():
+            status_text = line.split(':', 1)[1].strip().lower()
+            status = "Sesuai" if "sesuai" in status_text and "belum" not in status_text else "Belum Sesuai"
+        elif "skor:" in line.lower() or "score:" in line.lower():
+            try:
+                score_text = line.split(':', 1)[1].strip()
+                score = float(''.join(c for c in score_text if c.isdigit() or c == '.'))
+                if score > 100:
+                    score = 100
+            except:  # noqa: E722
+                pass
+        elif "alasan:" in line.lower() or "reasoning:" in line.lower():
+            current_section = "reasoning"
+            reasoning = line.split(':', 1)[1].strip() if ':' in line else ""
+        elif "feedback positif:" in line.lower() or "positive feedback:" in line.lower():
+            current_section = "feedback"
+            feedback = line.split(':', 1)[1].strip() if ':' in line else ""
+        elif current_section and line:
+            if current_section == "reasoning":
+                reasoning += " " + line
+            elif current_section == "feedback":
+                feedback += " " + line
+
+    if score >= 70:
+        status = "Sesuai"
+    return float(score), status
+
+
+def new_parse(response: str):
+    parsed = parse_analysis_response(response)
+    return parsed.result.score, parsed.result.status, parsed.method
+
+
+def time_parser(parse, corpus, iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        for case in corpus:
+            parse(case["response"])
+    return (time.perf_counter() - started_at) / (iterations * len(corpus))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+
+    failures = 0
+    legacy_correct = 0
+    for case in corpus:
+        expected = case["expected"]
+        score, status, method = new_parse(case["response"])
+        ok = score == expected["score"] and status == expected["status"] and method == expected["method"]
+        legacy_score, legacy_status = legacy_parse(case["response"])
+        legacy_ok = legacy_score == expected["score"] and legacy_status == expected["status"]
+        legacy_correct += legacy_ok
+        if not ok:
+            failures += 1
+        print(
+            f"{'OK  ' if ok else 'FAIL'} {case['name']:<32} {method:<13} skor {score:6.2f} {status:<13}"
+            f" | lama: {legacy_score:8.2f} {legacy_status:<13}{'' if legacy_ok else ' (salah)'}"
+        )
+
+    new_seconds = time_parser(parse_analysis_response, corpus, args.iterations)
+    legacy_seconds = time_parser(legacy_parse, corpus, args.iterations)
+    print()
+    print(f"Akurasi: parser baru {len(corpus) - failures}/{len(corpus)}, parser lama {legacy_correct}/{len(corpus)}")
+    print(f"Waktu per jawaban: parser baru {new_seconds * 1e6:.1f} us, parser lama {legacy_seconds * 1e6:.1f} us")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
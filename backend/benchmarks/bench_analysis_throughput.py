@@ -0,0 +1,128 @@
+"""
+Benchmark throughput analisis klausul end-to-end tanpa jaringan.
+
+Memakai provider LLM "stub" (lihat llm_providers.StubProvider) sehingga seluruh
+alur perform_clause_analysis ikut terukur: baca klausul/dokumen, fingerprint,
+lampiran evidence dari GridFS ke file sementara, pemanggilan provider, parsing
+jawaban dan penyimpanan hasil. Latensi model disimulasikan lewat
+--latency-ms/--jitter-ms. Data dibuat di database terpisah (<DB_NAME>_bench)
+yang dihapus setelah selesai; butuh MongoDB dari MONGO_URL.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_analysis_throughput.py --clauses 60 --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clauses", type=int, default=60)
+    parser.add_argument("--documents-per-clause", type=int, default=2)
+    parser.add_argument("--document-kb", type=int, default=256)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--shape", default="mixed", choices=["json", "fenced", "text", "mixed"])
+    return parser.parse_args()
+
+
+async def seed(server, n_clauses: int, documents_per_clause: int, document_size: int):
+    rng = random.Random(42)
+    criteria_id = str(uuid.uuid4())
+    await server.db.criteria.insert_one({"id": criteria_id, "name": "Kriteria Benchmark", "order": 1})
+
+    clause_ids = []
+    for i in range(n_clauses):
+        clause_id = str(uuid.uuid4())
+        clause_ids.append(clause_id)
+        await server.db.clauses.insert_one({
+            "id": clause_id,
+            "criteria_id": criteria_id,
+            "clause_number": f"B.{i + 1}",
+            "title": f"Klausul benchmark {i + 1}",
+            "description": "Klausul sintetis untuk benchmark throughput analisis.",
+            "knowledge_base": "Dokumen yang diminta: kebijakan K3, prosedur, catatan pelaksanaan.",
+        })
+        for j in range(documents_per_clause):
+            data = rng.randbytes(document_size)
+            file_id = await server.storage.put(data, f"evidence-{i}-{j}.pdf", "application/pdf")
+            doc = server.DocumentUpload(
+                clause_id=clause_id,
+                filename=f"evidence-{i}-{j}.pdf",
+                file_id=str(file_id),
+                mime_type="application/pdf",
+                size=len(data),
+                uploaded_by="benchmark"
+            )
+            doc_dict = doc.model_dump()
+            doc_dict['uploaded_at'] = doc_dict['uploaded_at'].isoformat()
+            await server.db.documents.insert_one(doc_dict)
+    return clause_ids
+
+
+async def run_level(server, clause_ids, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def analyze(clause_id):
+        async with semaphore:
+            started_at = time.perf_counter()
+            await server.perform_clause_analysis(clause_id, "benchmark", force_refresh=True)
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(analyze(clause_id) for clause_id in clause_ids))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"concurrency {concurrency:>3}: {len(clause_ids) / elapsed:7.2f} klausul/s"
+        f" | p50 {statistics.median(latencies) * 1000:7.0f} ms | p95 {p95 * 1000:7.0f} ms"
+        f" | total {elapsed:6.1f} s"
+    )
+
+
+async def main():
+    args = parse_args()
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LLM_STUB_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["LLM_STUB_SHAPE"] = args.shape
+
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    os.environ["DB_NAME"] = f"{os.environ.get('DB_NAME', 'smk3_audit_db')}_bench"
+
+    import server
+
+    await server.client.drop_database(os.environ["DB_NAME"])
+    try:
+        clause_ids = await seed(server, args.clauses, args.documents_per_clause, args.document_kb * 1024)
+        print(
+            f"Dataset: {args.clauses} klausul x {args.documents_per_clause} dokumen @ {args.document_kb} KB,"
+            f" stub {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms ({args.shape})"
+        )
+        for level in (int(value) for value in args.concurrency.split(",")):
+            await run_level(server, clause_ids, level)
+        print(f"Panggilan provider: {server.llm_provider.calls}")
+    finally:
+        await server.client.drop_database(os.environ["DB_NAME"])
+        await server.llm_provider.aclose()
+        server.client.close()
+        server.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
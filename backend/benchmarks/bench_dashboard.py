@@ -0,0 +1,168 @@
+"""
+Benchmark perhitungan dashboard: algoritma lama (setiap GET menghitung ulang
+semua kriteria dengan filter `clause_id in list`) dibandingkan jalur yang
+dipakai route sekarang:
+
+- GET /audit/dashboard: dashboard_from_rows atas baris dashboard_summary
+  (bagian read_dashboard setelah find).
+- Setiap penulisan hasil audit: summarize_results untuk satu kriteria (bagian
+  refresh_criteria_summary setelah query klausul dan hasil audit).
+
+Query MongoDB tidak ikut diukur; yang dibandingkan adalah kerja Python per
+request.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_dashboard.py --clauses 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dashboard import dashboard_from_rows, strength_for, summarize_results  # noqa: E402
+
+AUDITOR_STATUSES = [None, 'confirm', 'non-confirm-major', 'non-confirm-minor']
+
+
+def make_dataset(n_criteria: int, n_clauses: int, audited_ratio: float, seed: int = 42):
+    rng = random.Random(seed)
+    criteria_list = [{"id": str(uuid.uuid4()), "name": f"Kriteria {i + 1}", "order": i + 1} for i in range(n_criteria)]
+    clauses = [{"id": str(uuid.uuid4()), "criteria_id": rng.choice(criteria_list)['id']} for _ in range(n_clauses)]
+    results = []
+    for clause in rng.sample(clauses, int(n_clauses * audited_ratio)):
+        score = rng.randint(0, 100)
+        results.append({
+            "clause_id": clause['id'],
+            "score": float(score),
+            "status": "Sesuai" if score >= 70 else "Belum Sesuai",
+            "auditor_status": rng.choice(AUDITOR_STATUSES),
+        })
+    return criteria_list, clauses, results
+
+
+def legacy_dashboard(criteria_list, clauses, results):
+    """Salinan logika get_dashboard sebelum refactor (query per kriteria diganti filter list)"""
+    total_clauses = len(clauses)
+    audited_clauses = len(results)
+    results_with_auditor = [r for r in results if r.get('auditor_status')]
+    confirm_count = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'confirm')
+    non_confirm_major = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'non-confirm-major')
+    non_confirm_minor = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'non-confirm-minor')
+    achievement_percentage = (confirm_count / total_clauses * 100) if total_clauses > 0 else 0
+    average_score = sum(r['score'] for r in results) / audited_clauses if audited_clauses > 0 else 0
+    compliant = sum(1 for r in results if r['status'] == "Sesuai")
+
+    criteria_scores = []
+    for criteria in criteria_list:
+        criteria_clauses = [c for c in clauses if c['criteria_id'] == criteria['id']]
+        clause_ids = [c['id'] for c in criteria_clauses]
+        criteria_results = [r for r in results if r['clause_id'] in clause_ids]
+        criteria_with_auditor = [r for r in criteria_results if r.get('auditor_status')]
+        criteria_confirm = sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'confirm')
+        total_criteria_clauses = len(criteria_clauses)
+        criteria_percentage = (criteria_confirm / total_criteria_clauses * 100) if total_criteria_clauses > 0 else 0
+        if criteria_results:
+            avg = sum(r['score'] for r in criteria_results) / len(criteria_results)
+            compliant_count = sum(1 for r in criteria_results if r['status'] == "Sesuai")
+        else:
+            avg = 0
+            compliant_count = 0
+        strength, strength_label = strength_for(criteria_percentage)
+        criteria_scores.append({
+            "id": criteria['id'],
+            "name": criteria['name'],
+            "average_score": round(avg, 2),
+            "achievement_percentage": round(criteria_percentage, 2),
+            "total_clauses": total_criteria_clauses,
+            "audited_clauses": len(criteria_results),
+            "auditor_assessed_clauses": len(criteria_with_auditor),
+            "confirm_count": criteria_confirm,
+            "non_confirm_major_count": sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'non-confirm-major'),
+            "non_confirm_minor_count": sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'non-confirm-minor'),
+            "compliant_clauses": compliant_count,
+            "strength": strength,
+            "strength_label": strength_label
+        })
+
+    return {
+        "total_clauses": total_clauses,
+        "audited_clauses": audited_clauses,
+        "auditor_assessed_clauses": len(results_with_auditor),
+        "confirm_count": confirm_count,
+        "non_confirm_major_count": non_confirm_major,
+        "non_confirm_minor_count": non_confirm_minor,
+        "achievement_percentage": round(achievement_percentage, 2),
+        "average_score": round(average_score, 2),
+        "compliant_clauses": compliant,
+        "non_compliant_clauses": audited_clauses - compliant,
+        "criteria_scores": criteria_scores
+    }
+
+
+def summary_rows(criteria_list, clauses, results):
+    """Baris dashboard_summary seperti hasil refresh_criteria_summary untuk setiap kriteria"""
+    clause_criteria = {c['id']: c['criteria_id'] for c in clauses}
+    clause_counts = {c['id']: 0 for c in criteria_list}
+    results_by_criteria = {c['id']: [] for c in criteria_list}
+    for clause in clauses:
+        clause_counts[clause['criteria_id']] += 1
+    for result in results:
+        results_by_criteria[clause_criteria[result['clause_id']]].append(result)
+    return [
+        {
+            "_id": criteria['id'],
+            **summarize_results(clause_counts[criteria['id']], results_by_criteria[criteria['id']]),
+            "name": criteria['name'],
+            "order": criteria['order'],
+        }
+        for criteria in criteria_list
+    ], results_by_criteria
+
+
+def timed(func, *args, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--criteria", type=int, default=12)
+    parser.add_argument("--clauses", type=int, default=10000)
+    parser.add_argument("--audited-ratio", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.criteria, args.clauses, args.audited_ratio)
+    print(f"Dataset: {args.criteria} kriteria, {args.clauses} klausul, {len(dataset[2])} hasil audit")
+
+    criteria_list, clauses, _ = dataset
+    rows, results_by_criteria = summary_rows(*dataset)
+    # Penulisan hasil audit me-refresh kriteria dengan klausul terbanyak (kasus terburuk)
+    largest = max(criteria_list, key=lambda c: len(results_by_criteria[c['id']]))
+    largest_total = sum(1 for c in clauses if c['criteria_id'] == largest['id'])
+
+    legacy_time, legacy_output = timed(legacy_dashboard, *dataset, repeat=args.repeat)
+    read_time, new_output = timed(dashboard_from_rows, rows, repeat=args.repeat)
+    refresh_time, _ = timed(summarize_results, largest_total, results_by_criteria[largest['id']], repeat=args.repeat)
+
+    if legacy_output != new_output:
+        print("ERROR: hasil dashboard_from_rows berbeda dengan algoritma lama")
+        sys.exit(1)
+
+    print(f"Legacy GET (per kriteria, list filter):  {legacy_time * 1000:10.2f} ms")
+    print(f"GET dari dashboard_summary:              {read_time * 1000:10.2f} ms")
+    print(f"Refresh satu kriteria per penulisan:     {refresh_time * 1000:10.2f} ms")
+    print(f"Speedup GET: {legacy_time / read_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
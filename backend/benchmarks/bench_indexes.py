@@ -0,0 +1,172 @@
+"""
+Benchmark query utama sebelum dan sesudah index dari indexes.REQUIRED_INDEXES.
+
+Data dibuat di database terpisah (<DB_NAME>_bench, dihapus setelah selesai)
+dengan ukuran mendekati produksi: katalog 12 kriteria / 166 klausul, ribuan
+dokumen evidence, rekomendasi dan riwayat job. Setiap query dijalankan tanpa
+index (collection scan), lalu ensure_indexes dipanggil dan query yang sama
+diukur ulang. Selain waktu, dilaporkan jumlah dokumen yang diperiksa
+(explain executionStats.totalDocsExamined).
+
+Butuh MongoDB dari MONGO_URL di .env. Jalankan dari folder backend:
+    python benchmarks/bench_indexes.py --documents 20000 --jobs 50000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from indexes import REQUIRED_INDEXES, ensure_indexes  # noqa: E402
+
+REC_STATUSES = ["open", "in_progress", "completed"]
+BATCH_SIZE = 5000
+
+
+async def insert_batched(collection, docs):
+    for start in range(0, len(docs), BATCH_SIZE):
+        await collection.insert_many(docs[start:start + BATCH_SIZE], ordered=False)
+
+
+async def seed(db, args, rng: random.Random) -> dict:
+    now = datetime.now(timezone.utc)
+    criteria = [{"id": str(uuid.uuid4()), "name": f"Kriteria {i + 1}", "order": i + 1} for i in range(args.criteria)]
+    clauses = [{
+        "id": str(uuid.uuid4()),
+        "criteria_id": criteria[i % args.criteria]['id'],
+        "clause_number": f"{i % args.criteria + 1}.{i // args.criteria + 1}",
+        "title": f"Klausul {i + 1}",
+    } for i in range(args.clauses)]
+    users = [{"id": str(uuid.uuid4()), "email": f"user{i}@example.com", "role": "auditor"} for i in range(args.users)]
+    documents = [{
+        "id": str(uuid.uuid4()),
+        "clause_id": rng.choice(clauses)['id'],
+        "filename": f"bukti-{i}.pdf",
+        "file_id": str(uuid.uuid4()),
+        "uploaded_at": (now - timedelta(minutes=i)).isoformat(),
+    } for i in range(args.documents)]
+    results = [{"clause_id": clause['id'], "score": float(rng.randint(0, 100))} for clause in clauses]
+    recommendations = [{
+        "id": str(uuid.uuid4()),
+        "clause_id": rng.choice(clauses)['id'],
+        "status": rng.choice(REC_STATUSES),
+        "deadline": (now + timedelta(days=rng.randint(-60, 120))).isoformat(),
+    } for _ in range(args.recommendations)]
+    jobs = [{
+        "id": str(uuid.uuid4()),
+        "created_by": rng.choice(users)['id'],
+        "status": "succeeded",
+        "created_at": (now - timedelta(seconds=i)).isoformat(),
+    } for i in range(args.jobs)]
+
+    for name, docs in [
+        ("criteria", criteria), ("clauses", clauses), ("users", users), ("documents", documents),
+        ("audit_results", results), ("recommendations", recommendations), ("jobs", jobs),
+    ]:
+        await insert_batched(db[name], docs)
+
+    return {"criteria": criteria, "clauses": clauses, "users": users, "documents": documents,
+            "recommendations": recommendations, "now": now}
+
+
+def hot_queries(data: dict, rng: random.Random):
+    """(label, collection, filter, sort) untuk query yang dipakai route"""
+    clause = rng.choice(data["clauses"])
+    deadline = (data["now"] + timedelta(days=7)).isoformat()
+    return [
+        ("login (users.email)", "users", {"email": rng.choice(data["users"])['email']}, None),
+        ("clause by id", "clauses", {"id": clause['id']}, None),
+        ("clauses by criteria", "clauses", {"criteria_id": rng.choice(data["criteria"])['id']}, None),
+        ("documents by clause", "documents", {"clause_id": clause['id']}, None),
+        ("document by id", "documents", {"id": rng.choice(data["documents"])['id']}, None),
+        ("audit result by clause", "audit_results", {"clause_id": clause['id']}, None),
+        ("recommendations by clause", "recommendations", {"clause_id": clause['id']}, None),
+        ("notifications (status, deadline)", "recommendations",
+         {"status": {"$ne": "completed"}, "deadline": {"$lte": deadline}}, None),
+        ("job list per user", "jobs", {"created_by": rng.choice(data["users"])['id']}, [("created_at", -1)]),
+    ]
+
+
+async def measure(db, queries, repeat: int):
+    rows = []
+    for label, collection, query, sort in queries:
+        timings = []
+        for _ in range(repeat):
+            cursor = db[collection].find(query, {"_id": 0})
+            if sort:
+                cursor = cursor.sort(sort).limit(50)
+            start = time.perf_counter()
+            await cursor.to_list(None)
+            timings.append(time.perf_counter() - start)
+
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort).limit(50)
+        plan = await cursor.explain()
+        examined = plan.get("executionStats", {}).get("totalDocsExamined", -1)
+        rows.append((label, statistics.median(timings), examined))
+    return rows
+
+
+async def run(args):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    db_name = f"{os.environ.get('DB_NAME', 'smk3_audit_db')}_bench"
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    await client.drop_database(db_name)
+    db = client[db_name]
+    rng = random.Random(42)
+
+    try:
+        data = await seed(db, args, rng)
+        print(
+            f"Dataset: {args.clauses} klausul, {args.documents} dokumen, {args.recommendations} rekomendasi, "
+            f"{args.jobs} job, {args.users} user"
+        )
+        queries = hot_queries(data, rng)
+
+        before = await measure(db, queries, args.repeat)
+        start = time.perf_counter()
+        failed = await ensure_indexes(db)
+        build_time = time.perf_counter() - start
+        after = await measure(db, queries, args.repeat)
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print(f"ensure_indexes: {len(REQUIRED_INDEXES) - len(failed)} index dalam {build_time * 1000:.0f} ms")
+    if failed:
+        print(f"Gagal: {', '.join(failed)}")
+    print(f"{'query':<34}{'tanpa index':>14}{'dengan index':>14}{'docs diperiksa':>22}")
+    for (label, before_time, before_examined), (_, after_time, after_examined) in zip(before, after):
+        print(
+            f"{label:<34}{before_time * 1000:>11.2f} ms{after_time * 1000:>11.2f} ms"
+            f"{before_examined:>12} -> {after_examined:<8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--criteria", type=int, default=12)
+    parser.add_argument("--clauses", type=int, default=166)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--recommendations", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark login burst: latensi request lain saat banyak verifikasi bcrypt berjalan.
+
+Mensimulasikan satu worker uvicorn: N login (bcrypt verify) dimulai bersamaan,
+sementara "request lain" (handler ringan) dikirim tiap beberapa milidetik dan
+diukur latensinya. Dibandingkan: bcrypt dipanggil langsung di event loop
+(perilaku lama) vs PasswordHasher (thread pool terbatas).
+
+Jalankan dari folder backend:
+    python benchmarks/bench_password_hashing.py --logins 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from passlib.context import CryptContext  # noqa: E402
+
+from password_hashing import PasswordHasher  # noqa: E402
+
+PASSWORD = "TestPass123!"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def other_requests(stop: asyncio.Event, interval: float, latencies: list):
+    """Request ringan (mis. GET dashboard dari cache) yang seharusnya selesai instan"""
+    while not stop.is_set():
+        sent_at = time.perf_counter()
+        await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - sent_at)
+        await asyncio.sleep(interval)
+
+
+async def run_burst(verify, logins: int, interval: float):
+    latencies = []
+    stop = asyncio.Event()
+    background = asyncio.create_task(other_requests(stop, interval, latencies))
+    await asyncio.sleep(interval * 2)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    burst_seconds = time.perf_counter() - started_at
+
+    stop.set()
+    await background
+    return burst_seconds, latencies
+
+
+def report(label: str, burst_seconds: float, latencies: list):
+    millis = [value * 1000 for value in latencies]
+    print(
+        f"{label:<28} burst {burst_seconds:6.2f} s | other requests: n={len(millis):4d} "
+        f"p50={statistics.median(millis):8.2f} ms p99={percentile(millis, 99):8.2f} ms max={max(millis):8.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    hashed = context.hash(PASSWORD)
+    interval = args.interval_ms / 1000
+
+    async def inline_verify():
+        return context.verify(PASSWORD, hashed)
+
+    hasher = PasswordHasher(context, max_workers=args.workers, max_pending=args.logins)
+
+    async def offloaded_verify():
+        return await hasher.verify(PASSWORD, hashed)
+
+    print(f"Login burst: {args.logins} verifikasi bcrypt bersamaan, thread pool {args.workers} worker")
+    report("Inline (event loop)", *await run_burst(inline_verify, args.logins, interval))
+    report("PasswordHasher (executor)", *await run_burst(offloaded_verify, args.logins, interval))
+    print(f"Metrik: {hasher.metrics()}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark render laporan PDF: render penuh semua kriteria dibandingkan render
+inkremental (halaman depan + satu fragmen kriteria yang berubah, fragmen lain
+dari cache) yang dipakai build_report_pdf setelah satu penilaian berubah.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_report.py --clauses 166 --criteria 12
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reports import assemble_report_pdf, render_criteria_fragment, render_summary_pdf  # noqa: E402
+
+AUDITOR_STATUSES = [None, 'confirm', 'non-confirm-major', 'non-confirm-minor']
+
+
+def make_dataset(n_criteria: int, n_clauses: int, seed: int = 42):
+    rng = random.Random(seed)
+    entries = {f"Kriteria {i + 1}": [] for i in range(n_criteria)}
+    names = list(entries)
+    for i in range(n_clauses):
+        name = names[i % n_criteria]
+        score = rng.randint(0, 100)
+        clause = {"id": str(uuid.uuid4()), "clause_number": f"{i % n_criteria + 1}.{i // n_criteria + 1}", "title": f"Klausul {i + 1}"}
+        result = {
+            "status": "Sesuai" if score >= 70 else "Belum Sesuai",
+            "score": float(score),
+            "reasoning": "Dokumen kebijakan tersedia namun bukti pelaksanaan belum lengkap. " * 4,
+            "auditor_status": rng.choice(AUDITOR_STATUSES),
+            "auditor_notes": "Catatan auditor untuk klausul ini.",
+            "agreed_date": "2026-01-15",
+        }
+        entries[name].append((clause, result))
+
+    dashboard = {
+        "total_clauses": n_clauses, "audited_clauses": n_clauses, "auditor_assessed_clauses": n_clauses,
+        "achievement_percentage": 50.0, "confirm_count": n_clauses // 2, "non_confirm_minor_count": 0,
+        "non_confirm_major_count": 0, "average_score": 60.0,
+        "criteria_scores": [
+            {"id": name, "name": name, "strength": "moderate", "audited_clauses": len(items),
+             "total_clauses": len(items), "achievement_percentage": 50.0, "confirm_count": 1}
+            for name, items in entries.items()
+        ],
+    }
+    return dashboard, entries
+
+
+def timed(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func()
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--criteria", type=int, default=12)
+    parser.add_argument("--clauses", type=int, default=166)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dashboard, entries = make_dataset(args.criteria, args.clauses)
+    generated_at = datetime.now(timezone.utc)
+    print(f"Dataset: {args.criteria} kriteria, {args.clauses} klausul teraudit")
+
+    def full():
+        fragments = [render_criteria_fragment(name, items) for name, items in entries.items()]
+        return assemble_report_pdf([render_summary_pdf(dashboard, generated_at)] + fragments)
+
+    cached = {name: render_criteria_fragment(name, items) for name, items in entries.items()}
+    changed = next(iter(entries))
+
+    def incremental():
+        fragments = dict(cached)
+        fragments[changed] = render_criteria_fragment(changed, entries[changed])
+        return assemble_report_pdf([render_summary_pdf(dashboard, generated_at)] + list(fragments.values()))
+
+    full_time, full_pdf = timed(full, args.repeat)
+    incremental_time, incremental_pdf = timed(incremental, args.repeat)
+    print(f"Render penuh:      {full_time * 1000:8.1f} ms ({len(full_pdf)} bytes)")
+    print(f"Render inkremental:{incremental_time * 1000:8.1f} ms ({len(incremental_pdf)} bytes)")
+    print(f"Speedup: {full_time / incremental_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
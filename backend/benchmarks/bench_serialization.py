@@ -0,0 +1,131 @@
+"""
+Benchmark serialisasi endpoint daftar: jalur lama (string ISO ->
+datetime.fromisoformat per baris -> validasi response_model -> serialisasi
+FastAPI -> json.dumps) dibandingkan jalur cepat (dokumen berisi BSON datetime
+langsung di-encode orjson lewat FastJSONResponse).
+
+Tidak butuh MongoDB; dokumen dibuat di memori dengan bentuk yang sama dengan
+hasil find() sebelum dan sesudah migrasi tanggal. Jalankan dari folder backend:
+    python benchmarks/bench_serialization.py --rows 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# server.py membaca konfigurasi saat import; koneksi MongoDB tidak dibuka di benchmark ini
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "smk3_audit_db")
+
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from serialization import FastJSONResponse, to_utc  # noqa: E402
+from server import AuditClause, Recommendation  # noqa: E402
+
+DATE_FIELDS = {"created_at", "deadline", "completed_at"}
+
+
+def make_rows(n_rows: int, seed: int = 42):
+    """(rows recommendation string ISO, rows BSON datetime, rows klausul string ISO, rows klausul datetime)"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    recs_dt, clauses_dt = [], []
+    for i in range(n_rows):
+        recs_dt.append({
+            "id": str(uuid.uuid4()),
+            "clause_id": str(uuid.uuid4()),
+            "recommendation_text": "Lengkapi bukti pelaksanaan inspeksi K3 bulanan. " * 3,
+            "deadline": now + timedelta(days=rng.randint(-30, 90)),
+            "status": rng.choice(["pending", "in_progress", "completed"]),
+            "created_by": str(uuid.uuid4()),
+            "created_at": now - timedelta(minutes=i),
+            "completed_at": now if i % 3 == 0 else None,
+        })
+        clauses_dt.append({
+            "id": str(uuid.uuid4()),
+            "criteria_id": str(uuid.uuid4()),
+            "clause_number": f"{i % 12 + 1}.{i // 12 + 1}",
+            "title": f"Klausul {i + 1}",
+            "description": "Deskripsi persyaratan klausul SMK3. " * 4,
+            "knowledge_base": "Dokumen yang diminta: kebijakan, prosedur, catatan pelaksanaan. " * 6,
+            "created_at": now - timedelta(minutes=i),
+        })
+
+    def as_iso(rows):
+        return [{k: v.isoformat() if isinstance(v, datetime) else v for k, v in row.items()} for row in rows]
+
+    return as_iso(recs_dt), recs_dt, as_iso(clauses_dt), clauses_dt
+
+
+def legacy_body(rows: List[dict], field, loop) -> bytes:
+    """Salinan jalur lama: fixup per baris, validasi response_model, JSONResponse"""
+    rows = [dict(row) for row in rows]
+    for row in rows:
+        for name in DATE_FIELDS:
+            if isinstance(row.get(name), str):
+                row[name] = datetime.fromisoformat(row[name])
+    content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast_body(rows: List[dict]) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def normalized(body: bytes) -> list:
+    rows = json.loads(body)
+    return [{k: to_utc(v) if k in DATE_FIELDS and v else v for k, v in row.items()} for row in rows]
+
+
+def timed(func, *args, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    recs_iso, recs_dt, clauses_iso, clauses_dt = make_rows(args.rows)
+    loop = asyncio.new_event_loop()
+    print(f"Dataset: {args.rows} baris per endpoint")
+
+    for label, iso_rows, dt_rows, model in [
+        ("GET /recommendations", recs_iso, recs_dt, Recommendation),
+        ("GET /clauses", clauses_iso, clauses_dt, AuditClause),
+    ]:
+        # Field response dibuat sekali, sama seperti FastAPI saat route didaftarkan
+        field = create_response_field(name="Response", type_=List[model])
+        legacy_time, legacy_output = timed(legacy_body, iso_rows, field, loop, repeat=args.repeat)
+        fast_time, fast_output = timed(fast_body, dt_rows, repeat=args.repeat)
+
+        # Dibandingkan per nilai; format tanggal keduanya sudah sama ("...Z")
+        if normalized(legacy_output) != normalized(fast_output):
+            print(f"ERROR: isi response {label} berbeda antara jalur lama dan jalur cepat")
+            sys.exit(1)
+
+        print(f"{label}")
+        print(f"  Legacy (fromisoformat + response_model + json): {legacy_time * 1000:8.2f} ms  {len(legacy_output):>9} bytes")
+        print(f"  Fast path (BSON datetime + orjson):             {fast_time * 1000:8.2f} ms  {len(fast_output):>9} bytes")
+        print(f"  Speedup: {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Perhitungan statistik dashboard audit SMK3.
+
+Angka disimpan sebagai materialized view di koleksi `dashboard_summary`: satu
+dokumen counter per criteria_id (ditambah satu baris untuk hasil audit yang
+klausulnya sudah dihapus). Route yang mengubah data audit cukup me-refresh
+baris kriteria yang terdampak (summarize_results atas hasil audit kriteria itu
+saja), sehingga GET dashboard hanya membaca koleksi kecil ini lalu
+menjumlahkannya (dashboard_from_rows). Refresh bisa berjalan paralel (mis. batch
+analisis), jadi setiap baris punya field `version`: baris hanya diganti jika
+versinya belum berubah sejak dibaca, dan dihitung ulang jika sudah.
+
+Rebuild penuh dari command line (dari folder backend):
+    python dashboard.py --rebuild
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+ORPHAN_SUMMARY_ID = "__orphan_results__"
+RESULT_PROJECTION = {"_id": 0, "clause_id": 1, "score": 1, "status": 1, "auditor_status": 1}
+
+AUDITOR_STATUS_FIELDS = {
+    'confirm': 'confirm_count',
+    'non-confirm-major': 'non_confirm_major_count',
+    'non-confirm-minor': 'non_confirm_minor_count',
+}
+
+
+def _empty_counts() -> Dict[str, Any]:
+    return {
+        "total_clauses": 0,
+        "audited_clauses": 0,
+        "auditor_assessed_clauses": 0,
+        "confirm_count": 0,
+        "non_confirm_major_count": 0,
+        "non_confirm_minor_count": 0,
+        "compliant_clauses": 0,
+        "score_sum": 0.0,
+    }
+
+
+def _add_result(counts: Dict[str, Any], result: dict) -> None:
+    counts["audited_clauses"] += 1
+    counts["score_sum"] += result['score']
+    if result['status'] == "Sesuai":
+        counts["compliant_clauses"] += 1
+
+    auditor_status = result.get('auditor_status')
+    if auditor_status:
+        counts["auditor_assessed_clauses"] += 1
+        field = AUDITOR_STATUS_FIELDS.get(auditor_status)
+        if field:
+            counts[field] += 1
+
+
+def strength_for(percentage: float):
+    # Kategori berdasarkan standar SMK3:
+    # 85-100%: Memuaskan (strong)
+    # 60-84%: Baik (moderate)
+    # 0-59%: Kurang (weak)
+    if percentage >= 85:
+        return "strong", "Memuaskan"
+    if percentage >= 60:
+        return "moderate", "Baik"
+    return "weak", "Kurang"
+
+
+def summarize_results(total_clauses: int, results: List[dict]) -> Dict[str, Any]:
+    """Counter satu baris summary dari hasil audit (clause_id, score, status, auditor_status)"""
+    counts = _empty_counts()
+    counts["total_clauses"] = total_clauses
+    for result in results:
+        _add_result(counts, result)
+    return counts
+
+
+def build_dashboard_payload(
+    criteria_list: List[dict],
+    overall: Dict[str, Any],
+    per_criteria: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Ubah counter mentah (total dan per kriteria) menjadi bentuk DashboardStats"""
+    total_clauses = overall["total_clauses"]
+    audited_clauses = overall["audited_clauses"]
+
+    # Skor berdasarkan confirm/non-confirm: (confirm / total) * 100
+    achievement_percentage = (overall["confirm_count"] / total_clauses * 100) if total_clauses > 0 else 0
+    # Total score dari semua hasil audit (AI score untuk referensi)
+    average_score = overall["score_sum"] / audited_clauses if audited_clauses > 0 else 0
+
+    criteria_scores = []
+    for criteria in criteria_list:
+        counts = per_criteria.get(criteria['id']) or _empty_counts()
+        total_criteria_clauses = counts["total_clauses"]
+        audited_criteria_clauses = counts["audited_clauses"]
+
+        # Hitung persentase pencapaian per kriteria berdasarkan confirm
+        criteria_percentage = (counts["confirm_count"] / total_criteria_clauses * 100) if total_criteria_clauses > 0 else 0
+        avg = counts["score_sum"] / audited_criteria_clauses if audited_criteria_clauses > 0 else 0
+        strength, strength_label = strength_for(criteria_percentage)
+
+        criteria_scores.append({
+            "id": criteria['id'],
+            "name": criteria['name'],
+            "average_score": round(avg, 2),
+            "achievement_percentage": round(criteria_percentage, 2),
+            "total_clauses": total_criteria_clauses,
+            "audited_clauses": audited_criteria_clauses,
+            "auditor_assessed_clauses": counts["auditor_assessed_clauses"],
+            "confirm_count": counts["confirm_count"],
+            "non_confirm_major_count": counts["non_confirm_major_count"],
+            "non_confirm_minor_count": counts["non_confirm_minor_count"],
+            "compliant_clauses": counts["compliant_clauses"],
+            "strength": strength,
+            "strength_label": strength_label
+        })
+
+    return {
+        "total_clauses": total_clauses,
+        "audited_clauses": audited_clauses,
+        "auditor_assessed_clauses": overall["auditor_assessed_clauses"],
+        "confirm_count": overall["confirm_count"],
+        "non_confirm_major_count": overall["non_confirm_major_count"],
+        "non_confirm_minor_count": overall["non_confirm_minor_count"],
+        "achievement_percentage": round(achievement_percentage, 2),
+        "average_score": round(average_score, 2),
+        "compliant_clauses": overall["compliant_clauses"],
+        "non_compliant_clauses": audited_clauses - overall["compliant_clauses"],
+        "criteria_scores": criteria_scores
+    }
+
+
+# ============= MATERIALIZED VIEW =============
+
+COUNTER_FIELDS = list(_empty_counts().keys())
+MAX_REFRESH_ATTEMPTS = 5
+
+
+async def _write_summary_row(db, summary_id: str, compute: Callable[[], Awaitable[Optional[dict]]]) -> None:
+    """Ganti satu baris summary dengan hasil `compute` (None = hapus baris) memakai compare-and-swap `version`.
+
+    Versi dibaca sebelum data dihitung; jika refresh lain sudah menulis di
+    antaranya, hitungan ini bisa jadi basi sehingga dihitung ulang.
+    """
+    for _ in range(MAX_REFRESH_ATTEMPTS):
+        current = await db.dashboard_summary.find_one({"_id": summary_id})
+        row = await compute()
+        if row is None:
+            await db.dashboard_summary.delete_one({"_id": summary_id})
+            return
+        if current is not None and all(current.get(field) == value for field, value in row.items()):
+            # Tidak berubah: updated_at/version dibiarkan (mis. rebuild saat startup)
+            return
+
+        version = (current or {}).get("version")
+        row = {**row, "version": (version or 0) + 1, "updated_at": datetime.now(timezone.utc)}
+        if current is None:
+            try:
+                await db.dashboard_summary.insert_one({"_id": summary_id, **row})
+                return
+            except DuplicateKeyError:
+                continue
+        # Baris lama tanpa field version cocok dengan filter version: None
+        result = await db.dashboard_summary.replace_one({"_id": summary_id, "version": version}, row)
+        if result.matched_count:
+            return
+    logging.warning(f"Dashboard summary {summary_id} kept changing during refresh, rebuild it if counts look stale")
+
+
+async def refresh_criteria_summary(db, criteria_id: str) -> None:
+    """Hitung ulang baris summary untuk satu criteria_id dari klausul dan hasil auditnya"""
+    async def compute() -> Optional[dict]:
+        criteria = await db.criteria.find_one({"id": criteria_id}, {"_id": 0, "name": 1, "order": 1})
+        clauses = await db.clauses.find({"criteria_id": criteria_id}, {"_id": 0, "id": 1}).to_list(None)
+        if criteria is None and not clauses:
+            return None
+        results = await db.audit_results.find(
+            {"clause_id": {"$in": [c['id'] for c in clauses]}},
+            RESULT_PROJECTION
+        ).to_list(None)
+
+        return {
+            **summarize_results(len(clauses), results),
+            # name/order None berarti kriteria sudah dihapus: klausulnya tetap dihitung di total
+            "name": criteria['name'] if criteria else None,
+            "order": criteria.get('order') if criteria else None,
+        }
+
+    await _write_summary_row(db, criteria_id, compute)
+
+
+async def refresh_clause_summary(db, clause_id: str, criteria_id: Optional[str] = None) -> None:
+    """Refresh baris summary kriteria pemilik klausul (setelah analisis, assessment, dsb.)"""
+    if criteria_id is None:
+        clause = await db.clauses.find_one({"id": clause_id}, {"_id": 0, "criteria_id": 1})
+        if clause is None:
+            await refresh_orphan_summary(db)
+            return
+        criteria_id = clause['criteria_id']
+    await refresh_criteria_summary(db, criteria_id)
+
+
+async def refresh_orphan_summary(db) -> None:
+    """Hitung ulang hasil audit yang klausulnya sudah tidak ada (tetap masuk total global)"""
+    async def compute() -> dict:
+        clause_ids = await db.clauses.distinct("id")
+        results = await db.audit_results.find({"clause_id": {"$nin": clause_ids}}, RESULT_PROJECTION).to_list(None)
+
+        return {**summarize_results(0, results), "name": None, "order": None}
+
+    await _write_summary_row(db, ORPHAN_SUMMARY_ID, compute)
+
+
+async def rebuild_dashboard_summary(db) -> int:
+    """Bangun ulang seluruh koleksi dashboard_summary; return jumlah baris kriteria"""
+    criteria_ids = set(await db.criteria.distinct("id")) | set(await db.clauses.distinct("criteria_id"))
+    await db.dashboard_summary.delete_many({"_id": {"$nin": list(criteria_ids) + [ORPHAN_SUMMARY_ID]}})
+    for criteria_id in criteria_ids:
+        await refresh_criteria_summary(db, criteria_id)
+    await refresh_orphan_summary(db)
+    return len(criteria_ids)
+
+
+async def read_dashboard(db) -> Dict[str, Any]:
+    """Baca DashboardStats dari materialized view (rebuild otomatis jika masih kosong)"""
+    rows = await db.dashboard_summary.find({}).to_list(None)
+    if not rows:
+        await rebuild_dashboard_summary(db)
+        rows = await db.dashboard_summary.find({}).to_list(None)
+    return dashboard_from_rows(rows)
+
+
+def dashboard_from_rows(rows: List[dict]) -> Dict[str, Any]:
+    """Jumlahkan baris dashboard_summary menjadi payload DashboardStats"""
+    overall = _empty_counts()
+    per_criteria: Dict[str, Dict[str, Any]] = {}
+    criteria_list = []
+    for row in rows:
+        for field in COUNTER_FIELDS:
+            overall[field] += row.get(field, 0)
+        if row["_id"] != ORPHAN_SUMMARY_ID and row.get("name") is not None:
+            per_criteria[row["_id"]] = row
+            criteria_list.append({"id": row["_id"], "name": row["name"], "order": row.get("order")})
+
+    criteria_list.sort(key=lambda c: (c["order"] is None, c["order"]))
+    return build_dashboard_payload(criteria_list, overall, per_criteria)
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import os
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Kelola materialized view dashboard_summary")
+    parser.add_argument("--rebuild", action="store_true", help="bangun ulang seluruh summary dari data audit")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        load_dotenv(Path(__file__).parent / '.env')
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        rebuilt = asyncio.run(rebuild_dashboard_summary(client[os.environ['DB_NAME']]))
+        print(f"Dashboard summary rebuilt for {rebuilt} criteria")
+    else:
+        parser.print_help()
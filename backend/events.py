@@ -0,0 +1,164 @@
+"""
+Event bus in-process untuk push perubahan ke browser lewat Server-Sent Events.
+
+Route yang menulis data (hasil analisis, penilaian auditor, rekomendasi)
+mem-publish event berisi delta ke EventBus; route GET /api/events men-stream
+event tersebut ke setiap client yang terhubung, sehingga frontend tidak perlu
+mem-poll dashboard, notifikasi dan hasil audit.
+
+Setiap subscriber punya antrean terbatas. Client yang terlalu lambat tidak
+menahan publisher: antreannya dikosongkan dan diganti satu event `resync`
+(client memuat ulang datanya). Event terakhir disimpan di history agar client
+yang reconnect dengan header Last-Event-ID menerima event yang terlewat; id
+event memuat id bus, jadi id dari proses worker lain juga berujung `resync`.
+
+Bus bersifat per proses: dengan beberapa worker uvicorn, event hanya sampai ke
+client yang terhubung ke worker yang sama dengan penulisnya.
+
+DeadlineScheduler memeriksa notifikasi deadline secara berkala dan
+mem-publish `deadline_reminder` sekali per rekomendasi per sisa hari. Sisa hari
+yang terakhir diingatkan disimpan lewat callback (di server: field
+`reminded_days_left` pada rekomendasi), jadi restart tidak mengirim ulang.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from serialization import dump_json
+
+RESYNC_EVENT = "resync"
+
+
+class Event(NamedTuple):
+    id: str
+    type: str
+    data: Any
+
+
+def format_sse(event: Event) -> bytes:
+    return f"id: {event.id}\nevent: {event.type}\ndata: ".encode() + dump_json(event.data) + b"\n\n"
+
+
+SSE_HEARTBEAT = b": ping\n\n"
+
+
+class Subscription:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client tertinggal terlalu jauh: buang antrean, minta muat ulang penuh
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event(event.id, RESYNC_EVENT, {}))
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Event berikutnya, atau None jika tidak ada event selama `timeout` detik"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    def __init__(self, queue_size: int = 100, history_size: int = 200):
+        self.bus_id = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._counter = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, type: str, data: Any) -> Event:
+        """Kirim event ke semua subscriber; tidak pernah menunggu client"""
+        self._counter += 1
+        event = Event(f"{self.bus_id}-{self._counter}", type, data)
+        self._history.append(event)
+        for subscription in list(self._subscribers):
+            subscription.push(event)
+        return event
+
+    def _replay(self, last_event_id: str) -> List[Event]:
+        bus_id, _, counter = last_event_id.partition("-")
+        if bus_id != self.bus_id or not counter.isdigit():
+            return [Event(last_event_id, RESYNC_EVENT, {})]
+        last = int(counter)
+        if last >= self._counter:
+            return []
+        oldest = self._history[0] if self._history else None
+        if oldest is None or int(oldest.id.partition("-")[2]) > last + 1:
+            # Sebagian event sudah keluar dari history
+            return [Event(last_event_id, RESYNC_EVENT, {})]
+        return [event for event in self._history if int(event.id.partition("-")[2]) > last]
+
+    @contextmanager
+    def subscribe(self, last_event_id: Optional[str] = None) -> Iterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        if last_event_id:
+            for event in self._replay(last_event_id):
+                subscription.push(event)
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+
+
+class DeadlineScheduler:
+    """Publish `deadline_reminder` untuk notifikasi yang baru masuk jendela deadline atau sisa harinya berubah"""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        load_notifications: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        load_reminded: Callable[[List[str]], Awaitable[Dict[str, int]]],
+        save_reminded: Callable[[Dict[str, int]], Awaitable[None]],
+        interval_seconds: float = 300
+    ):
+        self.bus = bus
+        self.load_notifications = load_notifications
+        # id rekomendasi -> days_left yang terakhir diingatkan (persisten, bertahan saat restart)
+        self.load_reminded = load_reminded
+        self.save_reminded = save_reminded
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> int:
+        notifications = await self.load_notifications()
+        if not notifications:
+            return 0
+        reminded = await self.load_reminded([n["id"] for n in notifications])
+        due = [n for n in notifications if reminded.get(n["id"]) != n["days_left"]]
+        for notification in due:
+            self.bus.publish("deadline_reminder", notification)
+        if due:
+            await self.save_reminded({n["id"]: n["days_left"] for n in due})
+        return len(due)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logging.warning(f"Deadline reminder check failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
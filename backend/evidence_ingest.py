@@ -0,0 +1,360 @@
+"""
+Pra-proses dokumen evidence setelah upload.
+
+Setiap isi file diproses sekali menjadi artifact yang lebih ringkas untuk LLM
+dan disimpan di koleksi `document_artifacts`:
+
+- PDF ber-text layer: teks per halaman diekstrak; untuk dokumen panjang hanya
+  halaman yang paling relevan dengan klausul (judul, deskripsi, knowledge
+  base) yang disimpan, dalam batas jumlah karakter.
+- PDF hasil scan yang sangat panjang: dipotong menjadi PDF berisi halaman awal
+  saja dan disimpan sebagai file GridFS terpisah.
+- Gambar besar: di-resize dan disimpan ulang sebagai JPEG.
+
+Artifact dikunci dengan SHA-256 isi file (blob bersama, lihat storage.py)
+ditambah fingerprint kata kunci klausul, karena pilihan halaman teks bergantung
+pada klausul. Upload yang dideduplikasi ke blob yang sudah punya artifact untuk
+klausul yang sama langsung memakai artifact tersebut; selain itu pra-proses
+dijalankan sebagai job `preprocess` di JobQueue sehingga response upload tidak
+menunggu. Record dokumen menyimpan ringkasan hasilnya beserta `artifact_key` di
+field `preprocessing`; artifact dihapus setelah tidak ada dokumen yang
+merujuknya. Dokumen tanpa artifact (upload lama, job belum selesai, atau
+pra-proses gagal) tetap dianalisis dari file aslinya.
+
+Backfill upload lama dari command line (dari folder backend):
+    python evidence_ingest.py --backfill
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import re
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from bson.binary import Binary
+from PIL import Image, UnidentifiedImageError
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PyPdfError
+
+from storage import EvidenceStorage
+
+ARTIFACT_VERSION = 2
+# File GridFS dibaca ke SpooledTemporaryFile: di memori sampai batas ini, lalu ke disk
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+PDF_MIME_TYPE = "application/pdf"
+# Rata-rata karakter per halaman minimal agar PDF dianggap punya text layer
+MIN_TEXT_CHARS_PER_PAGE = 40
+MAX_TEXT_CHARS = 60_000
+MAX_PAGE_CHARS = 20_000
+# PDF scan lebih panjang dari ini dikirim sebagai potongan halaman awal saja
+MAX_BINARY_PDF_PAGES = 30
+MAX_IMAGE_DIMENSION = 1600
+IMAGE_JPEG_QUALITY = 80
+
+STOPWORDS = {
+    "yang", "dan", "untuk", "dengan", "dari", "pada", "atau", "dalam", "adalah",
+    "harus", "telah", "akan", "oleh", "tersebut", "secara", "sesuai", "serta",
+    "ini", "itu", "tidak", "dapat", "setiap", "bagi", "para", "antara",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]{4,}")
+
+
+def relevance_terms(clause: dict) -> set:
+    """Kata kunci klausul untuk memilih halaman yang relevan"""
+    text = " ".join(clause.get(field) or "" for field in ("title", "description", "knowledge_base"))
+    return {word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS}
+
+
+def relevance_score(text: str, terms: set) -> int:
+    counts = Counter(_WORD_RE.findall(text.lower()))
+    return sum(counts[term] for term in terms)
+
+
+def select_pages(pages: List[str], terms: set, max_chars: int = MAX_TEXT_CHARS) -> List[int]:
+    """Pilih indeks halaman (terurut) yang muat dalam `max_chars`, paling relevan dulu.
+
+    Halaman pertama (sampul/judul dokumen) selalu ikut jika muat.
+    """
+    if sum(len(page) for page in pages) <= max_chars:
+        return [index for index, page in enumerate(pages) if page]
+
+    ranked = sorted(
+        (index for index, page in enumerate(pages) if page),
+        key=lambda index: (index != 0, -relevance_score(pages[index], terms), index)
+    )
+    selected = []
+    used = 0
+    for index in ranked:
+        if used + len(pages[index]) > max_chars:
+            continue
+        selected.append(index)
+        used += len(pages[index])
+    return sorted(selected)
+
+
+def _extract_pdf(source: BinaryIO, terms: set) -> Dict[str, Any]:
+    reader = PdfReader(source)
+    page_count = len(reader.pages)
+    pages = [(page.extract_text() or "").strip()[:MAX_PAGE_CHARS] for page in reader.pages]
+    text_chars = sum(len(page) for page in pages)
+
+    if page_count and text_chars / page_count >= MIN_TEXT_CHARS_PER_PAGE:
+        selected = select_pages(pages, terms)
+        return {
+            "kind": "text",
+            "page_count": page_count,
+            "pages": [{"page": index + 1, "text": pages[index]} for index in selected],
+            "text_chars": sum(len(pages[index]) for index in selected),
+        }
+
+    if page_count > MAX_BINARY_PDF_PAGES:
+        writer = PdfWriter()
+        for page in reader.pages[:MAX_BINARY_PDF_PAGES]:
+            writer.add_page(page)
+        output = io.BytesIO()
+        writer.write(output)
+        return {
+            "kind": "pdf_pages",
+            "page_count": page_count,
+            "selected_pages": list(range(1, MAX_BINARY_PDF_PAGES + 1)),
+            "data": output.getvalue(),
+        }
+
+    return {"kind": "original", "page_count": page_count}
+
+
+def _downsample_image(source: BinaryIO) -> Dict[str, Any]:
+    with Image.open(source) as image:
+        width, height = image.size
+        if max(width, height) <= MAX_IMAGE_DIMENSION:
+            return {"kind": "original", "width": width, "height": height}
+
+        image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+        return {
+            "kind": "image",
+            "original_width": width,
+            "original_height": height,
+            "width": image.size[0],
+            "height": image.size[1],
+            "mime_type": "image/jpeg",
+            "data": output.getvalue(),
+        }
+
+
+def build_artifact(source: BinaryIO, mime_type: str, terms: set) -> Dict[str, Any]:
+    """Pra-proses isi file (sinkron, CPU-bound: jalankan di thread)"""
+    try:
+        if mime_type == PDF_MIME_TYPE:
+            return _extract_pdf(source, terms)
+        if (mime_type or "").startswith("image/"):
+            return _downsample_image(source)
+    except (PyPdfError, UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        return {"kind": "original", "error": str(e)}
+    return {"kind": "original"}
+
+
+def summarize_artifact(artifact: Dict[str, Any]) -> Dict[str, Any]:
+    """Ringkasan kecil yang ditaruh di record dokumen"""
+    summary = {"version": ARTIFACT_VERSION, "kind": artifact["kind"]}
+    for field in ("page_count", "text_chars", "width", "height", "error"):
+        if field in artifact:
+            summary[field] = artifact[field]
+    if artifact["kind"] == "text":
+        summary["selected_pages"] = [page["page"] for page in artifact["pages"]]
+    elif "selected_pages" in artifact:
+        summary["selected_pages"] = artifact["selected_pages"]
+    return summary
+
+
+def artifact_key(doc: dict, clause: dict) -> str:
+    """Kunci artifact: isi file (sha256) + kata kunci klausul yang dipakai memilih halaman"""
+    content = doc.get('sha256') or f"file:{doc['file_id']}"
+    terms = hashlib.sha256(" ".join(sorted(relevance_terms(clause))).encode('utf-8')).hexdigest()[:16]
+    return f"{ARTIFACT_VERSION}:{content}:{terms}"
+
+
+async def link_existing_artifact(db, doc: dict, clause: dict) -> Optional[Dict[str, Any]]:
+    """Pakai artifact yang sudah ada untuk isi file + klausul yang sama; None jika perlu pra-proses"""
+    key = artifact_key(doc, clause)
+    record = await db.document_artifacts.find_one({"key": key}, {"_id": 0, "summary": 1})
+    if record is None:
+        return None
+    summary = {**record["summary"], "artifact_key": key}
+    await db.documents.update_one({"id": doc['id']}, {"$set": {"preprocessing": summary}})
+    return summary
+
+
+async def _spool_file(storage: EvidenceStorage, file_id: str) -> BinaryIO:
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    grid_out = await storage.open(file_id)
+    async for chunk in storage.iter_chunks(grid_out):
+        await asyncio.to_thread(spooled.write, chunk)
+    spooled.seek(0)
+    return spooled
+
+
+async def ingest_document(db, storage: EvidenceStorage, doc: dict, clause: dict) -> Dict[str, Any]:
+    """Bangun (atau pakai ulang) artifact untuk satu dokumen; return ringkasannya"""
+    key = artifact_key(doc, clause)
+    record = await db.document_artifacts.find_one({"key": key}, {"_id": 0, "summary": 1})
+    if record is None:
+        source = await _spool_file(storage, doc['file_id'])
+        try:
+            artifact = await asyncio.to_thread(build_artifact, source, doc['mime_type'], relevance_terms(clause))
+        finally:
+            await asyncio.to_thread(source.close)
+        record = await _store_artifact(db, storage, key, doc, artifact)
+
+    summary = {**record["summary"], "artifact_key": key}
+    result = await db.documents.update_one({"id": doc['id']}, {"$set": {"preprocessing": summary}})
+
+    released = []
+    previous_key = (doc.get('preprocessing') or {}).get('artifact_key')
+    if previous_key and previous_key != key:
+        released.append(previous_key)
+    if result.matched_count == 0:
+        # Dokumen dihapus saat pra-proses berjalan
+        released.append(key)
+    if released:
+        await release_artifacts(db, storage, released)
+    return summary
+
+
+async def _store_artifact(db, storage: EvidenceStorage, key: str, doc: dict, artifact: Dict[str, Any]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "key": key,
+        "sha256": doc.get('sha256'),
+        "version": ARTIFACT_VERSION,
+        "kind": artifact["kind"],
+        "summary": summarize_artifact(artifact),
+        "created_at": datetime.now(timezone.utc),
+    }
+    if artifact["kind"] == "text":
+        record["pages"] = artifact["pages"]
+    elif artifact["kind"] == "image":
+        record["mime_type"] = artifact["mime_type"]
+        record["data"] = Binary(artifact["data"])
+    elif artifact["kind"] == "pdf_pages":
+        file_id = await storage.put(artifact["data"], f"pages-{doc['filename']}", PDF_MIME_TYPE)
+        record["mime_type"] = PDF_MIME_TYPE
+        record["file_id"] = str(file_id)
+
+    try:
+        await db.document_artifacts.insert_one(record)
+    except DuplicateKeyError:
+        # Job lain memproses isi yang sama lebih dulu; pakai artifact miliknya
+        if record.get("file_id"):
+            await _delete_artifact_file(storage, record["file_id"])
+        record = await db.document_artifacts.find_one({"key": key}, {"_id": 0, "summary": 1})
+    return record
+
+
+async def load_artifacts(db, documents: List[dict]) -> Dict[str, dict]:
+    """Artifact per document id untuk dokumen yang sudah dipra-proses"""
+    keys = {}
+    for doc in documents:
+        preprocessing = doc.get('preprocessing') or {}
+        if preprocessing.get('version') == ARTIFACT_VERSION and preprocessing.get('artifact_key'):
+            keys[doc['id']] = preprocessing['artifact_key']
+    if not keys:
+        return {}
+    artifacts = await db.document_artifacts.find(
+        {"key": {"$in": list(set(keys.values()))}},
+        {"_id": 0}
+    ).to_list(None)
+    by_key = {artifact['key']: artifact for artifact in artifacts}
+    return {doc_id: by_key[key] for doc_id, key in keys.items() if key in by_key}
+
+
+async def _delete_artifact_file(storage: EvidenceStorage, file_id: str) -> None:
+    try:
+        await storage.delete(file_id)
+    except Exception as e:
+        logging.warning(f"Failed to delete artifact file {file_id}: {str(e)}")
+
+
+async def _delete_artifact_records(db, storage: EvidenceStorage, query: Dict[str, Any]) -> int:
+    async for artifact in db.document_artifacts.find({**query, "file_id": {"$exists": True}}, {"file_id": 1}):
+        await _delete_artifact_file(storage, artifact['file_id'])
+    result = await db.document_artifacts.delete_many(query)
+    return result.deleted_count
+
+
+async def release_artifacts(db, storage: EvidenceStorage, keys: Iterable[str]) -> int:
+    """Hapus artifact yang sudah tidak dirujuk dokumen mana pun (setelah dokumen dihapus/diproses ulang)"""
+    released = 0
+    for key in set(keys):
+        if await db.documents.count_documents({"preprocessing.artifact_key": key}, limit=1):
+            continue
+        released += await _delete_artifact_records(db, storage, {"key": key})
+    return released
+
+
+async def delete_all_artifacts(db, storage: EvidenceStorage) -> int:
+    """Hapus seluruh artifact beserta file potongan PDF-nya (hard reset)"""
+    return await _delete_artifact_records(db, storage, {})
+
+
+async def purge_unreferenced_artifacts(db, storage: EvidenceStorage) -> int:
+    """Hapus artifact versi lama dan artifact yang tidak lagi dirujuk dokumen"""
+    referenced = await db.documents.distinct("preprocessing.artifact_key")
+    return await _delete_artifact_records(db, storage, {"key": {"$nin": referenced}})
+
+
+async def ensure_indexes(db) -> None:
+    # Versi 1 menyimpan satu artifact per document_id (index unik lama bentrok dengan record tanpa document_id)
+    try:
+        await db.document_artifacts.drop_index("document_id_1")
+    except OperationFailure:
+        pass
+    await db.document_artifacts.create_index("key", unique=True)
+    await db.documents.create_index("preprocessing.artifact_key")
+
+
+async def backfill_artifacts(db, storage: EvidenceStorage) -> int:
+    """Pra-proses dokumen yang belum punya artifact versi terbaru lalu buang artifact yatim"""
+    clauses = {}
+    processed = 0
+    async for doc in db.documents.find({"preprocessing.version": {"$ne": ARTIFACT_VERSION}}, {"_id": 0}):
+        if doc['clause_id'] not in clauses:
+            clauses[doc['clause_id']] = await db.clauses.find_one({"id": doc['clause_id']}, {"_id": 0}) or {}
+        try:
+            await ingest_document(db, storage, doc, clauses[doc['clause_id']])
+            processed += 1
+        except Exception as e:
+            logging.warning(f"Preprocessing failed for document {doc['id']}: {str(e)}")
+    await purge_unreferenced_artifacts(db, storage)
+    return processed
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Kelola artifact pra-proses dokumen evidence")
+    parser.add_argument("--backfill", action="store_true", help="pra-proses dokumen yang belum punya artifact")
+    args = parser.parse_args()
+
+    if args.backfill:
+        load_dotenv(Path(__file__).parent / '.env')
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        database = client[os.environ['DB_NAME']]
+        processed = asyncio.run(backfill_artifacts(database, EvidenceStorage(database)))
+        print(f"Preprocessed {processed} documents")
+    else:
+        parser.print_help()
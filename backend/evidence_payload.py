@@ -0,0 +1,128 @@
+"""
+Menyiapkan dokumen evidence sebagai lampiran pesan LLM.
+
+Dokumen yang sudah dipra-proses saat upload (lihat evidence_ingest) dikirim
+dalam bentuk ringkasnya: teks hasil ekstraksi PDF masuk ke teks pesan, gambar
+yang sudah di-resize dan potongan halaman PDF scan menggantikan file asli.
+Dokumen tanpa artifact dikirim dari file aslinya.
+
+Lampiran berupa llm_providers.Attachment. Gambar dikirim langsung dari memori.
+Dokumen lain (PDF dsb.) masih butuh path karena sebagian provider meng-upload
+file dari disk;
+isinya dialirkan chunk demi chunk dari GridFS ke direktori sementara yang unik
+per analisis (nama file tidak memakai nama upload), dengan batas ukuran total,
+dan direktori tersebut selalu dihapus ketika analisis selesai maupun gagal.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import PurePath
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+from llm_providers import Attachment
+from storage import EvidenceStorage
+
+TEMP_DIR_PREFIX = "smk3-analysis-"
+
+
+class EvidenceTooLargeError(Exception):
+    """Total evidence satu klausul melebihi batas yang boleh dikirim ke LLM"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"Evidence exceeds maximum analysis size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class EvidencePayload(NamedTuple):
+    file_contents: List[Attachment]
+    text_sections: List[str]
+
+
+def _is_inline_image(mime_type: str) -> bool:
+    return (mime_type or "").startswith("image/")
+
+
+def format_text_section(doc: dict, artifact: dict) -> str:
+    page_count = (doc.get('preprocessing') or {}).get('page_count')
+    pages = artifact['pages']
+    header = f"=== {doc['filename']}"
+    if page_count and len(pages) < page_count:
+        header += f" (halaman {', '.join(str(page['page']) for page in pages)} dari {page_count})"
+    body = "\n\n".join(f"[Halaman {page['page']}]\n{page['text']}" for page in pages)
+    return f"{header} ===\n{body}"
+
+
+@asynccontextmanager
+async def evidence_file_contents(
+    storage: EvidenceStorage,
+    documents: List[dict],
+    max_total_size: int,
+    artifacts: Optional[Dict[str, dict]] = None
+) -> AsyncIterator[EvidencePayload]:
+    """Yield lampiran dan teks evidence untuk LLMRequest; file sementara dibersihkan saat keluar"""
+    artifacts = artifacts or {}
+    temp_dir = None
+    payload = EvidencePayload([], [])
+    seen_hashes = set()
+    total_size = 0
+    try:
+        for index, doc in enumerate(documents):
+            # Dokumen dengan isi identik cukup dikirim sekali ke LLM
+            if doc.get('sha256'):
+                if doc['sha256'] in seen_hashes:
+                    continue
+                seen_hashes.add(doc['sha256'])
+
+            artifact = artifacts.get(doc['id'])
+            if artifact and artifact['kind'] == "text":
+                section = format_text_section(doc, artifact)
+                total_size += len(section.encode('utf-8'))
+                if total_size > max_total_size:
+                    raise EvidenceTooLargeError(max_total_size)
+                payload.text_sections.append(section)
+                continue
+
+            if artifact and artifact['kind'] == "image":
+                total_size += len(artifact['data'])
+                if total_size > max_total_size:
+                    raise EvidenceTooLargeError(max_total_size)
+                payload.file_contents.append(Attachment(artifact['mime_type'], data=artifact['data']))
+                continue
+
+            if artifact and artifact['kind'] == "pdf_pages":
+                file_id, mime_type, filename = artifact['file_id'], artifact['mime_type'], "pages.pdf"
+            else:
+                file_id, mime_type, filename = doc['file_id'], doc['mime_type'], doc.get('filename') or ""
+
+            grid_out = await storage.open(file_id)
+            total_size += grid_out.length
+            if total_size > max_total_size:
+                raise EvidenceTooLargeError(max_total_size)
+
+            if _is_inline_image(mime_type):
+                file_bytes = await grid_out.read()
+                payload.file_contents.append(Attachment(mime_type, data=file_bytes))
+                continue
+
+            if temp_dir is None:
+                temp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix=TEMP_DIR_PREFIX)
+            # Ekstensi dipertahankan untuk deteksi tipe; nama asli upload tidak dipakai
+            suffix = PurePath(filename).suffix[:16]
+            temp_path = os.path.join(temp_dir, f"{index}{suffix}")
+            # open/write/close file disk semuanya di thread, sama seperti mkdtemp/rmtree
+            f = await asyncio.to_thread(open, temp_path, 'xb')
+            try:
+                async for chunk in storage.iter_chunks(grid_out):
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+            payload.file_contents.append(Attachment(mime_type, path=temp_path))
+
+        yield payload
+    finally:
+        if temp_dir is not None:
+            await asyncio.to_thread(shutil.rmtree, temp_dir, True)
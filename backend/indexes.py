@@ -0,0 +1,134 @@
+"""
+Deklarasi dan provisioning index MongoDB untuk query utama aplikasi.
+
+REQUIRED_INDEXES mencantumkan index yang dibutuhkan route (lookup `id`, login
+per `email`, dokumen/hasil audit/rekomendasi per `clause_id`, klausul per
+`criteria_id`, notifikasi per `status`/`deadline`, dsb.). ensure_indexes
+dipanggil saat startup; create_index idempotent sehingga aman dijalankan di
+setiap worker. Index unik yang gagal dibuat karena data lama masih duplikat
+tidak menghentikan startup, tetapi dicatat di log beserta kuncinya.
+
+Index milik modul lain (storage, analysis_cache, evidence_ingest, jobs) tetap
+dibuat oleh modul masing-masing.
+
+Laporan index yang belum ada dan index yang belum pernah dipakai sejak server
+MongoDB terakhir start ($indexStats), dari folder backend:
+    python indexes.py --report
+    python indexes.py --ensure
+"""
+
+import logging
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from pymongo.errors import OperationFailure
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+
+    @property
+    def name(self) -> str:
+        # Sama dengan nama default pymongo, mis. "clause_id_1" atau "status_1_deadline_1"
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+REQUIRED_INDEXES = [
+    IndexSpec("users", [("id", 1)], unique=True),
+    IndexSpec("users", [("email", 1)], unique=True),
+    IndexSpec("criteria", [("id", 1)], unique=True),
+    IndexSpec("criteria", [("order", 1), ("_id", 1)]),
+    IndexSpec("clauses", [("id", 1)], unique=True),
+    # Filter + urutan keyset (pagination.fetch_page)
+    IndexSpec("clauses", [("criteria_id", 1), ("_id", 1)]),
+    # Kunci upsert seeding (lihat seeding.py)
+    IndexSpec("clauses", [("clause_number", 1)], unique=True),
+    IndexSpec("documents", [("id", 1)], unique=True),
+    IndexSpec("documents", [("clause_id", 1), ("_id", 1)]),
+    # Satu hasil audit per klausul (_save_audit_result melakukan upsert per clause_id)
+    IndexSpec("audit_results", [("clause_id", 1)], unique=True),
+    IndexSpec("recommendations", [("id", 1)], unique=True),
+    IndexSpec("recommendations", [("clause_id", 1), ("_id", 1)]),
+    IndexSpec("recommendations", [("status", 1), ("deadline", 1)]),
+    IndexSpec("analysis_batches", [("id", 1)], unique=True),
+    IndexSpec("jobs", [("created_by", 1), ("created_at", -1)]),
+]
+
+
+async def ensure_indexes(db, specs: List[IndexSpec] = REQUIRED_INDEXES) -> List[str]:
+    """Buat index yang dideklarasikan; return nama `collection.index` yang gagal dibuat"""
+    failed = []
+    for spec in specs:
+        try:
+            await db[spec.collection].create_index(spec.keys, name=spec.name, unique=spec.unique)
+        except OperationFailure as e:
+            failed.append(f"{spec.collection}.{spec.name}")
+            logging.error(
+                f"Failed to create index {spec.collection}.{spec.name}"
+                f"{' (unique: remove duplicate values first)' if spec.unique else ''}: {str(e)}"
+            )
+    return failed
+
+
+async def _index_usage(collection) -> Dict[str, int]:
+    """Jumlah operasi per index sejak server MongoDB start"""
+    usage = {}
+    async for stat in collection.aggregate([{"$indexStats": {}}]):
+        usage[stat["name"]] = stat["accesses"]["ops"]
+    return usage
+
+
+async def index_report(db, specs: List[IndexSpec] = REQUIRED_INDEXES) -> Dict[str, Any]:
+    """Index yang dideklarasikan tapi belum ada, dan index yang ada tapi belum pernah dipakai"""
+    missing = []
+    for spec in specs:
+        existing = await db[spec.collection].index_information()
+        if spec.name not in existing:
+            missing.append({"collection": spec.collection, "name": spec.name, "unique": spec.unique})
+
+    unused = []
+    for collection_name in sorted(await db.list_collection_names()):
+        if collection_name.startswith("system."):
+            continue
+        usage = await _index_usage(db[collection_name])
+        for name, ops in sorted(usage.items()):
+            if name != "_id_" and ops == 0:
+                unused.append({"collection": collection_name, "name": name})
+
+    return {"missing": missing, "unused": unused}
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import os
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Kelola index MongoDB aplikasi")
+    parser.add_argument("--ensure", action="store_true", help="buat index yang belum ada")
+    parser.add_argument("--report", action="store_true", help="tampilkan index yang belum ada / belum terpakai")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    database = client[os.environ['DB_NAME']]
+
+    async def main():
+        if args.ensure:
+            failed = await ensure_indexes(database)
+            print(f"Ensured {len(REQUIRED_INDEXES) - len(failed)}/{len(REQUIRED_INDEXES)} indexes")
+        if args.report or not args.ensure:
+            report = await index_report(database)
+            print(f"Missing indexes ({len(report['missing'])}):")
+            for index in report["missing"]:
+                print(f"  {index['collection']}.{index['name']}{' (unique)' if index['unique'] else ''}")
+            print(f"Unused indexes since MongoDB start ({len(report['unused'])}):")
+            for index in report["unused"]:
+                print(f"  {index['collection']}.{index['name']}")
+
+    asyncio.run(main())
+    client.close()
@@ -0,0 +1,370 @@
+"""
+Antrean job background berbasis MongoDB.
+
+Operasi panjang (analisis AI, export ZIP evidence, laporan PDF) disimpan
+sebagai dokumen di koleksi `jobs` lalu diambil oleh worker pool lokal di setiap
+proses uvicorn. Klaim job memakai find_one_and_update atomik, sehingga beberapa
+worker/proses bisa berbagi antrean yang sama tanpa mengerjakan job dua kali.
+
+Worker yang sedang menjalankan job memperbarui `lease_expires_at` secara
+berkala. Job `running` yang lease-nya habis (proses mati / restart) dikembalikan
+ke antrean, atau ditandai gagal jika jatah percobaannya sudah habis. Pembatalan
+ditandai lewat `cancel_requested` dan diteruskan ke task yang menjalankannya,
+langsung jika job berjalan di proses yang sama atau pada heartbeat berikutnya.
+Hasil file disimpan di GridFS dan dihapus bersama dokumen job setelah masa
+retensi lewat.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from storage import EvidenceStorage
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobCancelledError(Exception):
+    """Job dibatalkan oleh pengguna saat sedang berjalan"""
+
+
+class JobContext:
+    """Diberikan ke handler: parameter job, pelaporan progress dan penyimpanan file hasil"""
+
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any]):
+        self.queue = queue
+        self.job_id = job["id"]
+        self.params = job.get("params") or {}
+        self.created_by = job.get("created_by")
+
+    async def progress(self, current: int, total: int, message: Optional[str] = None) -> None:
+        job = await self.queue.db.jobs.find_one_and_update(
+            {"id": self.job_id},
+            {"$set": {"progress": {"current": current, "total": total, "message": message}}},
+            projection={"_id": 0, "cancel_requested": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if job and job.get("cancel_requested"):
+            raise JobCancelledError(self.job_id)
+
+    async def store_file(self, chunks: AsyncIterator[bytes], filename: str, content_type: str) -> Dict[str, Any]:
+        """Tulis file hasil ke GridFS; return deskripsi yang disimpan di `result_file`"""
+        stored = await self.queue.storage.put_stream(chunks, filename, content_type)
+        return {
+            "file_id": str(stored.file_id),
+            "filename": filename,
+            "mime_type": content_type,
+            "size": stored.size,
+            "sha256": stored.sha256,
+        }
+
+
+# Handler mengembalikan {"data": <hasil JSON>} dan/atau {"file": <hasil JobContext.store_file>}
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db,
+        storage: EvidenceStorage,
+        workers: int = 2,
+        dedicated_workers: Optional[Dict[str, int]] = None,
+        max_attempts: int = 3,
+        retention: timedelta = timedelta(hours=24),
+        lease_seconds: float = 60.0,
+        poll_interval: float = 2.0,
+        retry_base_delay: float = 5.0
+    ):
+        self.db = db
+        self.storage = storage
+        self.workers = workers
+        # Slot worker khusus per tipe job, agar job ringan tidak antre di belakang export/batch panjang
+        self.dedicated_workers = dict(dedicated_workers or {})
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.worker_id = f"worker-{uuid.uuid4()}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        # Job yang sedang dijalankan proses ini, agar pembatalan bisa langsung diteruskan
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        self._handlers[job_type] = handler
+
+    async def ensure_indexes(self) -> None:
+        await self.db.jobs.create_index("id", unique=True)
+        await self.db.jobs.create_index([("status", 1), ("run_after", 1), ("created_at", 1)])
+        await self.db.jobs.create_index("expires_at")
+
+    async def submit(
+        self,
+        job_type: str,
+        params: Dict[str, Any],
+        created_by: str,
+        max_attempts: Optional[int] = None
+    ) -> Dict[str, Any]:
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = _now()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "params": params,
+            "status": "queued",
+            "progress": {"current": 0, "total": 0, "message": None},
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "cancel_requested": False,
+            "result": None,
+            "result_file": None,
+            "error": None,
+            "error_status_code": None,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "run_after": now,
+            "created_by": created_by,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None
+        }
+        await self.db.jobs.insert_one(dict(job))
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Batalkan job di antrean langsung; job yang sedang berjalan ditandai lalu dihentikan"""
+        now = _now()
+        job = await self.db.jobs.find_one_and_update(
+            {"id": job_id, "status": "queued"},
+            {"$set": {
+                "status": "cancelled",
+                "cancel_requested": True,
+                "finished_at": now,
+                "expires_at": _now() + self.retention
+            }},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            return job
+        job = await self.db.jobs.find_one_and_update(
+            {"id": job_id, "status": "running"},
+            {"$set": {"cancel_requested": True}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            return await self.get(job_id)
+        runner = self._running.get(job_id)
+        if runner is not None:
+            runner.cancel()
+        return job
+
+    # ---------- worker pool ----------
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self.requeue_expired()
+        for _ in range(self.workers):
+            self._spawn(self._worker_loop())
+        for job_type, count in self.dedicated_workers.items():
+            for _ in range(count):
+                self._spawn(self._worker_loop([job_type]))
+        self._spawn(self._maintenance_loop())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Job yang terputus di sini akan diambil lagi setelah lease-nya habis
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _claim(self, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        now = _now()
+        query: Dict[str, Any] = {"status": "queued", "run_after": {"$lte": now}}
+        if job_types:
+            query["type"] = {"$in": job_types}
+        job = await self.db.jobs.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job is not None:
+            job.pop("_id", None)
+        return job
+
+    async def _worker_loop(self, job_types: Optional[List[str]] = None) -> None:
+        while not self._stopping:
+            try:
+                job = await self._claim(job_types)
+            except Exception as e:
+                logging.error(f"Job worker failed to claim job: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(job)
+
+    async def _heartbeat(self, job_id: str, runner: asyncio.Task) -> None:
+        while not runner.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            job = await self.db.jobs.find_one_and_update(
+                {"id": job_id, "worker_id": self.worker_id, "status": "running"},
+                {"$set": {"lease_expires_at": _now() + timedelta(seconds=self.lease_seconds)}},
+                projection={"_id": 0, "cancel_requested": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None or job.get("cancel_requested"):
+                runner.cancel()
+                return
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        handler = self._handlers.get(job["type"])
+        if handler is None:
+            await self._finish(job, "failed", error=f"Unknown job type: {job['type']}")
+            return
+
+        runner = asyncio.create_task(handler(JobContext(self, job)))
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"], runner))
+        self._running[job["id"]] = runner
+        try:
+            result = await runner
+        except (asyncio.CancelledError, JobCancelledError):
+            if self._stopping:
+                raise
+            await self._finish(job, "cancelled", error="Cancelled by user")
+        except HTTPException as e:
+            if e.status_code >= 500 and job["attempts"] < job["max_attempts"]:
+                await self._retry(job, str(e.detail))
+            else:
+                await self._finish(job, "failed", error=str(e.detail), error_status_code=e.status_code)
+        except Exception as e:
+            logging.error(f"Job {job['id']} ({job['type']}) failed: {str(e)}")
+            if job["attempts"] < job["max_attempts"]:
+                await self._retry(job, str(e))
+            else:
+                await self._finish(job, "failed", error=str(e), error_status_code=500)
+        else:
+            await self._finish(job, "completed", result=result)
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job["id"], None)
+
+    async def _retry(self, job: Dict[str, Any], error: str) -> None:
+        delay = self.retry_base_delay * (2 ** (job["attempts"] - 1)) + random.uniform(0, self.retry_base_delay)
+        logging.warning(f"Job {job['id']} ({job['type']}) failed (attempt {job['attempts']}), retrying in {delay:.1f}s: {error}")
+        await self.db.jobs.update_one(
+            {"id": job["id"], "worker_id": self.worker_id},
+            {"$set": {
+                "status": "queued",
+                "error": error,
+                "worker_id": None,
+                "lease_expires_at": None,
+                "run_after": _now() + timedelta(seconds=delay)
+            }}
+        )
+
+    async def _finish(self, job: Dict[str, Any], status: str, result: Optional[Dict[str, Any]] = None,
+                      error: Optional[str] = None, error_status_code: Optional[int] = None) -> None:
+        result = result or {}
+        now = _now()
+        await self.db.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {
+                "status": status,
+                "result": result.get("data"),
+                "result_file": result.get("file"),
+                "error": error,
+                "error_status_code": error_status_code,
+                "lease_expires_at": None,
+                "finished_at": now,
+                "expires_at": now + self.retention
+            }}
+        )
+
+    # ---------- recovery dan retensi ----------
+
+    async def requeue_expired(self) -> int:
+        """Kembalikan job yang worker-nya hilang ke antrean (atau gagalkan jika percobaan habis)"""
+        now = _now()
+        expired = {"status": "running", "lease_expires_at": {"$lt": now}}
+        failed = await self.db.jobs.update_many(
+            {**expired, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {"$set": {
+                "status": "failed",
+                "error": "Worker stopped while running the job",
+                "finished_at": now,
+                "expires_at": _now() + self.retention
+            }}
+        )
+        requeued = await self.db.jobs.update_many(
+            expired,
+            {"$set": {"status": "queued", "worker_id": None, "lease_expires_at": None, "run_after": now}}
+        )
+        if requeued.modified_count or failed.modified_count:
+            logging.warning(f"Recovered {requeued.modified_count} interrupted jobs, {failed.modified_count} failed")
+            self._wakeup.set()
+        return requeued.modified_count
+
+    async def purge_expired(self) -> int:
+        """Hapus job selesai yang melewati masa retensi beserta file hasilnya"""
+        purged = 0
+        expired = {"status": {"$in": list(TERMINAL_STATUSES)}, "expires_at": {"$lt": _now()}}
+        async for job in self.db.jobs.find(expired, {"_id": 0, "id": 1, "result_file": 1}):
+            if job.get("result_file"):
+                try:
+                    await self.storage.delete(job["result_file"]["file_id"])
+                except Exception as e:
+                    logging.warning(f"Failed to delete result file of job {job['id']}: {str(e)}")
+            await self.db.jobs.delete_one({"id": job["id"]})
+            purged += 1
+        return purged
+
+    async def _maintenance_loop(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self.requeue_expired()
+                await self.purge_expired()
+            except Exception as e:
+                logging.error(f"Job maintenance failed: {str(e)}")
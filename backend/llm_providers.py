@@ -0,0 +1,279 @@
+"""
+Lapisan provider LLM untuk analisis klausul.
+
+Semua pemanggilan LLM lewat LLMProvider.complete(LLMRequest) sehingga model,
+timeout dan backend bisa diganti lewat environment tanpa menyentuh alur
+analisis:
+
+- "emergent": emergentintegrations LlmChat (perilaku lama; provider/model
+  mengikuti LLM_MODEL_PROVIDER dan LLM_MODEL).
+- "gemini": REST API Gemini langsung lewat satu httpx.AsyncClient bersama
+  (koneksi dipakai ulang antar request) dengan output JSON yang dibatasi
+  schema jawaban.
+- "stub": provider lokal deterministik tanpa jaringan; mensimulasikan latensi
+  dan bentuk jawaban untuk benchmark throughput di mesin offline.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import httpx
+
+
+class Attachment(NamedTuple):
+    """Lampiran evidence: isi di memori (`data`) atau file sementara (`path`)"""
+    mime_type: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+
+    async def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        return await asyncio.to_thread(Path(self.path).read_bytes)
+
+    async def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return (await asyncio.to_thread(Path(self.path).stat)).st_size
+
+
+class LLMRequest(NamedTuple):
+    system_message: str
+    text: str
+    # Tuple kosong sebagai default: NamedTuple tidak mendukung default_factory
+    attachments: Sequence[Attachment] = ()
+    response_schema: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
+
+
+class LLMProviderError(Exception):
+    """Provider gagal memberi jawaban (HTTP error, jawaban kosong, dsb.)"""
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    def __init__(self, model: str, timeout: float = 120.0):
+        self.model = model
+        self.timeout = timeout
+
+    @property
+    def fingerprint(self) -> str:
+        """Identitas provider/model untuk cache hasil analisis"""
+        return f"{self.name}/{self.model}"
+
+    async def complete(self, request: LLMRequest) -> str:
+        try:
+            return await asyncio.wait_for(self._complete(request), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise LLMProviderError(f"{self.fingerprint} timed out after {self.timeout:.0f}s")
+
+    @abstractmethod
+    async def _complete(self, request: LLMRequest) -> str:
+        """Satu panggilan ke backend LLM; timeout diatur oleh complete()"""
+
+    async def aclose(self) -> None:
+        pass
+
+
+class EmergentProvider(LLMProvider):
+    name = "emergent"
+
+    def __init__(self, api_key: str, model_provider: str, model: str, timeout: float = 120.0):
+        super().__init__(model, timeout)
+        self.api_key = api_key
+        self.model_provider = model_provider
+
+    @property
+    def fingerprint(self) -> str:
+        # Sama dengan identitas sebelum ada lapisan provider agar cache lama tetap berlaku
+        return f"{self.model_provider}/{self.model}"
+
+    async def _complete(self, request: LLMRequest) -> str:
+        from emergentintegrations.llm.chat import FileContentWithMimeType, ImageContent, LlmChat, UserMessage
+
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=request.session_id or f"smk3-{random.getrandbits(64):x}",
+            system_message=request.system_message
+        ).with_model(self.model_provider, self.model)
+
+        file_contents = []
+        for attachment in request.attachments:
+            if attachment.path is None:
+                file_contents.append(ImageContent(image_base64=base64.b64encode(attachment.data).decode('ascii')))
+            else:
+                file_contents.append(FileContentWithMimeType(file_path=attachment.path, mime_type=attachment.mime_type))
+
+        return await chat.send_message(UserMessage(text=request.text, file_contents=file_contents))
+
+
+def _gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Ubah JSON schema ke subset OpenAPI yang diterima responseSchema Gemini"""
+    converted: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == "additionalProperties":
+            continue
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: _gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = _gemini_schema(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        timeout: float = 120.0,
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        max_connections: int = 20
+    ):
+        super().__init__(model, timeout)
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def _complete(self, request: LLMRequest) -> str:
+        parts: List[Dict[str, Any]] = [{"text": request.text}]
+        for attachment in request.attachments:
+            data = await attachment.read()
+            parts.append({"inline_data": {"mime_type": attachment.mime_type, "data": base64.b64encode(data).decode('ascii')}})
+
+        body: Dict[str, Any] = {
+            "systemInstruction": {"parts": [{"text": request.system_message}]},
+            "contents": [{"role": "user", "parts": parts}],
+        }
+        if request.response_schema:
+            body["generationConfig"] = {
+                "responseMimeType": "application/json",
+                "responseSchema": _gemini_schema(request.response_schema),
+            }
+
+        response = await self._client.post(
+            f"{self.base_url}/models/{self.model}:generateContent",
+            headers={"x-goog-api-key": self.api_key},
+            json=body
+        )
+        if response.status_code >= 400:
+            raise LLMProviderError(f"Gemini API error {response.status_code}: {response.text[:500]}")
+
+        try:
+            candidate = response.json()["candidates"][0]
+            return "".join(part.get("text", "") for part in candidate["content"]["parts"])
+        except (KeyError, IndexError, ValueError):
+            raise LLMProviderError(f"Unexpected Gemini response: {response.text[:500]}")
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class StubProvider(LLMProvider):
+    """Jawaban deterministik dari hash isi request; tidak ada jaringan sama sekali.
+
+    `shape` meniru variasi format jawaban model: "json", "fenced" (JSON dalam
+    code fence), "text" (format label lama) atau "mixed" (bergantian per request).
+    """
+
+    name = "stub"
+    SHAPES = ("json", "fenced", "text")
+
+    def __init__(
+        self,
+        model: str = "stub-1",
+        timeout: float = 120.0,
+        latency_ms: float = 800.0,
+        jitter_ms: float = 200.0,
+        bytes_per_ms: float = 0.0,
+        shape: str = "json"
+    ):
+        super().__init__(model, timeout)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Simulasi biaya upload/pemrosesan lampiran: tambahan 1 ms per `bytes_per_ms` byte
+        self.bytes_per_ms = bytes_per_ms
+        self.shape = shape
+        self.calls = 0
+
+    async def _complete(self, request: LLMRequest) -> str:
+        self.calls += 1
+        digest = hashlib.sha256()
+        digest.update(request.system_message.encode('utf-8'))
+        digest.update(request.text.encode('utf-8'))
+        attachment_bytes = 0
+        for attachment in request.attachments:
+            size = await attachment.size()
+            attachment_bytes += size
+            digest.update(f"{attachment.mime_type}:{size}".encode('utf-8'))
+        rng = random.Random(digest.hexdigest())
+
+        delay_ms = self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.bytes_per_ms > 0:
+            delay_ms += attachment_bytes / self.bytes_per_ms
+        await asyncio.sleep(max(delay_ms, 0) / 1000)
+
+        score = rng.randint(0, 100)
+        payload = {
+            "status": "Sesuai" if score >= 70 else "Belum Sesuai",
+            "score": score,
+            "reasoning": f"[stub] {len(request.attachments)} lampiran, {len(request.text)} karakter teks dianalisis.",
+            "feedback": "[stub] Dokumen yang tersedia sudah diperiksa.",
+            "improvement_suggestions": "[stub] Lengkapi dokumen yang diminta knowledge base.",
+        }
+
+        shape = self.SHAPES[self.calls % len(self.SHAPES)] if self.shape == "mixed" else self.shape
+        if shape == "fenced":
+            return f"```json\n{json.dumps(payload, ensure_ascii=False, indent=2)}\n```"
+        if shape == "text":
+            return (
+                f"Status: {payload['status']}\nSkor: {score}/100\nAlasan: {payload['reasoning']}\n"
+                f"Feedback Positif: {payload['feedback']}\nSaran Perbaikan: {payload['improvement_suggestions']}"
+            )
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def create_provider(env: Mapping[str, str]) -> LLMProvider:
+    """Bangun provider dari konfigurasi environment (lihat .env.example)"""
+    provider = env.get("LLM_PROVIDER", "emergent").lower()
+    timeout = float(env.get("LLM_TIMEOUT_SECONDS", "120"))
+
+    if provider == "emergent":
+        return EmergentProvider(
+            api_key=env.get("EMERGENT_LLM_KEY", ""),
+            model_provider=env.get("LLM_MODEL_PROVIDER", "gemini"),
+            model=env.get("LLM_MODEL", "gemini-2.0-flash"),
+            timeout=timeout
+        )
+    if provider == "gemini":
+        return GeminiProvider(
+            api_key=env.get("GEMINI_API_KEY") or env.get("EMERGENT_LLM_KEY", ""),
+            model=env.get("LLM_MODEL", "gemini-2.0-flash"),
+            timeout=timeout,
+            max_connections=int(env.get("LLM_MAX_CONNECTIONS", "20"))
+        )
+    if provider == "stub":
+        return StubProvider(
+            model=env.get("LLM_MODEL", "stub-1"),
+            timeout=timeout,
+            latency_ms=float(env.get("LLM_STUB_LATENCY_MS", "800")),
+            jitter_ms=float(env.get("LLM_STUB_JITTER_MS", "200")),
+            bytes_per_ms=float(env.get("LLM_STUB_BYTES_PER_MS", "0")),
+            shape=env.get("LLM_STUB_SHAPE", "json")
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER: {provider}")
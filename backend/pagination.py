@@ -0,0 +1,116 @@
+"""
+Keyset pagination untuk endpoint daftar (kriteria, klausul, dokumen, rekomendasi).
+
+Halaman diurutkan berdasarkan kunci sort yang selalu diakhiri `_id`, lalu
+halaman berikutnya diambil dengan filter "setelah record terakhir" (bukan
+skip/offset), sehingga biaya per halaman tetap walaupun data terus bertambah.
+Cursor halaman berikutnya dikirim di header X-Next-Cursor (body tetap berupa
+list agar client lama tidak berubah) dan diteruskan kembali lewat `?after=`.
+
+`fields` membatasi field yang dikirim (projection MongoDB) ke subset field
+model response.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+from serialization import FastJSONResponse, to_utc
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([str(v) if isinstance(v, ObjectId) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: List[str]) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(sort_keys):
+            raise ValueError("cursor length mismatch")
+        return [ObjectId(v) if key == "_id" else v for key, v in zip(sort_keys, values)]
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after_filter(sort_keys: List[str], values: List[Any]) -> Dict[str, Any]:
+    # (k1, k2, _id) > (v1, v2, id): k1 > v1 ATAU (k1 = v1 DAN k2 > v2) ATAU ...
+    branches = []
+    for i, key in enumerate(sort_keys):
+        branch = {sort_keys[j]: values[j] for j in range(i)}
+        branch[key] = {"$gt": values[i]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def projection_for(allowed: Iterable[str], fields: Optional[str]) -> Dict[str, int]:
+    """Projection untuk `fields` (dipisah koma); default seluruh field model response"""
+    allowed = list(allowed)
+    if not fields:
+        return {field: 1 for field in allowed}
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {field: 1 for field in requested}
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort_keys: List[str],
+    projection: Dict[str, int],
+    limit: int,
+    after: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Satu halaman (urut naik berdasarkan `sort_keys`, diakhiri `_id`) beserta cursor halaman berikutnya"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if after:
+        after_filter = _after_filter(sort_keys, decode_cursor(after, sort_keys))
+        query = {"$and": [query, after_filter]} if query else after_filter
+
+    # Kunci sort ikut diambil untuk cursor, lalu dibuang jika tidak diminta
+    fetch_projection = {**projection, **{key: 1 for key in sort_keys}}
+    docs = await collection.find(query, fetch_projection).sort([(key, 1) for key in sort_keys]).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor([docs[-1].get(key) for key in sort_keys])
+
+    extra = [key for key in sort_keys if key not in projection]
+    for doc in docs:
+        for key in extra:
+            doc.pop(key, None)
+    return docs, next_cursor
+
+
+def page_response(items: List[dict], next_cursor: Optional[str]) -> FastJSONResponse:
+    """Body list (orjson), cursor halaman berikutnya di header"""
+    return FastJSONResponse(items, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+def date_range_filter(start: Optional[str], end: Optional[str]) -> Dict[str, datetime]:
+    """Kondisi range untuk field tanggal (UTC); `end` berupa tanggal saja berlaku sampai akhir hari itu"""
+    condition = {}
+    try:
+        if start:
+            condition["$gte"] = to_utc(start)
+        if end:
+            parsed = to_utc(end)
+            if len(end) == 10:
+                condition["$lt"] = parsed + timedelta(days=1)
+            else:
+                condition["$lte"] = parsed
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    return condition
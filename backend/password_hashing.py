@@ -0,0 +1,87 @@
+"""
+Hashing dan verifikasi password bcrypt di luar event loop.
+
+bcrypt sengaja lambat (~200-300 ms CPU per operasi). Jika dipanggil langsung
+di handler async, satu gelombang login memblokir semua request lain di worker
+yang sama. PasswordHasher menjalankannya di thread pool terbatas (bcrypt
+melepas GIL), membatasi jumlah operasi yang sedang berjalan maupun yang
+mengantre, dan mencatat metrik sederhana.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from passlib.context import CryptContext
+
+
+class PasswordHasherBusyError(Exception):
+    """Antrean hashing penuh; request sebaiknya ditolak sementara (503)"""
+
+
+class PasswordHasher:
+    def __init__(self, context: CryptContext, max_workers: int = 2, max_pending: int = 64):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._pending = 0
+        self._stats = {
+            "hash_calls": 0,
+            "verify_calls": 0,
+            "rejected_calls": 0,
+            "completed_calls": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "total_run_seconds": 0.0,
+            "max_run_seconds": 0.0,
+        }
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        if self._pending >= self.max_pending:
+            self._stats["rejected_calls"] += 1
+            raise PasswordHasherBusyError("Too many concurrent password operations")
+
+        self._pending += 1
+        queued_at = time.perf_counter()
+        try:
+            async with self._semaphore:
+                started_at = time.perf_counter()
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, func, *args)
+                finished_at = time.perf_counter()
+        finally:
+            self._pending -= 1
+
+        self._stats["completed_calls"] += 1
+        wait_seconds = started_at - queued_at
+        run_seconds = finished_at - started_at
+        self._stats["total_wait_seconds"] += wait_seconds
+        self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait_seconds)
+        self._stats["total_run_seconds"] += run_seconds
+        self._stats["max_run_seconds"] = max(self._stats["max_run_seconds"], run_seconds)
+        return result
+
+    async def hash(self, password: str) -> str:
+        self._stats["hash_calls"] += 1
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        self._stats["verify_calls"] += 1
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    def metrics(self) -> Dict[str, Any]:
+        completed = self._stats["completed_calls"]
+        return {
+            **self._stats,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "avg_wait_seconds": self._stats["total_wait_seconds"] / completed if completed > 0 else 0.0,
+            "avg_run_seconds": self._stats["total_run_seconds"] / completed if completed > 0 else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -3,39 +3,20 @@ Script to populate ALL 166 SMK3 audit clauses with specific notes for PLN Nusant
 Based on the complete SMK3 document
 """
 
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-import uuid
-from datetime import datetime, timezone
+import logging
+from typing import Dict
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from seeding import SeedDiff, criteria_ids_by_order, run_cli, seed_clauses
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-async def populate_all_clauses():
+async def populate_all_clauses(db, dry_run: bool = False) -> Dict[str, SeedDiff]:
     """Populate all 166 SMK3 clauses with PLN NP PLTU Tenayan specific requirements"""
     
-    print("Clearing existing clauses...")
-    await db.clauses.delete_many({})
-    
-    # Get all criteria
-    criteria_list = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    
-    if not criteria_list:
-        print("ERROR: No criteria found! Please seed criteria first.")
-        return
-    
     # Map criteria by order
-    criteria_map = {c['order']: c['id'] for c in criteria_list}
+    criteria_map = await criteria_ids_by_order(db)
     
-    print(f"Found {len(criteria_list)} criteria")
-    print("Starting to populate 166 clauses...")
+    if not criteria_map:
+        logging.error("No criteria found, seed criteria first")
+        return {}
     
     # ALL 166 CLAUSES WITH DETAILED NOTES
     all_clauses = [
@@ -790,15 +771,13 @@ async def populate_all_clauses():
         # Karena keterbatasan space, saya akan membuat bagian kedua
     ]
     
-    print(f"Total clauses to insert: {len(all_clauses)}")
-    
-    # Insert all clauses
-    inserted_count = 0
+    # Upsert semua clauses dalam satu bulk_write (keyed on clause_number)
+    clause_records = []
     for clause_data in all_clauses:
         criteria_id = criteria_map.get(clause_data['criteria_order'])
         
         if not criteria_id:
-            print(f"Warning: No criteria found for order {clause_data['criteria_order']}")
+            logging.warning(f"No criteria found for order {clause_data['criteria_order']}")
             continue
         
         # Create knowledge base from description and catatan
@@ -819,26 +798,16 @@ CATATAN KHUSUS:
 Ini adalah persyaratan spesifik untuk PLN Nusantara Power (sebelumnya PJB) PLTU Tenayan. Pastikan semua dokumen mengacu pada struktur organisasi dan prosedur PLN Nusantara Power yang terbaru.
 """
         
-        clause_doc = {
-            "id": str(uuid.uuid4()),
+        clause_records.append({
             "criteria_id": criteria_id,
             "clause_number": clause_data['clause_number'],
             "title": clause_data['title'],
             "description": clause_data['description'],
-            "knowledge_base": knowledge_base.strip(),
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        await db.clauses.insert_one(clause_doc)
-        inserted_count += 1
-        
-        if inserted_count % 10 == 0:
-            print(f"  Inserted {inserted_count} clauses...")
+            "knowledge_base": knowledge_base.strip()
+        })
     
-    print(f"\n✅ Successfully inserted {inserted_count} clauses!")
-    print(f"Total criteria: {await db.criteria.count_documents({})}")
-    print(f"Total clauses: {await db.clauses.count_documents({})}")
+    diff = await seed_clauses(db, clause_records, dry_run)
+    return {"Clauses": diff}
 
 if __name__ == "__main__":
-    asyncio.run(populate_all_clauses())
-    client.close()
+    run_cli(populate_all_clauses, "Populate all 166 SMK3 clauses (PLN NP PLTU Tenayan)")
@@ -3,30 +3,12 @@ Script to populate SMK3 audit criteria and clauses with knowledge base
 Based on the official SMK3 audit document
 """
 
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+from typing import Dict
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from seeding import SeedDiff, criteria_ids_by_order, run_cli, seed_clauses, seed_criteria
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-import uuid
-from datetime import datetime, timezone
-
-async def populate_data():
-    """Populate SMK3 criteria and clauses with knowledge base"""
-    
-    # Clear existing data
-    await db.criteria.delete_many({})
-    await db.clauses.delete_many({})
-    
-    print("Starting SMK3 data population...")
+async def populate_data(db, dry_run: bool = False) -> Dict[str, SeedDiff]:
+    """Populate SMK3 criteria and clauses with knowledge base (upsert, ID yang sudah ada dipertahankan)"""
     
     # Define 12 SMK3 Criteria with their clauses
     smk3_data = [
@@ -338,37 +320,19 @@ async def populate_data():
         }
     ]
     
-    # Insert criteria and clauses
-    for item in smk3_data:
-        # Create criteria
-        criteria_doc = {
-            "id": str(uuid.uuid4()),
-            "name": item["criteria"]["name"],
-            "description": item["criteria"]["description"],
-            "order": item["criteria"]["order"],
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.criteria.insert_one(criteria_doc)
-        print(f"✓ Created criteria {criteria_doc['order']}: {criteria_doc['name']}")
-        
-        # Create clauses for this criteria
-        for clause in item["clauses"]:
-            clause_doc = {
-                "id": str(uuid.uuid4()),
-                "criteria_id": criteria_doc["id"],
-                "clause_number": clause["clause_number"],
-                "title": clause["title"],
-                "description": clause["description"],
-                "knowledge_base": clause["knowledge_base"],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            await db.clauses.insert_one(clause_doc)
-            print(f"  ✓ Created clause {clause_doc['clause_number']}: {clause_doc['title']}")
+    # Upsert criteria (keyed on order), lalu semua clauses sekaligus (keyed on clause_number)
+    criteria = [item["criteria"] for item in smk3_data]
+    criteria_diff = await seed_criteria(db, criteria, dry_run)
     
-    print(f"\n✅ Successfully populated {len(smk3_data)} criteria with their clauses and knowledge base!")
-    print(f"Total criteria: {await db.criteria.count_documents({})}")
-    print(f"Total clauses: {await db.clauses.count_documents({})}")
+    # Saat dry run kriteria baru belum tertulis; tandai klausulnya alih-alih criteria_id None
+    criteria_map = await criteria_ids_by_order(db, criteria if dry_run else None)
+    clause_records = [
+        {**clause, "criteria_id": criteria_map.get(item["criteria"]["order"])}
+        for item in smk3_data
+        for clause in item["clauses"]
+    ]
+    clause_diff = await seed_clauses(db, clause_records, dry_run)
+    return {"Criteria": criteria_diff, "Clauses": clause_diff}
 
 if __name__ == "__main__":
-    asyncio.run(populate_data())
-    client.close()
+    run_cli(populate_data, "Populate SMK3 criteria and clauses with knowledge base")
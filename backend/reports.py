@@ -0,0 +1,433 @@
+"""
+Pembuatan laporan audit PDF.
+
+Laporan dirakit dari potongan PDF yang dirender terpisah:
+
+- Halaman depan (ringkasan dan tabel skor per kriteria) selalu dirender ulang;
+  kecil dan angkanya dibaca dari materialized view dashboard_summary.
+- Detail hasil audit dirender per kriteria sebagai fragmen PDF yang disimpan
+  di GridFS (koleksi `report_fragments`, satu record per criteria_id).
+  Versi fragmen adalah hash isi yang dirender (nama kriteria, klausul dan
+  hasil auditnya), jadi fragmen hanya dirender ulang jika isinya berubah,
+  bukan karena restart atau refresh summary. Fragmen lain dipakai ulang lalu
+  semua halaman digabung dengan pypdf.
+
+File fragmen dan laporan yang diganti tidak langsung dihapus karena job
+laporan lain mungkin masih membacanya: file baru selalu ditulis dengan id
+baru, referensinya ditukar dalam satu update, dan file lama dicatat di
+`retired_report_files` lalu dihapus setelah RETIRED_FILE_GRACE lewat.
+
+Layout ReportLab dan penggabungan PDF yang CPU-bound dijalankan di thread
+terpisah agar event loop tidak tertahan.
+
+PDF hasil akhir terakhir juga disimpan (koleksi `report_cache`) bersama versi
+seluruh data audit dan tanggal laporan; selama versi sama laporan dipakai ulang
+tanpa dirakit ulang. Versi itu adalah hash tanggal laporan, angka dashboard
+dan versi semua fragmen.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pymongo import ReturnDocument
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from dashboard import ORPHAN_SUMMARY_ID, read_dashboard
+from storage import EvidenceStorage
+
+REPORT_CACHE_ID = "latest"
+REPORT_MIME_TYPE = "application/pdf"
+# Naikkan jika layout fragmen berubah agar semua fragmen dirender ulang
+FRAGMENT_LAYOUT_VERSION = 1
+CLAUSE_PROJECTION = {"_id": 0, "id": 1, "criteria_id": 1, "clause_number": 1, "title": 1}
+# File laporan/fragmen yang diganti baru dihapus setelah ini (job laporan yang sedang berjalan selesai dulu)
+RETIRED_FILE_GRACE = timedelta(hours=1)
+
+AUDITOR_STATUS_LABELS = {
+    'confirm': '✓ Confirm (Sesuai)',
+    'non-confirm-minor': '⚠ Non-Confirm Minor',
+    'non-confirm-major': '✗ Non-Confirm Major'
+}
+
+
+def report_date(generated_at: datetime) -> str:
+    return generated_at.strftime('%d %B %Y')
+
+
+# ============= RENDER (SINKRON, DIPANGGIL LEWAT asyncio.to_thread) =============
+
+def _report_styles():
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=30,
+        alignment=1
+    )
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=12
+    )
+    return styles, title_style, heading_style
+
+
+def _build_pdf(story: list) -> bytes:
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(story)
+    return buffer.getvalue()
+
+
+def render_summary_pdf(dashboard: Dict[str, Any], generated_at: datetime) -> bytes:
+    """Halaman depan: ringkasan audit dan tabel skor per kriteria"""
+    styles, title_style, heading_style = _report_styles()
+    story = []
+
+    story.append(Paragraph("Laporan Audit SMK3", title_style))
+    story.append(Paragraph(f"Tanggal: {report_date(generated_at)}", styles['Normal']))
+    story.append(Spacer(1, 0.3*inch))
+
+    story.append(Paragraph("Ringkasan Audit", heading_style))
+    summary_data = [
+        ['Metrik', 'Nilai'],
+        ['Total Klausul', str(dashboard['total_clauses'])],
+        ['Klausul Teraudit', str(dashboard['audited_clauses'])],
+        ['Klausul Dinilai Auditor', str(dashboard['auditor_assessed_clauses'])],
+        ['', ''],
+        ['Pencapaian Audit (Auditor)', f"{dashboard['achievement_percentage']:.1f}%"],
+        ['Klausul Confirm', str(dashboard['confirm_count'])],
+        ['Klausul Non-Confirm Minor', str(dashboard['non_confirm_minor_count'])],
+        ['Klausul Non-Confirm Major', str(dashboard['non_confirm_major_count'])],
+        ['', ''],
+        ['Rata-rata Skor AI (Referensi)', f"{dashboard['average_score']:.2f}"]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    story.append(summary_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    story.append(Paragraph("Skor Per Kriteria", heading_style))
+    criteria_data = [['Kriteria', 'Pencapaian', 'Confirm', 'Status', 'Progress']]
+
+    for cs in dashboard['criteria_scores']:
+        strength = "Memuaskan" if cs['strength'] == 'strong' else "Baik" if cs['strength'] == 'moderate' else "Kurang"
+        progress = f"{cs['audited_clauses']}/{cs['total_clauses']}"
+        achievement = f"{cs['achievement_percentage']:.1f}%"
+        confirm_info = f"{cs.get('confirm_count', 0)}"
+
+        criteria_data.append([
+            cs['name'],
+            achievement,
+            confirm_info,
+            strength,
+            progress
+        ])
+
+    criteria_table = Table(criteria_data, colWidths=[2*inch, 1*inch, 0.8*inch, 1*inch, 0.9*inch])
+    criteria_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+    ]))
+
+    story.append(criteria_table)
+    return _build_pdf(story)
+
+
+def render_criteria_fragment(criteria_name: str, entries: List[tuple]) -> bytes:
+    """Detail hasil audit satu kriteria dari pasangan (klausul, hasil audit); mulai di halaman baru"""
+    styles, _, heading_style = _report_styles()
+    story = [Paragraph(f"Detail Hasil Audit: {criteria_name}", heading_style)]
+
+    for clause, result in entries:
+        story.append(Paragraph(f"<b>Klausul {clause['clause_number']}: {clause['title']}</b>", styles['Normal']))
+
+        # Penilaian Auditor (jika ada)
+        if result.get('auditor_status'):
+            status_text = AUDITOR_STATUS_LABELS.get(result['auditor_status'], result['auditor_status'])
+            story.append(Paragraph(f"<b>Penilaian Auditor:</b> {status_text}", styles['Normal']))
+
+            if result.get('auditor_notes'):
+                story.append(Paragraph(f"<b>Catatan Auditor:</b> {result['auditor_notes']}", styles['Normal']))
+
+            if result.get('agreed_date'):
+                try:
+                    agreed_date = result['agreed_date']
+                    if isinstance(agreed_date, str):
+                        agreed_date = datetime.fromisoformat(agreed_date)
+                    date_str = agreed_date.strftime('%d %B %Y')
+                except (TypeError, ValueError):
+                    date_str = result['agreed_date']
+                story.append(Paragraph(f"<b>Tanggal Kesepakatan:</b> {date_str}", styles['Normal']))
+
+        # AI Analysis (referensi)
+        story.append(Paragraph("<b>Analisis AI (Referensi):</b>", styles['Normal']))
+        story.append(Paragraph(f"Status: {result['status']} | Skor: {result['score']:.2f}", styles['Normal']))
+        story.append(Paragraph(f"Reasoning: {result['reasoning'][:150]}...", styles['Normal']))
+        story.append(Spacer(1, 0.2*inch))
+
+    return _build_pdf(story)
+
+
+def assemble_report_pdf(parts: List[bytes]) -> bytes:
+    """Gabungkan halaman depan dan fragmen kriteria menjadi satu PDF"""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+# ============= FRAGMEN PER KRITERIA =============
+
+def _clause_sort_key(clause: dict):
+    # "1.10.2" setelah "1.9.1": bandingkan per bagian angka
+    return [
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in str(clause.get('clause_number', '')).split('.')
+    ]
+
+
+def _content_hash(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def fragment_version(criteria_name: str, entries: List[tuple]) -> str:
+    """Hash semua field yang dipakai render_criteria_fragment"""
+    return _content_hash({
+        "layout": FRAGMENT_LAYOUT_VERSION,
+        "name": criteria_name,
+        "entries": [
+            [
+                clause.get('clause_number'), clause.get('title'),
+                result.get('auditor_status'), result.get('auditor_notes'), result.get('agreed_date'),
+                result.get('status'), result.get('score'), (result.get('reasoning') or "")[:150],
+            ]
+            for clause, result in entries
+        ],
+    })
+
+
+async def load_criteria_entries(db, criteria_ids: List[str]) -> Dict[str, List[tuple]]:
+    """Pasangan (klausul, hasil audit) per criteria_id urut nomor klausul; dua query untuk semua kriteria"""
+    clauses = await db.clauses.find({"criteria_id": {"$in": criteria_ids}}, CLAUSE_PROJECTION).to_list(None)
+    results = await db.audit_results.find(
+        {"clause_id": {"$in": [clause['id'] for clause in clauses]}},
+        {"_id": 0}
+    ).to_list(None)
+    results_by_clause = {result['clause_id']: result for result in results}
+
+    entries: Dict[str, List[tuple]] = {criteria_id: [] for criteria_id in criteria_ids}
+    for clause in sorted(clauses, key=_clause_sort_key):
+        result = results_by_clause.get(clause['id'])
+        if result:
+            entries[clause['criteria_id']].append((clause, result))
+    return entries
+
+
+class FragmentSpec(NamedTuple):
+    criteria_id: str
+    name: str
+    entries: List[tuple]
+    version: str
+
+
+class ReportInputs(NamedTuple):
+    dashboard: Dict[str, Any]
+    fragments: List[FragmentSpec]
+
+
+async def load_report_inputs(db) -> ReportInputs:
+    """Angka dashboard dan isi fragmen per kriteria (urut tabel kriteria) untuk satu laporan"""
+    dashboard = await read_dashboard(db)
+
+    # Urutan fragmen mengikuti tabel kriteria; klausul yang kriterianya sudah dihapus di akhir
+    order = {cs['id']: index for index, cs in enumerate(dashboard['criteria_scores'])}
+    rows = await db.dashboard_summary.find(
+        {"_id": {"$ne": ORPHAN_SUMMARY_ID}, "audited_clauses": {"$gt": 0}},
+        {"_id": 1, "name": 1}
+    ).to_list(None)
+    rows.sort(key=lambda row: order.get(row["_id"], len(order)))
+
+    entries = await load_criteria_entries(db, [row["_id"] for row in rows])
+    fragments = []
+    for row in rows:
+        name = row.get("name") or "Tanpa Kriteria"
+        fragments.append(FragmentSpec(row["_id"], name, entries[row["_id"]], fragment_version(name, entries[row["_id"]])))
+    return ReportInputs(dashboard, fragments)
+
+
+def report_version(inputs: ReportInputs, generated_at: datetime) -> str:
+    """Hash tanggal laporan, angka dashboard dan versi semua fragmen"""
+    return _content_hash({
+        "date": report_date(generated_at),
+        "dashboard": inputs.dashboard,
+        "fragments": [[spec.criteria_id, spec.version] for spec in inputs.fragments],
+    })
+
+
+async def _delete_file(storage: EvidenceStorage, file_id: str) -> None:
+    try:
+        await storage.delete(file_id)
+    except Exception as e:
+        logging.warning(f"Failed to delete report file {file_id}: {str(e)}")
+
+
+async def _retire_file(db, file_id: str) -> None:
+    """Tandai file yang baru saja diganti; dihapus nanti oleh collect_retired_files"""
+    await db.retired_report_files.insert_one({"file_id": file_id, "retired_at": datetime.now(timezone.utc)})
+
+
+async def collect_retired_files(db, storage: EvidenceStorage, grace: timedelta = RETIRED_FILE_GRACE) -> int:
+    """Hapus file laporan/fragmen yang sudah diganti lebih lama dari `grace`"""
+    collected = 0
+    cutoff = datetime.now(timezone.utc) - grace
+    async for record in db.retired_report_files.find({"retired_at": {"$lt": cutoff}}):
+        await _delete_file(storage, record["file_id"])
+        await db.retired_report_files.delete_one({"_id": record["_id"]})
+        collected += 1
+    return collected
+
+
+async def _read_fragment(storage: EvidenceStorage, record: dict) -> Optional[bytes]:
+    try:
+        grid_out = await storage.open(record["file_id"])
+        return await grid_out.read()
+    except Exception as e:
+        # Mis. sudah dihapus collect_retired_files setelah diganti job lain: render ulang
+        logging.warning(f"Report fragment {record['_id']} is unreadable, rendering it again: {str(e)}")
+        return None
+
+
+async def _render_fragment(db, storage: EvidenceStorage, spec: FragmentSpec) -> bytes:
+    pdf_data = await asyncio.to_thread(render_criteria_fragment, spec.name, spec.entries)
+    # Selalu file baru; file lama tetap utuh untuk job yang mungkin sedang menggabungkannya
+    file_id = await storage.put(pdf_data, f"report-fragment-{spec.criteria_id}.pdf", REPORT_MIME_TYPE)
+    previous = await db.report_fragments.find_one_and_update(
+        {"_id": spec.criteria_id},
+        {"$set": {"version": spec.version, "file_id": str(file_id)}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous and previous.get("file_id"):
+        await _retire_file(db, previous["file_id"])
+    return pdf_data
+
+
+async def refresh_fragments(db, storage: EvidenceStorage, specs: List[FragmentSpec]) -> Dict[str, bytes]:
+    """Render ulang fragmen yang isinya berubah; return isi PDF semua fragmen per criteria_id"""
+    cached = {
+        record["_id"]: record
+        for record in await db.report_fragments.find({"_id": {"$in": [spec.criteria_id for spec in specs]}}).to_list(None)
+    }
+
+    fragments: Dict[str, bytes] = {}
+    for spec in specs:
+        record = cached.get(spec.criteria_id)
+        pdf_data = None
+        if record is not None and record.get("version") == spec.version:
+            pdf_data = await _read_fragment(storage, record)
+        if pdf_data is None:
+            pdf_data = await _render_fragment(db, storage, spec)
+        fragments[spec.criteria_id] = pdf_data
+    return fragments
+
+
+async def purge_stale_fragments(db, keep_ids: List[str]) -> None:
+    """Lepas fragmen kriteria yang sudah dihapus atau tidak lagi punya hasil audit"""
+    async for record in db.report_fragments.find({"_id": {"$nin": keep_ids}}):
+        result = await db.report_fragments.delete_one({"_id": record["_id"], "file_id": record["file_id"]})
+        if result.deleted_count:
+            await _retire_file(db, record["file_id"])
+
+
+async def build_report_pdf(
+    db,
+    storage: EvidenceStorage,
+    generated_at: Optional[datetime] = None,
+    inputs: Optional[ReportInputs] = None
+) -> bytes:
+    """Render halaman depan, ambil/perbarui fragmen per kriteria, lalu gabungkan"""
+    generated_at = generated_at or datetime.now(timezone.utc)
+    inputs = inputs or await load_report_inputs(db)
+    await collect_retired_files(db, storage)
+
+    fragments = await refresh_fragments(db, storage, inputs.fragments)
+    await purge_stale_fragments(db, [spec.criteria_id for spec in inputs.fragments])
+
+    summary = await asyncio.to_thread(render_summary_pdf, inputs.dashboard, generated_at)
+    return await asyncio.to_thread(
+        assemble_report_pdf,
+        [summary] + [fragments[spec.criteria_id] for spec in inputs.fragments]
+    )
+
+
+# ============= CACHE LAPORAN TERAKHIR =============
+
+async def get_cached_report(db, version: str) -> Optional[Dict[str, Any]]:
+    """Record laporan tersimpan jika versinya masih sama dengan data audit saat ini"""
+    cached = await db.report_cache.find_one({"_id": REPORT_CACHE_ID, "version": version})
+    if cached is None:
+        return None
+    cached.pop("_id")
+    return cached
+
+
+async def store_cached_report(
+    db,
+    storage: EvidenceStorage,
+    version: str,
+    pdf_data: bytes,
+    filename: str
+) -> Dict[str, Any]:
+    """Simpan PDF sebagai laporan terakhir; file laporan sebelumnya dipensiunkan"""
+    file_id = await storage.put(pdf_data, filename, REPORT_MIME_TYPE)
+    record = {
+        "version": version,
+        "file_id": str(file_id),
+        "filename": filename,
+        "mime_type": REPORT_MIME_TYPE,
+        "size": len(pdf_data),
+        "sha256": hashlib.sha256(pdf_data).hexdigest(),
+        "created_at": datetime.now(timezone.utc),
+    }
+    previous = await db.report_cache.find_one_and_replace(
+        {"_id": REPORT_CACHE_ID},
+        {"_id": REPORT_CACHE_ID, **record},
+        upsert=True
+    )
+    if previous and previous.get("file_id"):
+        await _retire_file(db, previous["file_id"])
+    return record
@@ -0,0 +1,166 @@
+"""
+Seeding katalog kriteria dan klausul SMK3 secara idempotent.
+
+Dipakai bersama oleh populate_smk3_data.py, populate_all_166_clauses.py dan
+add_remaining_61_clauses.py (serta route /seed-data). Data tidak lagi dihapus
+lalu di-insert ulang: setiap record di-upsert berdasarkan kunci alaminya
+(`order` untuk kriteria, `clause_number` untuk klausul) dalam satu
+`bulk_write`, sehingga `id` yang sudah ada, beserta dokumen, hasil audit dan
+rekomendasi yang menunjuk ke id tersebut, tetap utuh. Hanya field katalog yang
+berubah yang ditulis; hasilnya dikembalikan sebagai diff (baru / berubah / sama)
+per label, mis. {"Criteria": ..., "Clauses": ...}.
+
+Fungsi populate tidak mencetak apa pun; route /seed-data mencatat diff di log
+dan mengembalikan jumlahnya, sedangkan run_cli mencetaknya di terminal. Script
+populate menerima `--dry-run` untuk melihat diff tanpa menulis.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from pymongo import UpdateOne
+
+CRITERIA_SEED_FIELDS = ("name", "description")
+CLAUSE_SEED_FIELDS = ("criteria_id", "title", "description", "knowledge_base")
+# criteria_id sementara saat dry run, untuk kriteria yang baru akan dibuat
+NEW_CRITERION_ID = "(new criterion)"
+
+
+class SeedDiff(NamedTuple):
+    inserted: List[str]
+    # kunci -> field katalog yang berubah
+    updated: Dict[str, List[str]]
+    unchanged: List[str]
+    # kunci yang sudah lebih dari sekali ada di database (hanya record pertama yang di-update)
+    duplicates: List[str]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "inserted": len(self.inserted),
+            "updated": len(self.updated),
+            "unchanged": len(self.unchanged),
+            "duplicates": len(self.duplicates),
+        }
+
+    def format(self, label: str) -> str:
+        lines = [
+            f"{label}: {len(self.inserted)} baru, {len(self.updated)} berubah, "
+            f"{len(self.unchanged)} sama"
+        ]
+        lines += [f"  + {key}" for key in self.inserted]
+        lines += [f"  ~ {key} ({', '.join(fields)})" for key, fields in self.updated.items()]
+        if self.duplicates:
+            lines.append(f"  ! duplikat di database: {', '.join(self.duplicates)}")
+        return "\n".join(lines)
+
+
+async def upsert_by_key(collection, key: str, records: List[dict], fields: tuple, dry_run: bool = False) -> SeedDiff:
+    """Upsert `records` berdasarkan `key` dalam satu bulk_write; id dan created_at hanya diisi untuk record baru"""
+    # Record katalog dengan kunci sama: yang terakhir berlaku
+    by_key = {record[key]: record for record in records}
+
+    existing: Dict[str, dict] = {}
+    duplicates = []
+    projection = {"_id": 0, key: 1, **{field: 1 for field in fields}}
+    async for doc in collection.find({key: {"$in": list(by_key)}}, projection):
+        if doc[key] in existing:
+            duplicates.append(str(doc[key]))
+        else:
+            existing[doc[key]] = doc
+
+    diff = SeedDiff([], {}, [], duplicates)
+    operations = []
+    now = datetime.now(timezone.utc)
+    for value, record in by_key.items():
+        values = {field: record[field] for field in fields}
+        current = existing.get(value)
+        if current is None:
+            diff.inserted.append(str(value))
+            operations.append(UpdateOne(
+                {key: value},
+                {"$set": values, "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}},
+                upsert=True
+            ))
+            continue
+
+        changed = [field for field in fields if current.get(field) != values[field]]
+        if changed:
+            diff.updated[str(value)] = changed
+            operations.append(UpdateOne({key: value}, {"$set": {field: values[field] for field in changed}}))
+        else:
+            diff.unchanged.append(str(value))
+
+    if operations and not dry_run:
+        await collection.bulk_write(operations, ordered=False)
+    return diff
+
+
+async def seed_criteria(db, criteria: List[dict], dry_run: bool = False) -> SeedDiff:
+    """Upsert kriteria berdasarkan `order`"""
+    return await upsert_by_key(db.criteria, "order", criteria, CRITERIA_SEED_FIELDS, dry_run)
+
+
+async def seed_clauses(db, clauses: List[dict], dry_run: bool = False) -> SeedDiff:
+    """Upsert klausul berdasarkan `clause_number`; setiap record harus sudah berisi criteria_id"""
+    return await upsert_by_key(db.clauses, "clause_number", clauses, CLAUSE_SEED_FIELDS, dry_run)
+
+
+async def criteria_ids_by_order(db, planned: Optional[List[dict]] = None) -> Dict[int, str]:
+    """Peta order -> id kriteria; `planned` (dry run) = kriteria yang belum ditulis, diberi NEW_CRITERION_ID"""
+    criteria_list = await db.criteria.find({}, {"_id": 0, "id": 1, "order": 1}).to_list(None)
+    ids = {c['order']: c['id'] for c in criteria_list}
+    for criteria in planned or []:
+        ids.setdefault(criteria['order'], NEW_CRITERION_ID)
+    return ids
+
+
+async def print_seed_report(db, diffs: Dict[str, SeedDiff]) -> None:
+    for label, diff in diffs.items():
+        print(diff.format(label))
+
+    criteria_list = await db.criteria.find({}, {"_id": 0, "id": 1, "order": 1, "name": 1}).sort("order", 1).to_list(None)
+    print(f"\nTotal criteria: {len(criteria_list)}")
+    print(f"Total clauses: {await db.clauses.count_documents({})}")
+    for c in criteria_list:
+        count = await db.clauses.count_documents({'criteria_id': c['id']})
+        print(f"  Kriteria {c['order']}: {count} klausul - {c['name']}")
+
+
+def run_cli(populate: Callable[..., Awaitable[Dict[str, SeedDiff]]], description: str) -> None:
+    """Entry point script populate: koneksi dari .env, opsi --dry-run, cetak diff, rebuild dashboard jika ada perubahan"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--dry-run", action="store_true", help="tampilkan diff tanpa menulis ke database")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from dashboard import rebuild_dashboard_summary
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db = client[os.environ['DB_NAME']]
+        try:
+            diffs = await populate(db, dry_run=args.dry_run)
+            await print_seed_report(db, diffs)
+            if args.dry_run:
+                print("\n(dry run: tidak ada perubahan yang ditulis)")
+            elif any(diff.changed for diff in diffs.values()):
+                await rebuild_dashboard_summary(db)
+        finally:
+            client.close()
+
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Format tanggal tersimpan dan serialisasi JSON jalur cepat untuk endpoint baca.
+
+Semua field tanggal disimpan sebagai BSON datetime UTC, bukan string ISO:
+entity utama serta koleksi internal (jobs, batch analisis, cache, blobs).
+Client Motor server dibuat dengan tz_aware=True sehingga nilainya terbaca
+langsung sebagai datetime UTC. Route daftar mengambil dokumen dengan projection
+lalu meng-encode-nya dengan orjson lewat FastJSONResponse: tanpa fromisoformat
+per baris, tanpa validasi ulang response_model dan tanpa jsonable_encoder.
+Route yang mengembalikan Response langsung tidak divalidasi FastAPI, jadi
+response_model pada route tersebut hanya dipakai untuk dokumentasi OpenAPI.
+
+Tanggal di response selalu ditulis seperti pydantic, mis.
+"2024-05-01T08:30:00Z": orjson memakai OPT_UTC_Z, dan route yang
+mengembalikan dict berisi datetime tanpa response_model (job, batch analisis)
+juga memakai FastJSONResponse karena jsonable_encoder menulis "+00:00".
+
+Data lama yang masih berupa string ISO dikonversi sekali oleh
+migrate_datetime_fields saat startup (hanya dokumen bertipe string yang
+disentuh). Field tanggal di dalam array (mis. `items.finished_at` batch
+analisis lama) tidak dikonversi.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, Union
+
+import orjson
+from fastapi.responses import Response
+from pymongo import UpdateOne
+
+DATETIME_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "criteria": ("created_at",),
+    "clauses": ("created_at",),
+    "documents": ("uploaded_at",),
+    "audit_results": ("audited_at", "agreed_date", "auditor_assessed_at"),
+    "recommendations": ("created_at", "deadline", "completed_at"),
+    "users": ("created_at",),
+    # Dibandingkan dengan datetime saat klaim/requeue/purge job: harus sudah dikonversi sebelum JobQueue.start
+    "jobs": ("created_at", "run_after", "lease_expires_at", "started_at", "finished_at", "expires_at"),
+    "analysis_batches": ("created_at", "started_at", "finished_at"),
+    "analysis_cache": ("cached_at",),
+    "report_cache": ("created_at",),
+    "blobs": ("created_at",),
+}
+
+MIGRATION_BATCH_SIZE = 1000
+
+
+def to_utc(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """String ISO / datetime ke datetime UTC-aware; nilai tanpa zona waktu dianggap UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def dump_json(content: Any) -> bytes:
+    # OPT_NAIVE_UTC: datetime naive dari client tanpa tz_aware tetap dikirim sebagai UTC
+    # OPT_UTC_Z: "...Z" seperti output response_model pydantic, bukan "+00:00"
+    return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+async def migrate_datetime_fields(db) -> int:
+    """Konversi field tanggal yang masih string ISO ke BSON datetime; return jumlah dokumen yang diubah"""
+    migrated = 0
+    for collection_name, fields in DATETIME_FIELDS.items():
+        collection = db[collection_name]
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        operations = []
+        async for doc in collection.find(query, {field: 1 for field in fields}):
+            update = {}
+            for field in fields:
+                if isinstance(doc.get(field), str):
+                    try:
+                        update[field] = to_utc(doc[field])
+                    except ValueError:
+                        logging.warning(f"Invalid {collection_name}.{field} value on {doc['_id']}: {doc[field]!r}")
+            if update:
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            if len(operations) >= MIGRATION_BATCH_SIZE:
+                await collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+    return migrated
@@ -1,51 +1,114 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import os
+import json
+import re
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 import uuid
 from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
 import jwt
 from passlib.context import CryptContext
-import gridfs
 import asyncio
-from emergentintegrations.llm.chat import LlmChat, UserMessage, FileContentWithMimeType
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.units import inch
-from io import BytesIO
-import base64
+from cachetools import TTLCache
+from analysis_batch import BATCH_JOB_TYPE, AnalysisBatchRunner
+from analysis_cache import CACHED_RESULT_FIELDS, analysis_fingerprint, get_cached_analysis, store_cached_analysis
+import analysis_cache
+from analysis_context import ContextPlan, plan_context
+from analysis_response import ANALYSIS_RESPONSE_SCHEMA, parse_analysis_response
+from dashboard import read_dashboard, rebuild_dashboard_summary, refresh_clause_summary, refresh_criteria_summary, refresh_orphan_summary
+from evidence_ingest import delete_all_artifacts, ingest_document, link_existing_artifact, load_artifacts, release_artifacts
+import evidence_ingest
+import indexes
+from events import SSE_HEARTBEAT, DeadlineScheduler, EventBus, format_sse
+from evidence_payload import EvidenceTooLargeError, evidence_file_contents
+from jobs import JobContext, JobQueue
+from llm_providers import LLMRequest, create_provider
+from pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, date_range_filter, fetch_page, page_response, projection_for
+from password_hashing import PasswordHasher, PasswordHasherBusyError
+from populate_smk3_data import populate_data
+from reports import REPORT_MIME_TYPE, build_report_pdf, get_cached_report, load_report_inputs, report_version, store_cached_report
+from serialization import FastJSONResponse, migrate_datetime_fields, to_utc
+from storage import EvidenceStorage, UploadTooLargeError
+from zip_stream import ZipEntry, stream_zip
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware: field tanggal BSON (lihat serialization.DATETIME_FIELDS) terbaca sebagai datetime UTC
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
-# GridFS untuk file storage
-import pymongo
-sync_client = pymongo.MongoClient(mongo_url)
-sync_db = sync_client[os.environ['DB_NAME']]
-fs = gridfs.GridFS(sync_db)
+# GridFS untuk file storage (async, tidak memblokir event loop)
+storage = EvidenceStorage(db)
 
 # Security
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+    max_pending=int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "64"))
+)
 security = HTTPBearer()
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "smk3-audit-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
-
-# LLM Config
-EMERGENT_LLM_KEY = os.environ.get("EMERGENT_LLM_KEY", "")
+# Link unduh hasil job (browser mengunduh langsung tanpa header Authorization)
+JOB_DOWNLOAD_LINK_SECONDS = int(os.environ.get("JOB_DOWNLOAD_LINK_SECONDS", "60"))
+
+# Cache user hasil resolusi token (per proses worker)
+USER_CACHE_TTL_SECONDS = int(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", "1024"))
+user_cache: TTLCache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Notifikasi deadline di-poll setiap header halaman; hasilnya di-cache per proses worker
+NOTIFICATION_WINDOW_DAYS = 7
+NOTIFICATIONS_CACHE_TTL_SECONDS = int(os.environ.get("NOTIFICATIONS_CACHE_TTL_SECONDS", "60"))
+notifications_cache: TTLCache = TTLCache(maxsize=1, ttl=NOTIFICATIONS_CACHE_TTL_SECONDS)
+
+# Push perubahan ke browser lewat SSE (GET /api/events), per proses worker
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "100"))
+DEADLINE_REMINDER_INTERVAL_SECONDS = float(os.environ.get("DEADLINE_REMINDER_INTERVAL_SECONDS", "300"))
+event_bus = EventBus(queue_size=EVENTS_QUEUE_SIZE)
+
+# Upload Config
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE_MB", "100")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE_KB", "1024")) * 1024
+
+# LLM Config (LLM_PROVIDER, LLM_MODEL, LLM_TIMEOUT_SECONDS, ... lihat llm_providers.create_provider)
+llm_provider = create_provider(os.environ)
+ANALYSIS_BATCH_PARALLELISM = int(os.environ.get("ANALYSIS_BATCH_PARALLELISM", "4"))
+ANALYSIS_BATCH_MAX_PARALLELISM = int(os.environ.get("ANALYSIS_BATCH_MAX_PARALLELISM", "16"))
+ANALYSIS_MAX_RETRIES = int(os.environ.get("ANALYSIS_MAX_RETRIES", "3"))
+# Batas total evidence per klausul yang dikirim ke LLM (file sementara ikut dibatasi)
+ANALYSIS_MAX_EVIDENCE_SIZE = int(os.environ.get("ANALYSIS_MAX_EVIDENCE_MB", "50")) * 1024 * 1024
+# Budget konteks per panggilan LLM (perkiraan token); evidence yang lebih besar dianalisis map-reduce
+ANALYSIS_CONTEXT_BUDGET_TOKENS = int(os.environ.get("ANALYSIS_CONTEXT_BUDGET_TOKENS", "100000"))
+ANALYSIS_MAX_MAP_CALLS = int(os.environ.get("ANALYSIS_MAX_MAP_CALLS", "8"))
+ANALYSIS_MAP_PARALLELISM = int(os.environ.get("ANALYSIS_MAP_PARALLELISM", "3"))
+
+# Background jobs (analisis, export ZIP, laporan PDF)
+job_queue = JobQueue(
+    db,
+    storage,
+    workers=int(os.environ.get("JOB_WORKERS", "2")),
+    # Preprocess evidence (dipicu upload) punya slot sendiri agar tidak antre di belakang export/batch
+    dedicated_workers={"preprocess": int(os.environ.get("PREPROCESS_JOB_WORKERS", "1"))},
+    max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", "3")),
+    retention=timedelta(hours=int(os.environ.get("JOB_RESULT_RETENTION_HOURS", "24")))
+)
 
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
@@ -125,6 +188,8 @@ class DocumentUpload(BaseModel):
     file_id: str
     mime_type: str
     size: int
+    sha256: Optional[str] = None
+    preprocessing: Optional[Dict[str, Any]] = None
     uploaded_by: str
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -171,6 +236,12 @@ class RecommendationUpdate(BaseModel):
     status: str
     completed_at: Optional[str] = None
 
+class AnalysisBatchCreate(BaseModel):
+    criteria_id: Optional[str] = None
+    clause_ids: Optional[List[str]] = None
+    parallelism: Optional[int] = None
+    force_refresh: bool = False
+
 class DashboardStats(BaseModel):
     total_clauses: int
     audited_clauses: int
@@ -186,11 +257,17 @@ class DashboardStats(BaseModel):
 
 # ============= HELPER FUNCTIONS =============
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusyError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusyError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again")
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -198,6 +275,33 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def invalidate_user_cache(user_id: Optional[str] = None) -> None:
+    """Buang user dari cache; panggil setiap kali record user diubah atau dihapus"""
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.pop(user_id, None)
+
+def invalidate_notifications_cache() -> None:
+    """Panggil setiap kali rekomendasi atau klausul yang dirujuknya berubah"""
+    notifications_cache.clear()
+
+def parse_request_date(value: str, field: str) -> datetime:
+    """Tanggal ISO dari body request ke UTC; format salah / kosong -> 400, bukan 500"""
+    try:
+        return to_utc(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}: expected an ISO 8601 date")
+
+async def publish_audit_result(clause_id: str, result: Optional[dict]) -> None:
+    """Push hasil audit terbaru satu klausul (None = dihapus) beserta statistik dashboard"""
+    if result is not None:
+        result = {k: v for k, v in result.items() if k not in ("_id", "analysis_fingerprint")}
+    event_bus.publish("audit_result", {"clause_id": clause_id, "result": result})
+    # Statistik dashboard hanya dibaca jika ada client yang mendengarkan
+    if event_bus.subscriber_count:
+        event_bus.publish("dashboard", await read_dashboard(db))
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     try:
         token = credentials.credentials
@@ -206,14 +310,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         
-        user_doc = await db.users.find_one({"id": user_id}, {"_id": 0})
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+        
+        user_doc = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
         if not user_doc:
             raise HTTPException(status_code=401, detail="User not found")
         
-        if isinstance(user_doc.get('created_at'), str):
-            user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-        
-        return User(**user_doc)
+        user = User(**user_doc)
+        user_cache[user_id] = user
+        return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.JWTError:
@@ -234,10 +341,14 @@ async def register(user_data: UserCreate):
     )
     
     user_dict = user.model_dump()
-    user_dict['password'] = hash_password(user_data.password)
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
+    user_dict['password'] = await hash_password(user_data.password)
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Registrasi bersamaan dengan email sama lolos cek di atas; index unik users.email menolaknya
+        raise HTTPException(status_code=400, detail="Email already registered")
+    invalidate_user_cache(user.id)
     return user
 
 @api_router.post("/auth/login", response_model=Token)
@@ -246,12 +357,9 @@ async def login(credentials: UserLogin):
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password(credentials.password, user_doc['password']):
+    if not await verify_password(credentials.password, user_doc['password']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
     user = User(**{k: v for k, v in user_doc.items() if k != 'password'})
     access_token = create_access_token(data={"sub": user.id})
     
@@ -261,15 +369,27 @@ async def login(credentials: UserLogin):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+@api_router.get("/metrics/password-hashing")
+async def get_password_hashing_metrics(current_user: User = Depends(get_current_user)):
+    """Metrik thread pool bcrypt milik worker ini"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can view metrics")
+    return password_hasher.metrics()
+
 # ============= CRITERIA ROUTES =============
 
 @api_router.get("/criteria", response_model=List[AuditCriteria])
-async def get_criteria(current_user: User = Depends(get_current_user)):
-    criteria = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    for c in criteria:
-        if isinstance(c.get('created_at'), str):
-            c['created_at'] = datetime.fromisoformat(c['created_at'])
-    return criteria
+async def get_criteria(
+    fields: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """AuditCriteria urut `order`; halaman berikutnya lewat `after` = header X-Next-Cursor"""
+    criteria, next_cursor = await fetch_page(
+        db.criteria, {}, ["order", "_id"], projection_for(AuditCriteria.model_fields, fields), limit, after
+    )
+    return page_response(criteria, next_cursor)
 
 @api_router.post("/criteria", response_model=AuditCriteria)
 async def create_criteria(data: AuditCriteriaCreate, current_user: User = Depends(get_current_user)):
@@ -277,10 +397,8 @@ async def create_criteria(data: AuditCriteriaCreate, current_user: User = Depend
         raise HTTPException(status_code=403, detail="Only admins can create criteria")
     
     criteria = AuditCriteria(**data.model_dump())
-    criteria_dict = criteria.model_dump()
-    criteria_dict['created_at'] = criteria_dict['created_at'].isoformat()
-    
-    await db.criteria.insert_one(criteria_dict)
+    await db.criteria.insert_one(criteria.model_dump())
+    await refresh_criteria_summary(db, criteria.id)
     return criteria
 
 @api_router.delete("/criteria/{criteria_id}")
@@ -292,20 +410,32 @@ async def delete_criteria(criteria_id: str, current_user: User = Depends(get_cur
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Criteria not found")
     
+    await refresh_criteria_summary(db, criteria_id)
+    
     return {"message": "Criteria deleted successfully"}
 
 # ============= CLAUSE ROUTES =============
 
 @api_router.get("/clauses", response_model=List[AuditClause])
-async def get_clauses(criteria_id: Optional[str] = None, current_user: User = Depends(get_current_user)):
-    query = {"criteria_id": criteria_id} if criteria_id else {}
-    clauses = await db.clauses.find(query, {"_id": 0}).to_list(500)
-    
-    for c in clauses:
-        if isinstance(c.get('created_at'), str):
-            c['created_at'] = datetime.fromisoformat(c['created_at'])
+async def get_clauses(
+    criteria_id: Optional[str] = None,
+    clause_number_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """AuditClause urut waktu dibuat; halaman berikutnya lewat `after` = header X-Next-Cursor"""
+    query = {}
+    if criteria_id:
+        query['criteria_id'] = criteria_id
+    if clause_number_prefix:
+        query['clause_number'] = {"$regex": f"^{re.escape(clause_number_prefix)}"}
     
-    return clauses
+    clauses, next_cursor = await fetch_page(
+        db.clauses, query, ["_id"], projection_for(AuditClause.model_fields, fields), limit, after
+    )
+    return page_response(clauses, next_cursor)
 
 @api_router.post("/clauses", response_model=AuditClause)
 async def create_clause(data: AuditClauseCreate, current_user: User = Depends(get_current_user)):
@@ -313,10 +443,11 @@ async def create_clause(data: AuditClauseCreate, current_user: User = Depends(ge
         raise HTTPException(status_code=403, detail="Only admins can create clauses")
     
     clause = AuditClause(**data.model_dump())
-    clause_dict = clause.model_dump()
-    clause_dict['created_at'] = clause_dict['created_at'].isoformat()
-    
-    await db.clauses.insert_one(clause_dict)
+    try:
+        await db.clauses.insert_one(clause.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Clause number {clause.clause_number} already exists")
+    await refresh_criteria_summary(db, clause.criteria_id)
     return clause
 
 @api_router.put("/clauses/{clause_id}/knowledge-base")
@@ -339,14 +470,119 @@ async def delete_clause(clause_id: str, current_user: User = Depends(get_current
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can delete clauses")
     
-    result = await db.clauses.delete_one({"id": clause_id})
-    if result.deleted_count == 0:
+    clause = await db.clauses.find_one_and_delete({"id": clause_id}, {"_id": 0, "criteria_id": 1})
+    if not clause:
         raise HTTPException(status_code=404, detail="Clause not found")
     
+    # Hasil audit klausul ini tetap ada, jadi pindah ke baris summary orphan
+    await refresh_criteria_summary(db, clause['criteria_id'])
+    await refresh_orphan_summary(db)
+    invalidate_notifications_cache()
+    
     return {"message": "Clause deleted successfully"}
 
+# ============= JOB ROUTES =============
+
+JOB_VIEW_FIELDS = (
+    "id", "type", "params", "status", "progress", "attempts", "max_attempts", "cancel_requested",
+    "result", "error", "error_status_code", "created_by", "created_at", "started_at", "finished_at", "expires_at"
+)
+
+def _job_view(job: dict) -> Dict[str, Any]:
+    view = {field: job.get(field) for field in JOB_VIEW_FIELDS}
+    progress = job.get('progress') or {}
+    if job['status'] == "completed":
+        view['progress_percentage'] = 100.0
+    else:
+        view['progress_percentage'] = round(progress['current'] / progress['total'] * 100, 2) if progress.get('total') else 0.0
+    result_file = job.get('result_file')
+    view['result_file'] = {k: result_file[k] for k in ("filename", "mime_type", "size")} if result_file else None
+    return view
+
+def _job_response(job: dict, status_code: int = 200) -> FastJSONResponse:
+    # Field tanggal job berupa datetime: lewat orjson agar formatnya sama dengan route lain
+    return FastJSONResponse(_job_view(job), status_code=status_code)
+
+async def _get_user_job(job_id: str, current_user: User) -> dict:
+    job = await job_queue.get(job_id)
+    if not job or (job['created_by'] != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.get("/jobs")
+async def list_jobs(limit: int = 20, current_user: User = Depends(get_current_user)):
+    """Job terbaru milik user yang sedang login"""
+    jobs = await db.jobs.find({"created_by": current_user.id}, {"_id": 0}).sort("created_at", -1).to_list(min(max(limit, 1), 100))
+    return FastJSONResponse([_job_view(job) for job in jobs])
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return _job_response(await _get_user_job(job_id, current_user))
+
+@api_router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, current_user: User = Depends(get_current_user)):
+    await _get_user_job(job_id, current_user)
+    return _job_response(await job_queue.cancel(job_id))
+
+def _require_job_result(job: dict) -> dict:
+    if job['status'] != "completed" or not job.get('result_file'):
+        raise HTTPException(status_code=409, detail="Job has no downloadable result")
+    return job['result_file']
+
+async def _job_result_response(request: Request, job: dict) -> Response:
+    result_file = _require_job_result(job)
+    try:
+        return await _document_file_response(request, result_file, "attachment")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=f"Job result is no longer available: {str(e)}")
+
+@api_router.get("/jobs/{job_id}/download")
+async def download_job_result(job_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    """Unduh file hasil job (ZIP evidence / laporan PDF)"""
+    return await _job_result_response(request, await _get_user_job(job_id, current_user))
+
+@api_router.post("/jobs/{job_id}/download-link")
+async def create_job_download_link(job_id: str, current_user: User = Depends(get_current_user)):
+    """Token unduh berumur pendek, agar browser bisa streaming file langsung ke disk"""
+    job = await _get_user_job(job_id, current_user)
+    _require_job_result(job)
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=JOB_DOWNLOAD_LINK_SECONDS)
+    token = jwt.encode(
+        {"sub": current_user.id, "job_id": job_id, "purpose": "job_download", "exp": expires_at},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+    return FastJSONResponse({"token": token, "expires_at": expires_at})
+
+@api_router.get("/jobs/{job_id}/file")
+async def download_job_result_by_link(job_id: str, token: str, request: Request):
+    """Unduh hasil job dengan token dari /download-link (tanpa header Authorization)"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Download link has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid download link")
+    if payload.get("purpose") != "job_download" or payload.get("job_id") != job_id:
+        raise HTTPException(status_code=401, detail="Invalid download link")
+    
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await _job_result_response(request, job)
+
 # ============= DOCUMENT ROUTES =============
 
+async def _read_upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Baca file upload per chunk; Starlette sudah menampungnya di spooled temp file"""
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
 @api_router.post("/clauses/{clause_id}/upload")
 async def upload_document(
     clause_id: str,
@@ -357,211 +593,218 @@ async def upload_document(
     if not clause:
         raise HTTPException(status_code=404, detail="Clause not found")
     
-    content = await file.read()
-    file_id = fs.put(content, filename=file.filename, content_type=file.content_type)
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail=f"File exceeds maximum upload size of {MAX_UPLOAD_SIZE // (1024 * 1024)} MB")
+    
+    try:
+        stored = await storage.store_upload(
+            _read_upload_chunks(file),
+            file.filename,
+            file.content_type,
+            max_size=MAX_UPLOAD_SIZE
+        )
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail=f"File exceeds maximum upload size of {MAX_UPLOAD_SIZE // (1024 * 1024)} MB")
     
     doc = DocumentUpload(
         clause_id=clause_id,
         filename=file.filename,
-        file_id=str(file_id),
+        file_id=str(stored.file_id),
         mime_type=file.content_type or "application/octet-stream",
-        size=len(content),
+        size=stored.size,
+        sha256=stored.sha256,
         uploaded_by=current_user.id
     )
     
     doc_dict = doc.model_dump()
-    doc_dict['uploaded_at'] = doc_dict['uploaded_at'].isoformat()
-    
     await db.documents.insert_one(doc_dict)
+    
+    # Isi yang sama untuk klausul ini sudah pernah dipra-proses; selain itu pra-proses di job background
+    doc.preprocessing = await link_existing_artifact(db, doc_dict, clause)
+    if doc.preprocessing is None:
+        await job_queue.submit("preprocess", {"document_id": doc.id}, current_user.id)
+    
     return doc
 
 @api_router.get("/clauses/{clause_id}/documents", response_model=List[DocumentUpload])
-async def get_documents(clause_id: str, current_user: User = Depends(get_current_user)):
-    docs = await db.documents.find({"clause_id": clause_id}, {"_id": 0}).to_list(100)
+async def get_documents(
+    clause_id: str,
+    uploaded_from: Optional[str] = None,
+    uploaded_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """DocumentUpload urut waktu upload; halaman berikutnya lewat `after` = header X-Next-Cursor"""
+    query: Dict[str, Any] = {"clause_id": clause_id}
+    if uploaded_from or uploaded_to:
+        query['uploaded_at'] = date_range_filter(uploaded_from, uploaded_to)
     
-    for d in docs:
-        if isinstance(d.get('uploaded_at'), str):
-            d['uploaded_at'] = datetime.fromisoformat(d['uploaded_at'])
+    docs, next_cursor = await fetch_page(
+        db.documents, query, ["_id"], projection_for(DocumentUpload.model_fields, fields), limit, after
+    )
+    return page_response(docs, next_cursor)
+
+def _criteria_folder(criteria: dict) -> str:
+    return f"{criteria['order']:02d}_Kriteria_{criteria['name'].replace('/', '-')}"
+
+def _clause_folder(clause: dict) -> str:
+    return f"Klausul_{clause['clause_number']}_{clause['title'][:50].replace('/', '-')}"
+
+async def _evidence_zip_entries(items: List[Tuple[str, dict]], job: Optional[JobContext] = None) -> AsyncIterator[ZipEntry]:
+    """Buka file GridFS satu per satu saat ZIP sedang ditulis, sambil melaporkan progress job (jika ada)"""
+    for index, (file_path, doc) in enumerate(items):
+        if job is not None:
+            await job.progress(index, len(items), file_path)
+        try:
+            grid_out = await storage.open(doc['file_id'])
+        except Exception as e:
+            logging.warning(f"Failed to add {doc['filename']} to ZIP: {str(e)}")
+            continue
+        yield ZipEntry(file_path, grid_out.length, grid_out.upload_date, storage.iter_chunks(grid_out))
+
+async def _collect_evidence_items(criteria_list: List[dict]) -> List[Tuple[str, dict]]:
+    """Susun daftar (path di ZIP, document) untuk kriteria yang diberikan dengan dua query saja"""
+    criteria_ids = [c['id'] for c in criteria_list]
+    clauses = await db.clauses.find({"criteria_id": {"$in": criteria_ids}}, {"_id": 0}).to_list(None)
+    
+    clause_ids = [c['id'] for c in clauses]
+    docs = await db.documents.find(
+        {"clause_id": {"$in": clause_ids}},
+        {"_id": 0, "clause_id": 1, "filename": 1, "file_id": 1}
+    ).to_list(None)
+    
+    docs_by_clause: Dict[str, List[dict]] = {}
+    for doc in docs:
+        docs_by_clause.setdefault(doc['clause_id'], []).append(doc)
+    
+    clauses_by_criteria: Dict[str, List[dict]] = {}
+    for clause in clauses:
+        clauses_by_criteria.setdefault(clause['criteria_id'], []).append(clause)
+    
+    items = []
+    for criteria in criteria_list:
+        criteria_folder = _criteria_folder(criteria)
+        for clause in clauses_by_criteria.get(criteria['id'], []):
+            clause_folder = _clause_folder(clause)
+            for doc in docs_by_clause.get(clause['id'], []):
+                # Path in ZIP: Kriteria/Klausul/filename
+                items.append((f"{criteria_folder}/{clause_folder}/{doc['filename']}", doc))
     
-    return docs
+    return items
 
-@api_router.get("/clauses/{clause_id}/documents/download-all")
-async def download_all_documents(clause_id: str, current_user: User = Depends(get_current_user)):
-    """Download all documents for a clause as ZIP file"""
+async def _clause_zip_items(clause_id: str) -> Tuple[List[Tuple[str, dict]], str]:
     clause = await db.clauses.find_one({"id": clause_id})
     if not clause:
         raise HTTPException(status_code=404, detail="Clause not found")
     
-    docs = await db.documents.find({"clause_id": clause_id}, {"_id": 0}).to_list(100)
+    docs = await db.documents.find({"clause_id": clause_id}, {"_id": 0}).to_list(None)
     
     if not docs:
         raise HTTPException(status_code=404, detail="No documents found for this clause")
     
-    from bson.objectid import ObjectId
-    from fastapi.responses import StreamingResponse
-    import zipfile
-    import io
+    zip_filename = f"Klausul_{clause['clause_number']}_Documents.zip"
+    return [(doc['filename'], doc) for doc in docs], zip_filename
+
+async def _all_evidence_zip_items(_: Optional[str] = None) -> Tuple[List[Tuple[str, dict]], str]:
+    # Get all criteria sorted by order
+    criteria_list = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
+    
+    if not criteria_list:
+        raise HTTPException(status_code=404, detail="No criteria found")
     
-    try:
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for doc in docs:
-                try:
-                    file_data = fs.get(ObjectId(doc['file_id']))
-                    file_content = file_data.read()
-                    zip_file.writestr(doc['filename'], file_content)
-                except Exception as e:
-                    logging.warning(f"Failed to add {doc['filename']} to ZIP: {str(e)}")
-        
-        zip_buffer.seek(0)
-        
-        zip_filename = f"Klausul_{clause['clause_number']}_Documents.zip"
-        
-        return StreamingResponse(
-            zip_buffer,
-            media_type="application/zip",
-            headers={
-                'Content-Disposition': f'attachment; filename="{zip_filename}"'
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating ZIP file: {str(e)}")
+    items = await _collect_evidence_items(criteria_list)
+    if not items:
+        raise HTTPException(status_code=404, detail="No evidence documents found")
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return items, f"All_Evidence_SMK3_PLTU_Tenayan_{timestamp}.zip"
 
-@api_router.get("/audit/download-all-evidence")
-async def download_all_evidence(current_user: User = Depends(get_current_user)):
-    """Download ALL evidence documents in structured folders (Kriteria/Klausul/files)"""
-    from bson.objectid import ObjectId
-    from fastapi.responses import StreamingResponse
-    import zipfile
-    import io
+async def _criteria_zip_items(criteria_id: str) -> Tuple[List[Tuple[str, dict]], str]:
+    criteria = await db.criteria.find_one({"id": criteria_id}, {"_id": 0})
+    if not criteria:
+        raise HTTPException(status_code=404, detail="Criteria not found")
     
-    try:
-        # Get all criteria sorted by order
-        criteria_list = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-        
-        if not criteria_list:
-            raise HTTPException(status_code=404, detail="No criteria found")
-        
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        total_files = 0
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for criteria in criteria_list:
-                # Get all clauses for this criteria
-                clauses = await db.clauses.find({"criteria_id": criteria['id']}, {"_id": 0}).to_list(500)
-                
-                for clause in clauses:
-                    # Get all documents for this clause
-                    docs = await db.documents.find({"clause_id": clause['id']}, {"_id": 0}).to_list(100)
-                    
-                    if docs:
-                        # Create folder structure: Kriteria_X_Name/Klausul_X.X.X_Name/
-                        criteria_folder = f"{criteria['order']:02d}_Kriteria_{criteria['name'].replace('/', '-')}"
-                        clause_folder = f"Klausul_{clause['clause_number']}_{clause['title'][:50].replace('/', '-')}"
-                        
-                        for doc in docs:
-                            try:
-                                file_data = fs.get(ObjectId(doc['file_id']))
-                                file_content = file_data.read()
-                                
-                                # Path in ZIP: Kriteria/Klausul/filename
-                                file_path = f"{criteria_folder}/{clause_folder}/{doc['filename']}"
-                                zip_file.writestr(file_path, file_content)
-                                total_files += 1
-                            except Exception as e:
-                                logging.warning(f"Failed to add {doc['filename']} to ZIP: {str(e)}")
-        
-        if total_files == 0:
-            raise HTTPException(status_code=404, detail="No evidence documents found")
-        
-        zip_buffer.seek(0)
-        
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        zip_filename = f"All_Evidence_SMK3_PLTU_Tenayan_{timestamp}.zip"
-        
-        return StreamingResponse(
-            zip_buffer,
-            media_type="application/zip",
-            headers={
-                'Content-Disposition': f'attachment; filename="{zip_filename}"'
-            }
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error creating all evidence ZIP: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error creating ZIP file: {str(e)}")
+    clauses_count = await db.clauses.count_documents({"criteria_id": criteria_id})
+    if clauses_count == 0:
+        raise HTTPException(status_code=404, detail="No clauses found for this criteria")
+    
+    items = await _collect_evidence_items([criteria])
+    if not items:
+        raise HTTPException(status_code=404, detail="No evidence documents found for this criteria")
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return items, f"Evidence_Kriteria_{criteria['order']}_{criteria['name'].replace('/', '-')}_{timestamp}.zip"
+
+ZIP_EXPORT_SCOPES = {
+    "clause": _clause_zip_items,
+    "all": _all_evidence_zip_items,
+    "criteria": _criteria_zip_items,
+}
+
+async def run_zip_export_job(job: JobContext) -> Dict[str, Any]:
+    """Tulis ZIP evidence ke GridFS; isi dihitung ulang saat job berjalan"""
+    items, zip_filename = await ZIP_EXPORT_SCOPES[job.params['scope']](job.params.get('target_id'))
+    result_file = await job.store_file(
+        stream_zip(_evidence_zip_entries(items, job)),
+        zip_filename,
+        "application/zip"
+    )
+    await job.progress(len(items), len(items))
+    return {"data": {"files": len(items)}, "file": result_file}
+
+async def _submit_zip_export(scope: str, target_id: Optional[str], current_user: User) -> FastJSONResponse:
+    # Validasi di depan agar 404 langsung terlihat oleh pemanggil
+    await ZIP_EXPORT_SCOPES[scope](target_id)
+    job = await job_queue.submit("zip_export", {"scope": scope, "target_id": target_id}, current_user.id)
+    return _job_response(job, status_code=202)
+
+def _zip_streaming_response(items: List[Tuple[str, dict]], zip_filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_zip(_evidence_zip_entries(items)),
+        media_type="application/zip",
+        headers={
+            'Content-Disposition': f'attachment; filename="{zip_filename}"'
+        }
+    )
+
+async def _stream_zip_export(scope: str, target_id: Optional[str]) -> StreamingResponse:
+    items, zip_filename = await ZIP_EXPORT_SCOPES[scope](target_id)
+    return _zip_streaming_response(items, zip_filename)
+
+# GET lama tetap ada untuk link/client yang sudah ada: ZIP di-stream langsung tanpa job.
+# Client baru memakai POST agar export besar berjalan di background.
+
+@api_router.get("/clauses/{clause_id}/documents/download-all")
+async def stream_all_documents(clause_id: str, current_user: User = Depends(get_current_user)):
+    """Download all documents for a clause as ZIP file (streaming, deprecated: use POST)"""
+    return await _stream_zip_export("clause", clause_id)
+
+@api_router.get("/audit/download-all-evidence")
+async def stream_all_evidence(current_user: User = Depends(get_current_user)):
+    """Download ALL evidence documents in structured folders (streaming, deprecated: use POST)"""
+    return await _stream_zip_export("all", None)
 
 @api_router.get("/audit/download-criteria-evidence/{criteria_id}")
+async def stream_criteria_evidence(criteria_id: str, current_user: User = Depends(get_current_user)):
+    """Download all evidence documents for a specific criteria (streaming, deprecated: use POST)"""
+    return await _stream_zip_export("criteria", criteria_id)
+
+@api_router.post("/clauses/{clause_id}/documents/download-all", status_code=202)
+async def download_all_documents(clause_id: str, current_user: User = Depends(get_current_user)):
+    """Export all documents for a clause as ZIP file (background job)"""
+    return await _submit_zip_export("clause", clause_id, current_user)
+
+@api_router.post("/audit/download-all-evidence", status_code=202)
+async def download_all_evidence(current_user: User = Depends(get_current_user)):
+    """Export ALL evidence documents in structured folders (Kriteria/Klausul/files) as a background job"""
+    return await _submit_zip_export("all", None, current_user)
+
+@api_router.post("/audit/download-criteria-evidence/{criteria_id}", status_code=202)
 async def download_criteria_evidence(criteria_id: str, current_user: User = Depends(get_current_user)):
-    """Download all evidence documents for a specific criteria"""
-    from bson.objectid import ObjectId
-    from fastapi.responses import StreamingResponse
-    import zipfile
-    import io
-    
-    try:
-        # Get criteria
-        criteria = await db.criteria.find_one({"id": criteria_id}, {"_id": 0})
-        if not criteria:
-            raise HTTPException(status_code=404, detail="Criteria not found")
-        
-        # Get all clauses for this criteria
-        clauses = await db.clauses.find({"criteria_id": criteria_id}, {"_id": 0}).to_list(500)
-        
-        if not clauses:
-            raise HTTPException(status_code=404, detail="No clauses found for this criteria")
-        
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        total_files = 0
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            criteria_folder = f"{criteria['order']:02d}_Kriteria_{criteria['name'].replace('/', '-')}"
-            
-            for clause in clauses:
-                # Get all documents for this clause
-                docs = await db.documents.find({"clause_id": clause['id']}, {"_id": 0}).to_list(100)
-                
-                if docs:
-                    clause_folder = f"Klausul_{clause['clause_number']}_{clause['title'][:50].replace('/', '-')}"
-                    
-                    for doc in docs:
-                        try:
-                            file_data = fs.get(ObjectId(doc['file_id']))
-                            file_content = file_data.read()
-                            
-                            # Path in ZIP: Kriteria/Klausul/filename
-                            file_path = f"{criteria_folder}/{clause_folder}/{doc['filename']}"
-                            zip_file.writestr(file_path, file_content)
-                            total_files += 1
-                        except Exception as e:
-                            logging.warning(f"Failed to add {doc['filename']} to ZIP: {str(e)}")
-        
-        if total_files == 0:
-            raise HTTPException(status_code=404, detail="No evidence documents found for this criteria")
-        
-        zip_buffer.seek(0)
-        
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        zip_filename = f"Evidence_Kriteria_{criteria['order']}_{criteria['name'].replace('/', '-')}_{timestamp}.zip"
-        
-        return StreamingResponse(
-            zip_buffer,
-            media_type="application/zip",
-            headers={
-                'Content-Disposition': f'attachment; filename="{zip_filename}"'
-            }
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error creating criteria evidence ZIP: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error creating ZIP file: {str(e)}")
+    """Export all evidence documents for a specific criteria (background job)"""
+    return await _submit_zip_export("criteria", criteria_id, current_user)
 
 @api_router.post("/audit/hard-reset")
 async def hard_reset_audit(current_user: User = Depends(get_current_user)):
@@ -569,8 +812,6 @@ async def hard_reset_audit(current_user: User = Depends(get_current_user)):
     if current_user.role not in [UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="Only admins can perform hard reset")
     
-    from bson.objectid import ObjectId
-    
     try:
         # Count documents before deletion
         docs_count = await db.documents.count_documents({})
@@ -578,19 +819,14 @@ async def hard_reset_audit(current_user: User = Depends(get_current_user)):
         recommendations_count = await db.recommendations.count_documents({})
         
         # Get all documents to delete files from GridFS
-        all_docs = await db.documents.find({}, {"_id": 0, "file_id": 1}).to_list(10000)
+        all_docs = await db.documents.find({}, {"_id": 0, "file_id": 1}).to_list(None)
         
-        # Delete all files from GridFS
-        deleted_files = 0
-        for doc in all_docs:
-            try:
-                fs.delete(ObjectId(doc['file_id']))
-                deleted_files += 1
-            except Exception as e:
-                logging.warning(f"Failed to delete file {doc['file_id']} from GridFS: {str(e)}")
+        # Delete all files from GridFS (blob bersama dihapus sekali saja)
+        deleted_files = await storage.purge(doc['file_id'] for doc in all_docs)
         
         # Delete all documents metadata
         await db.documents.delete_many({})
+        await delete_all_artifacts(db, storage)
         
         # Delete all audit results
         await db.audit_results.delete_many({})
@@ -598,6 +834,13 @@ async def hard_reset_audit(current_user: User = Depends(get_current_user)):
         # Delete all recommendations
         await db.recommendations.delete_many({})
         
+        # Cache analisis ikut direset agar siklus audit baru dianalisis ulang
+        await db.analysis_cache.delete_many({})
+        
+        await rebuild_dashboard_summary(db)
+        invalidate_notifications_cache()
+        event_bus.publish("resync", {})
+        
         logging.info(f"Hard reset completed by user {current_user.id}: {deleted_files} files, {docs_count} documents, {results_count} results, {recommendations_count} recommendations deleted")
         
         return {
@@ -613,53 +856,125 @@ async def hard_reset_audit(current_user: User = Depends(get_current_user)):
         logging.error(f"Error during hard reset: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error during hard reset: {str(e)}")
 
+def _parse_range_header(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse header Range satu rentang (bytes=start-end, bytes=start-, bytes=-suffix).
+
+    Mengembalikan None jika header tidak ada atau tidak didukung (multi-range),
+    sehingga file dikirim utuh. Rentang yang tidak bisa dipenuhi menghasilkan 416.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if not start_text:
+            suffix_length = int(end_text)
+            if suffix_length <= 0:
+                raise ValueError
+            start, end = max(file_size - suffix_length, 0), file_size - 1
+        else:
+            start = int(start_text)
+            end = int(end_text) if end_text else file_size - 1
+            end = min(end, file_size - 1)
+    except ValueError:
+        return None
+    
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, end
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header_value.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Evaluasi If-None-Match / If-Modified-Since; If-None-Match diutamakan sesuai RFC 9110"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+async def _document_file_response(request: Request, doc: dict, disposition: str) -> Response:
+    """Kirim file dokumen dari GridFS dengan dukungan Range (206) dan conditional request (304)"""
+    grid_out = await storage.open(doc['file_id'])
+    file_size = grid_out.length
+    
+    # Isi file GridFS tidak pernah berubah untuk file_id yang sama
+    etag = f'"{doc.get("sha256") or doc["file_id"]}"'
+    last_modified = grid_out.upload_date
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    
+    headers = {
+        'Content-Disposition': f'{disposition}; filename="{doc["filename"]}"',
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Last-Modified': format_datetime(last_modified, usegmt=True),
+        'Cache-Control': 'private, no-cache'
+    }
+    
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = _parse_range_header(request.headers.get("range"), file_size)
+    if_range = request.headers.get("if-range")
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None
+    
+    media_type = doc.get('mime_type', 'application/octet-stream')
+    if byte_range is None:
+        headers['Content-Length'] = str(file_size)
+        return StreamingResponse(storage.iter_chunks(grid_out), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers['Content-Range'] = f"bytes {start}-{end}/{file_size}"
+    headers['Content-Length'] = str(end - start + 1)
+    return StreamingResponse(
+        storage.iter_range(grid_out, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
 @api_router.get("/documents/{doc_id}/download")
-async def download_document(doc_id: str, current_user: User = Depends(get_current_user)):
+async def download_document(doc_id: str, request: Request, current_user: User = Depends(get_current_user)):
     """Download a document file"""
     doc = await db.documents.find_one({"id": doc_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    from bson.objectid import ObjectId
-    from fastapi.responses import StreamingResponse
-    import io
-    
     try:
-        file_data = fs.get(ObjectId(doc['file_id']))
-        file_content = file_data.read()
-        
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type=doc.get('mime_type', 'application/octet-stream'),
-            headers={
-                'Content-Disposition': f'attachment; filename="{doc["filename"]}"'
-            }
-        )
+        return await _document_file_response(request, doc, "attachment")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading document: {str(e)}")
 
 @api_router.get("/documents/{doc_id}/preview")
-async def preview_document(doc_id: str, current_user: User = Depends(get_current_user)):
+async def preview_document(doc_id: str, request: Request, current_user: User = Depends(get_current_user)):
     """Preview a document file (inline display)"""
     doc = await db.documents.find_one({"id": doc_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    from bson.objectid import ObjectId
-    from fastapi.responses import StreamingResponse
-    import io
-    
     try:
-        file_data = fs.get(ObjectId(doc['file_id']))
-        file_content = file_data.read()
-        
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type=doc.get('mime_type', 'application/octet-stream'),
-            headers={
-                'Content-Disposition': f'inline; filename="{doc["filename"]}"'
-            }
-        )
+        return await _document_file_response(request, doc, "inline")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error previewing document: {str(e)}")
 
@@ -672,15 +987,17 @@ async def delete_document(doc_id: str, current_user: User = Depends(get_current_
     
     clause_id = doc['clause_id']
     
-    # Delete file from GridFS
-    from bson.objectid import ObjectId
+    # Lepas referensi ke file GridFS; file dihapus jika tidak dipakai dokumen lain
     try:
-        fs.delete(ObjectId(doc['file_id']))
+        await storage.release(doc['file_id'], doc.get('sha256'))
     except Exception as e:
         logging.warning(f"Failed to delete file from GridFS: {str(e)}")
     
     # Delete document record
     await db.documents.delete_one({"id": doc_id})
+    artifact_key = (doc.get('preprocessing') or {}).get('artifact_key')
+    if artifact_key:
+        await release_artifacts(db, storage, [artifact_key])
     
     # Check if there are any remaining documents for this clause
     remaining_docs = await db.documents.count_documents({"clause_id": clause_id})
@@ -689,6 +1006,8 @@ async def delete_document(doc_id: str, current_user: User = Depends(get_current_
     if remaining_docs == 0:
         deleted_result = await db.audit_results.delete_many({"clause_id": clause_id})
         logging.info(f"Deleted {deleted_result.deleted_count} audit results for clause {clause_id} (no documents remaining)")
+        await refresh_clause_summary(db, clause_id)
+        await publish_audit_result(clause_id, None)
     
     return {
         "message": "Document deleted successfully",
@@ -698,25 +1017,7 @@ async def delete_document(doc_id: str, current_user: User = Depends(get_current_
 
 # ============= AUDIT ROUTES =============
 
-@api_router.post("/audit/analyze/{clause_id}")
-async def analyze_clause(clause_id: str, current_user: User = Depends(get_current_user)):
-    clause = await db.clauses.find_one({"id": clause_id}, {"_id": 0})
-    if not clause:
-        raise HTTPException(status_code=404, detail="Clause not found")
-    
-    documents = await db.documents.find({"clause_id": clause_id}, {"_id": 0}).to_list(100)
-    if not documents:
-        raise HTTPException(status_code=400, detail="No documents uploaded for this clause")
-    
-    knowledge_base = clause.get('knowledge_base', '')
-    if not knowledge_base:
-        raise HTTPException(status_code=400, detail="Knowledge base not configured for this clause")
-    
-    try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"audit-{clause_id}-{uuid.uuid4()}",
-            system_message=f"""Anda adalah asisten AI untuk auditor SMK3. Tugas Anda adalah memberikan MASUKAN dan ANALISIS kepada auditor mengenai kesesuaian dokumen evidence yang diupload dengan persyaratan dokumen yang diminta.
+ANALYSIS_SYSTEM_PROMPT = """Anda adalah asisten AI untuk auditor SMK3. Tugas Anda adalah memberikan MASUKAN dan ANALISIS kepada auditor mengenai kesesuaian dokumen evidence yang diupload dengan persyaratan dokumen yang diminta.
 
 Knowledge Base untuk klausul ini:
 {knowledge_base}
@@ -724,132 +1025,259 @@ Knowledge Base untuk klausul ini:
 FOKUS PENILAIAN:
 Nilai KESESUAIAN dokumen yang diupload dengan DOKUMEN YANG DIMINTA dalam knowledge base di atas.
 
-Berikan analisis dengan format:
-- Status: Sesuai atau Belum Sesuai (berdasarkan kelengkapan dokumen yang diminta)
-- Skor: 0-100 
+Jawab HANYA dengan satu objek JSON (tanpa teks lain, tanpa code fence) sesuai JSON schema berikut:
+{response_schema}
+
+Isi field:
+- status: "Sesuai" atau "Belum Sesuai" (berdasarkan kelengkapan dokumen yang diminta)
+- score: angka 0-100 (bukan "85/100")
   * 100: SEMUA dokumen yang diminta ada dan lengkap
   * 70-90: Sebagian besar dokumen ada, tapi ada yang kurang lengkap
   * 40-60: Hanya sebagian dokumen yang ada
   * 0-30: Hampir tidak ada dokumen yang diminta atau sangat tidak sesuai
-- Alasan: Jelaskan dokumen mana yang sudah ada dan dokumen mana yang masih kurang/tidak sesuai
-- Feedback Positif: Dokumen apa yang sudah sesuai dan bagus
-- Saran Perbaikan: Dokumen apa yang masih perlu dilengkapi atau diperbaiki
+- reasoning: Jelaskan dokumen mana yang sudah ada dan dokumen mana yang masih kurang/tidak sesuai
+- feedback: Dokumen apa yang sudah sesuai dan bagus
+- improvement_suggestions: Dokumen apa yang masih perlu dilengkapi atau diperbaiki
 
 PENTING: Analisis ini adalah TOOLS BANTUAN untuk auditor. Keputusan akhir tetap di tangan auditor."""
-        ).with_model("gemini", "gemini-2.0-flash")
-        
-        file_contents = []
-        temp_files = []
-        from bson.objectid import ObjectId
-        
-        for doc in documents:
-            file_data = fs.get(ObjectId(doc['file_id']))
-            temp_path = f"/tmp/{doc['filename']}"
-            with open(temp_path, 'wb') as f:
-                f.write(file_data.read())
-            
-            temp_files.append(temp_path)
-            file_contents.append(
-                FileContentWithMimeType(
-                    file_path=temp_path,
-                    mime_type=doc['mime_type']
-                )
+
+ANALYSIS_USER_PROMPT = """Analisis dokumen evidence untuk klausul: {title}\n\nDeskripsi: {description}\n\nBerikan penilaian lengkap sesuai format yang diminta."""
+
+ANALYSIS_EVIDENCE_TEXT_PROMPT = """\n\nBerikut teks hasil ekstraksi dari dokumen evidence (PDF):\n\n{sections}"""
+
+ANALYSIS_MAP_PROMPT = """Analisis dokumen evidence untuk klausul: {title}\n\nDeskripsi: {description}\n\nEvidence klausul ini terlalu banyak untuk satu kali analisis. Pesan ini hanya berisi BAGIAN {part} dari {parts} dokumen evidence. Nilai dokumen pada bagian ini saja: sebutkan dokumen yang diminta knowledge base yang sudah terpenuhi oleh bagian ini beserta nama filenya, tanpa menyimpulkan dokumen di bagian lain tidak ada."""
+
+ANALYSIS_REDUCE_PROMPT = """Gabungkan hasil analisis parsial berikut menjadi SATU penilaian akhir untuk klausul: {title}\n\nDeskripsi: {description}\n\nSetiap hasil parsial menilai sebagian dokumen evidence. Dokumen yang diminta dianggap terpenuhi jika terpenuhi di salah satu bagian; skor akhir mencerminkan kelengkapan SELURUH evidence, bukan rata-rata skor parsial.\n\n{partials}"""
+
+ANALYSIS_SKIPPED_NOTE = """\n\nCatatan: {count} dokumen dengan relevansi terendah tidak ikut dianalisis karena melebihi batas konteks: {filenames}"""
+
+async def _save_audit_result(result: AuditResult, criteria_id: str, fingerprint: str) -> None:
+    result_dict = result.model_dump()
+    result_dict['analysis_fingerprint'] = fingerprint
+    
+    # Satu hasil per klausul (index unik clause_id); replace atomik agar analisis paralel tidak menduplikasi
+    await db.audit_results.replace_one({"clause_id": result.clause_id}, result_dict, upsert=True)
+    await refresh_clause_summary(db, result.clause_id, criteria_id)
+    await publish_audit_result(result.clause_id, result_dict)
+
+async def _complete_analysis(
+    clause_id: str,
+    system_message: str,
+    text: str,
+    documents: List[dict],
+    artifacts: Dict[str, dict]
+) -> str:
+    """Satu panggilan LLM dengan evidence `documents` sebagai lampiran/teks"""
+    async with evidence_file_contents(storage, documents, ANALYSIS_MAX_EVIDENCE_SIZE, artifacts) as evidence:
+        if evidence.text_sections:
+            text += ANALYSIS_EVIDENCE_TEXT_PROMPT.format(sections="\n\n".join(evidence.text_sections))
+        return await llm_provider.complete(LLMRequest(
+            system_message=system_message,
+            text=text,
+            attachments=evidence.file_contents,
+            response_schema=ANALYSIS_RESPONSE_SCHEMA,
+            session_id=f"audit-{clause_id}-{uuid.uuid4()}"
+        ))
+
+async def _map_reduce_analysis(clause: dict, system_message: str, plan: ContextPlan, artifacts: Dict[str, dict]):
+    """Nilai tiap batch evidence terpisah lalu gabungkan hasil parsialnya dalam satu panggilan"""
+    semaphore = asyncio.Semaphore(ANALYSIS_MAP_PARALLELISM)
+    
+    async def analyze_part(index: int):
+        text = ANALYSIS_MAP_PROMPT.format(
+            title=clause['title'],
+            description=clause['description'],
+            part=index + 1,
+            parts=len(plan.batches)
+        )
+        async with semaphore:
+            response = await _complete_analysis(clause['id'], system_message, text, plan.documents(index), artifacts)
+        return parse_analysis_response(response).result
+    
+    partial_results = await asyncio.gather(*(analyze_part(index) for index in range(len(plan.batches))))
+    partials = "\n\n".join(
+        f"=== Bagian {index + 1} dari {len(plan.batches)}: "
+        f"{', '.join(doc['filename'] for doc in plan.documents(index))} ===\n"
+        f"{json.dumps(partial.model_dump(), ensure_ascii=False)}"
+        for index, partial in enumerate(partial_results)
+    )
+    text = ANALYSIS_REDUCE_PROMPT.format(title=clause['title'], description=clause['description'], partials=partials)
+    response = await llm_provider.complete(LLMRequest(
+        system_message=system_message,
+        text=text,
+        response_schema=ANALYSIS_RESPONSE_SCHEMA,
+        session_id=f"audit-{clause['id']}-{uuid.uuid4()}"
+    ))
+    return parse_analysis_response(response)
+
+async def perform_clause_analysis(clause_id: str, audited_by: str, force_refresh: bool = False) -> AuditResult:
+    """Jalankan analisis AI satu klausul dan simpan hasilnya (dipakai route tunggal dan batch)"""
+    clause = await db.clauses.find_one({"id": clause_id}, {"_id": 0})
+    if not clause:
+        raise HTTPException(status_code=404, detail="Clause not found")
+    
+    # Tidak dibatasi jumlahnya; plan_context yang membatasi ukuran konteks per panggilan
+    documents = await db.documents.find({"clause_id": clause_id}, {"_id": 0}).to_list(None)
+    if not documents:
+        raise HTTPException(status_code=400, detail="No documents uploaded for this clause")
+    
+    knowledge_base = clause.get('knowledge_base', '')
+    if not knowledge_base:
+        raise HTTPException(status_code=400, detail="Knowledge base not configured for this clause")
+    
+    fingerprint = analysis_fingerprint(
+        clause,
+        documents,
+        [ANALYSIS_SYSTEM_PROMPT, ANALYSIS_USER_PROMPT, ANALYSIS_EVIDENCE_TEXT_PROMPT, ANALYSIS_MAP_PROMPT, ANALYSIS_REDUCE_PROMPT],
+        llm_provider.fingerprint,
+        {"budget_tokens": ANALYSIS_CONTEXT_BUDGET_TOKENS, "max_map_calls": ANALYSIS_MAX_MAP_CALLS}
+    )
+    if not force_refresh:
+        # Hasil yang sudah tersimpan untuk evidence yang sama dikembalikan apa adanya,
+        # termasuk penilaian auditor yang sudah diisi
+        existing = await db.audit_results.find_one(
+            {"clause_id": clause_id, "analysis_fingerprint": fingerprint},
+            {"_id": 0}
+        )
+        if existing:
+            return AuditResult(**existing)
+        
+        cached = await get_cached_analysis(db, fingerprint)
+        if cached:
+            result = AuditResult(
+                clause_id=clause_id,
+                **{field: cached[field] for field in CACHED_RESULT_FIELDS},
+                audited_by=audited_by
             )
-        
-        message = UserMessage(
-            text=f"""Analisis dokumen evidence untuk klausul: {clause['title']}\n\nDeskripsi: {clause['description']}\n\nBerikan penilaian lengkap sesuai format yang diminta.""",
-            file_contents=file_contents
+            await _save_audit_result(result, clause['criteria_id'], fingerprint)
+            return result
+    
+    try:
+        system_message = ANALYSIS_SYSTEM_PROMPT.format(
+            knowledge_base=knowledge_base,
+            response_schema=json.dumps(ANALYSIS_RESPONSE_SCHEMA, ensure_ascii=False)
         )
         
-        response = await chat.send_message(message)
-        
-        for temp_file in temp_files:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-        
-        score = 0
-        status = "Belum Sesuai"
-        reasoning = ""
-        feedback = ""
-        improvements = ""
-        
-        lines = response.strip().split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if "status:" in line.lower():
-                status_text = line.split(':', 1)[1].strip().lower()
-                status = "Sesuai" if "sesuai" in status_text and "belum" not in status_text else "Belum Sesuai"
-            elif "skor:" in line.lower() or "score:" in line.lower():
-                try:
-                    score_text = line.split(':', 1)[1].strip()
-                    score = float(''.join(c for c in score_text if c.isdigit() or c == '.'))
-                    if score > 100:
-                        score = 100
-                except:
-                    pass
-            elif "alasan:" in line.lower() or "reasoning:" in line.lower():
-                current_section = "reasoning"
-                reasoning = line.split(':', 1)[1].strip() if ':' in line else ""
-            elif "feedback positif:" in line.lower() or "positive feedback:" in line.lower():
-                current_section = "feedback"
-                feedback = line.split(':', 1)[1].strip() if ':' in line else ""
-            elif "saran perbaikan:" in line.lower() or "improvement:" in line.lower():
-                current_section = "improvements"
-                improvements = line.split(':', 1)[1].strip() if ':' in line else ""
-            elif current_section and line:
-                if current_section == "reasoning":
-                    reasoning += " " + line
-                elif current_section == "feedback":
-                    feedback += " " + line
-                elif current_section == "improvements":
-                    improvements += " " + line
-        
-        if not reasoning and not feedback:
-            reasoning = response[:500]
-            feedback = "Dokumen telah dianalisis. Silakan periksa detail lengkap."
-            improvements = "Pastikan semua dokumen lengkap dan sesuai standar."
-        
-        if score >= 70:
-            status = "Sesuai"
+        artifacts = await load_artifacts(db, documents)
+        plan = plan_context(clause, documents, artifacts, ANALYSIS_CONTEXT_BUDGET_TOKENS, ANALYSIS_MAX_MAP_CALLS)
+        if plan.is_map_reduce:
+            logging.info(
+                f"Clause {clause_id}: ~{plan.total_cost} tokens of evidence, "
+                f"map-reduce over {len(plan.batches)} calls ({len(plan.skipped)} documents skipped)"
+            )
+            parsed = await _map_reduce_analysis(clause, system_message, plan, artifacts)
+        else:
+            text = ANALYSIS_USER_PROMPT.format(title=clause['title'], description=clause['description'])
+            response = await _complete_analysis(clause_id, system_message, text, plan.documents(0), artifacts)
+            parsed = parse_analysis_response(response)
+        if parsed.method != "json":
+            logging.warning(f"Analysis response for clause {clause_id} parsed via {parsed.method} fallback")
+        
+        if plan.skipped:
+            parsed.result.reasoning += ANALYSIS_SKIPPED_NOTE.format(
+                count=len(plan.skipped),
+                filenames=", ".join(item.doc['filename'] for item in plan.skipped)
+            )
         
         result = AuditResult(
             clause_id=clause_id,
-            score=score,
-            status=status,
-            reasoning=reasoning.strip(),
-            feedback=feedback.strip(),
-            improvement_suggestions=improvements.strip(),
-            audited_by=current_user.id
+            **parsed.result.model_dump(),
+            audited_by=audited_by
         )
         
-        result_dict = result.model_dump()
-        result_dict['audited_at'] = result_dict['audited_at'].isoformat()
-        
-        await db.audit_results.delete_many({"clause_id": clause_id})
-        await db.audit_results.insert_one(result_dict)
+        await store_cached_analysis(db, fingerprint, clause_id, result.model_dump())
+        await _save_audit_result(result, clause['criteria_id'], fingerprint)
         
         return result
         
+    except EvidenceTooLargeError:
+        raise HTTPException(status_code=413, detail=f"Evidence exceeds maximum analysis size of {ANALYSIS_MAX_EVIDENCE_SIZE // (1024 * 1024)} MB")
     except Exception as e:
         logging.error(f"Error analyzing clause: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error analyzing documents: {str(e)}")
 
+async def run_preprocess_job(job: JobContext) -> Dict[str, Any]:
+    """Pra-proses satu dokumen evidence (lihat evidence_ingest)"""
+    doc = await db.documents.find_one({"id": job.params['document_id']}, {"_id": 0})
+    if not doc:
+        # Dokumen sudah dihapus sebelum job berjalan
+        return {"data": None}
+    clause = await db.clauses.find_one({"id": doc['clause_id']}, {"_id": 0}) or {}
+    return {"data": await ingest_document(db, storage, doc, clause)}
+
+async def run_analysis_job(job: JobContext) -> Dict[str, Any]:
+    await job.progress(0, 1, "Menganalisis dokumen evidence")
+    result = await perform_clause_analysis(
+        job.params['clause_id'],
+        job.created_by,
+        force_refresh=job.params.get('force_refresh', False)
+    )
+    await job.progress(1, 1)
+    return {"data": result.model_dump(mode="json")}
+
+@api_router.post("/audit/analyze/{clause_id}", status_code=202)
+async def analyze_clause(clause_id: str, force_refresh: bool = False, current_user: User = Depends(get_current_user)):
+    """Antrekan analisis AI satu klausul; hasilnya ada di `result` job setelah selesai"""
+    clause = await db.clauses.find_one({"id": clause_id}, {"_id": 0, "id": 1})
+    if not clause:
+        raise HTTPException(status_code=404, detail="Clause not found")
+    
+    job = await job_queue.submit("analyze", {"clause_id": clause_id, "force_refresh": force_refresh}, current_user.id)
+    return _job_response(job, status_code=202)
+
+analysis_batches = AnalysisBatchRunner(db, job_queue, perform_clause_analysis, max_retries=ANALYSIS_MAX_RETRIES)
+
+@api_router.post("/audit/analyze-batch")
+async def create_analysis_batch(data: AnalysisBatchCreate, current_user: User = Depends(get_current_user)):
+    """Analisis banyak klausul (satu kriteria atau daftar clause_ids) secara paralel sebagai job background.
+
+    Progress per klausul lewat GET /audit/analyze-batch/{id}; batalkan lewat POST /jobs/{job_id}/cancel.
+    """
+    if bool(data.criteria_id) == bool(data.clause_ids):
+        raise HTTPException(status_code=400, detail="Provide either criteria_id or clause_ids")
+    
+    if data.criteria_id:
+        clauses = await db.clauses.find(
+            {"criteria_id": data.criteria_id},
+            {"_id": 0, "id": 1, "clause_number": 1}
+        ).to_list(None)
+    else:
+        clause_ids = list(dict.fromkeys(data.clause_ids))
+        found = await db.clauses.find(
+            {"id": {"$in": clause_ids}},
+            {"_id": 0, "id": 1, "clause_number": 1}
+        ).to_list(None)
+        by_id = {c['id']: c for c in found}
+        # Klausul yang tidak ada tetap masuk batch dan akan tercatat "skipped"
+        clauses = [by_id.get(clause_id, {"id": clause_id}) for clause_id in clause_ids]
+    
+    if not clauses:
+        raise HTTPException(status_code=404, detail="No clauses found for this batch")
+    
+    parallelism = max(1, min(data.parallelism or ANALYSIS_BATCH_PARALLELISM, ANALYSIS_BATCH_MAX_PARALLELISM))
+    batch = await analysis_batches.submit(clauses, current_user.id, parallelism, force_refresh=data.force_refresh)
+    return FastJSONResponse({k: v for k, v in batch.items() if k != 'items'})
+
+@api_router.get("/audit/analyze-batch/{batch_id}")
+async def get_analysis_batch(batch_id: str, current_user: User = Depends(get_current_user)):
+    """Status dan progress per klausul dari satu batch analisis"""
+    batch = await db.analysis_batches.find_one({"id": batch_id}, {"_id": 0})
+    if not batch or (batch['created_by'] != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Analysis batch not found")
+    
+    finished = batch['completed_count'] + batch['failed_count'] + batch['skipped_count']
+    batch['progress_percentage'] = round(finished / batch['total'] * 100, 2) if batch['total'] else 100.0
+    return FastJSONResponse(batch)
+
 @api_router.get("/audit/results/{clause_id}", response_model=Optional[AuditResult])
 async def get_audit_result(clause_id: str, current_user: User = Depends(get_current_user)):
-    result = await db.audit_results.find_one({"clause_id": clause_id}, {"_id": 0})
-    if not result:
-        return None
-    
-    if isinstance(result.get('audited_at'), str):
-        result['audited_at'] = datetime.fromisoformat(result['audited_at'])
-    if result.get('agreed_date') and isinstance(result['agreed_date'], str):
-        result['agreed_date'] = datetime.fromisoformat(result['agreed_date'])
-    if result.get('auditor_assessed_at') and isinstance(result['auditor_assessed_at'], str):
-        result['auditor_assessed_at'] = datetime.fromisoformat(result['auditor_assessed_at'])
-    
-    return AuditResult(**result)
+    result = await db.audit_results.find_one(
+        {"clause_id": clause_id},
+        projection_for(AuditResult.model_fields, None)
+    )
+    if result:
+        result.pop('_id', None)
+    return FastJSONResponse(result)
 
 @api_router.put("/audit/results/{clause_id}/auditor-assessment")
 async def update_auditor_assessment(
@@ -870,117 +1298,34 @@ async def update_auditor_assessment(
     update_data = {
         "auditor_status": assessment.auditor_status,
         "auditor_notes": assessment.auditor_notes,
-        "agreed_date": datetime.fromisoformat(assessment.agreed_date).isoformat(),
-        "auditor_assessed_at": datetime.now(timezone.utc).isoformat(),
+        "agreed_date": parse_request_date(assessment.agreed_date, "agreed_date"),
+        "auditor_assessed_at": datetime.now(timezone.utc),
         "auditor_assessed_by": current_user.id
     }
     
-    await db.audit_results.update_one(
+    updated = await db.audit_results.find_one_and_update(
         {"clause_id": clause_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
+    await refresh_clause_summary(db, clause_id)
+    await publish_audit_result(clause_id, updated)
     
     return {"message": "Auditor assessment saved successfully"}
 
 @api_router.get("/audit/dashboard", response_model=DashboardStats)
 async def get_dashboard(current_user: User = Depends(get_current_user)):
-    total_clauses = await db.clauses.count_documents({})
-    
-    results = await db.audit_results.find({}, {"_id": 0}).to_list(500)
-    audited_clauses = len(results)
-    
-    # Hitung berdasarkan auditor assessment (jika ada)
-    # Confirm = 1, Non-confirm = 0
-    results_with_auditor = [r for r in results if r.get('auditor_status')]
-    auditor_assessed_count = len(results_with_auditor)
-    
-    confirm_count = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'confirm')
-    non_confirm_major = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'non-confirm-major')
-    non_confirm_minor = sum(1 for r in results_with_auditor if r.get('auditor_status') == 'non-confirm-minor')
-    
-    # Skor berdasarkan confirm/non-confirm: (confirm / total) * 100
-    achievement_percentage = (confirm_count / total_clauses * 100) if total_clauses > 0 else 0
-    
-    # Total score dari semua hasil audit (AI score untuk referensi)
-    total_score = sum(r['score'] for r in results)
-    average_score = total_score / audited_clauses if audited_clauses > 0 else 0
-    
-    compliant = sum(1 for r in results if r['status'] == "Sesuai")
-    non_compliant = audited_clauses - compliant
-    
-    criteria_list = await db.criteria.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    criteria_scores = []
-    
-    for criteria in criteria_list:
-        clauses = await db.clauses.find({"criteria_id": criteria['id']}, {"_id": 0}).to_list(500)
-        clause_ids = [c['id'] for c in clauses]
-        
-        criteria_results = [r for r in results if r['clause_id'] in clause_ids]
-        
-        # Filter yang sudah ada auditor assessment
-        criteria_with_auditor = [r for r in criteria_results if r.get('auditor_status')]
-        
-        # Hitung breakdown auditor assessment per criteria
-        criteria_confirm = sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'confirm')
-        criteria_nc_major = sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'non-confirm-major')
-        criteria_nc_minor = sum(1 for r in criteria_with_auditor if r.get('auditor_status') == 'non-confirm-minor')
-        
-        # Hitung persentase pencapaian per kriteria berdasarkan confirm
-        total_criteria_clauses = len(clauses)
-        audited_criteria_clauses = len(criteria_results)
-        criteria_percentage = (criteria_confirm / total_criteria_clauses * 100) if total_criteria_clauses > 0 else 0
-        
-        # Hitung average score untuk referensi
-        if criteria_results:
-            avg = sum(r['score'] for r in criteria_results) / len(criteria_results)
-            compliant_count = sum(1 for r in criteria_results if r['status'] == "Sesuai")
-        else:
-            avg = 0
-            compliant_count = 0
-        
-        # Kategori berdasarkan standar SMK3:
-        # 85-100%: Memuaskan (strong)
-        # 60-84%: Baik (moderate)
-        # 0-59%: Kurang (weak)
-        if criteria_percentage >= 85:
-            strength = "strong"
-            strength_label = "Memuaskan"
-        elif criteria_percentage >= 60:
-            strength = "moderate"
-            strength_label = "Baik"
-        else:
-            strength = "weak"
-            strength_label = "Kurang"
-        
-        criteria_scores.append({
-            "id": criteria['id'],
-            "name": criteria['name'],
-            "average_score": round(avg, 2),
-            "achievement_percentage": round(criteria_percentage, 2),
-            "total_clauses": total_criteria_clauses,
-            "audited_clauses": audited_criteria_clauses,
-            "auditor_assessed_clauses": len(criteria_with_auditor),
-            "confirm_count": criteria_confirm,
-            "non_confirm_major_count": criteria_nc_major,
-            "non_confirm_minor_count": criteria_nc_minor,
-            "compliant_clauses": compliant_count,
-            "strength": strength,
-            "strength_label": strength_label
-        })
+    return await read_dashboard(db)
+
+@api_router.post("/audit/dashboard/rebuild")
+async def rebuild_dashboard(current_user: User = Depends(get_current_user)):
+    """Bangun ulang materialized view dashboard (mis. setelah data diubah langsung di MongoDB)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can rebuild the dashboard")
     
-    return {
-        "total_clauses": total_clauses,
-        "audited_clauses": audited_clauses,
-        "auditor_assessed_clauses": auditor_assessed_count,
-        "confirm_count": confirm_count,
-        "non_confirm_major_count": non_confirm_major,
-        "non_confirm_minor_count": non_confirm_minor,
-        "achievement_percentage": round(achievement_percentage, 2),
-        "average_score": round(average_score, 2),
-        "compliant_clauses": compliant,
-        "non_compliant_clauses": non_compliant,
-        "criteria_scores": criteria_scores
-    }
+    criteria_count = await rebuild_dashboard_summary(db)
+    return {"message": "Dashboard summary rebuilt successfully", "criteria_count": criteria_count}
 
 # ============= RECOMMENDATION ROUTES =============
 
@@ -992,41 +1337,40 @@ async def create_recommendation(data: RecommendationCreate, current_user: User =
     rec = Recommendation(
         clause_id=data.clause_id,
         recommendation_text=data.recommendation_text,
-        deadline=datetime.fromisoformat(data.deadline),
+        deadline=parse_request_date(data.deadline, "deadline"),
         status="pending",
         created_by=current_user.id
     )
     
-    rec_dict = rec.model_dump()
-    rec_dict['created_at'] = rec_dict['created_at'].isoformat()
-    rec_dict['deadline'] = rec_dict['deadline'].isoformat()
-    
-    await db.recommendations.insert_one(rec_dict)
+    await db.recommendations.insert_one(rec.model_dump())
+    invalidate_notifications_cache()
+    event_bus.publish("recommendation", {"action": "created", "recommendation": rec.model_dump(mode="json")})
     return rec
 
 @api_router.get("/recommendations", response_model=List[Recommendation])
 async def get_recommendations(
     clause_id: Optional[str] = None,
     status: Optional[str] = None,
+    deadline_from: Optional[str] = None,
+    deadline_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    query = {}
+    """Recommendation urut waktu dibuat; halaman berikutnya lewat `after` = header X-Next-Cursor"""
+    query: Dict[str, Any] = {}
     if clause_id:
         query['clause_id'] = clause_id
     if status:
         query['status'] = status
+    if deadline_from or deadline_to:
+        query['deadline'] = date_range_filter(deadline_from, deadline_to)
     
-    recs = await db.recommendations.find(query, {"_id": 0}).to_list(500)
-    
-    for r in recs:
-        if isinstance(r.get('created_at'), str):
-            r['created_at'] = datetime.fromisoformat(r['created_at'])
-        if isinstance(r.get('deadline'), str):
-            r['deadline'] = datetime.fromisoformat(r['deadline'])
-        if r.get('completed_at') and isinstance(r['completed_at'], str):
-            r['completed_at'] = datetime.fromisoformat(r['completed_at'])
-    
-    return recs
+    recs, next_cursor = await fetch_page(
+        db.recommendations, query, ["_id"], projection_for(Recommendation.model_fields, fields), limit, after
+    )
+    return page_response(recs, next_cursor)
 
 @api_router.put("/recommendations/{rec_id}")
 async def update_recommendation(
@@ -1036,200 +1380,149 @@ async def update_recommendation(
 ):
     update_data = {"status": data.status}
     if data.completed_at:
-        update_data['completed_at'] = datetime.fromisoformat(data.completed_at).isoformat()
+        update_data['completed_at'] = parse_request_date(data.completed_at, "completed_at")
     
-    result = await db.recommendations.update_one(
+    rec = await db.recommendations.find_one_and_update(
         {"id": rec_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0, "reminded_days_left": 0},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if rec is None:
         raise HTTPException(status_code=404, detail="Recommendation not found")
     
+    invalidate_notifications_cache()
+    event_bus.publish("recommendation", {"action": "updated", "recommendation": rec})
     return {"message": "Recommendation updated successfully"}
 
-@api_router.get("/recommendations/notifications")
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    now = datetime.now(timezone.utc)
-    upcoming = now + timedelta(days=7)
-    
+async def _load_notifications(now: datetime) -> List[Dict[str, Any]]:
+    # days_left <= 7 berarti deadline < sekarang + 8 hari
+    window_end = now + timedelta(days=NOTIFICATION_WINDOW_DAYS + 1)
     recs = await db.recommendations.find(
-        {"status": {"$ne": "completed"}},
-        {"_id": 0}
-    ).to_list(500)
+        {"status": {"$ne": "completed"}, "deadline": {"$lt": window_end}},
+        {"_id": 0, "id": 1, "clause_id": 1, "recommendation_text": 1, "deadline": 1}
+    ).sort("deadline", 1).to_list(500)
+    
+    clause_ids = list({r['clause_id'] for r in recs})
+    clauses = await db.clauses.find(
+        {"id": {"$in": clause_ids}},
+        {"_id": 0, "id": 1, "clause_number": 1, "title": 1}
+    ).to_list(None)
+    clauses_by_id = {c['id']: c for c in clauses}
     
     notifications = []
     for r in recs:
-        deadline = datetime.fromisoformat(r['deadline']) if isinstance(r['deadline'], str) else r['deadline']
-        if deadline.tzinfo is None:
-            deadline = deadline.replace(tzinfo=timezone.utc)
-        
+        deadline = to_utc(r['deadline'])
         days_left = (deadline - now).days
-        
-        if days_left <= 7:
-            clause = await db.clauses.find_one({"id": r['clause_id']}, {"_id": 0})
-            notifications.append({
-                "id": r['id'],
-                "clause_number": clause['clause_number'] if clause else "Unknown",
-                "clause_title": clause['title'] if clause else "Unknown",
-                "recommendation": r['recommendation_text'],
-                "deadline": r['deadline'],
-                "days_left": days_left,
-                "urgency": "critical" if days_left <= 3 else "warning"
-            })
-    
-    return {"notifications": sorted(notifications, key=lambda x: x['days_left'])}
+        if days_left > NOTIFICATION_WINDOW_DAYS:
+            continue
+        
+        clause = clauses_by_id.get(r['clause_id'])
+        notifications.append({
+            "id": r['id'],
+            "clause_number": clause['clause_number'] if clause else "Unknown",
+            "clause_title": clause['title'] if clause else "Unknown",
+            "recommendation": r['recommendation_text'],
+            "deadline": deadline,
+            "days_left": days_left,
+            "urgency": "critical" if days_left <= 3 else "warning"
+        })
+    
+    return sorted(notifications, key=lambda x: x['days_left'])
+
+@api_router.get("/recommendations/notifications")
+async def get_notifications(current_user: User = Depends(get_current_user)):
+    notifications = notifications_cache.get("all")
+    if notifications is None:
+        notifications = await _load_notifications(datetime.now(timezone.utc))
+        notifications_cache["all"] = notifications
+    
+    return FastJSONResponse({"notifications": notifications})
+
+async def _load_reminded_days(rec_ids: List[str]) -> Dict[str, int]:
+    recs = await db.recommendations.find(
+        {"id": {"$in": rec_ids}, "reminded_days_left": {"$ne": None}},
+        {"_id": 0, "id": 1, "reminded_days_left": 1}
+    ).to_list(None)
+    return {r['id']: r['reminded_days_left'] for r in recs}
+
+async def _save_reminded_days(reminded: Dict[str, int]) -> None:
+    await db.recommendations.bulk_write(
+        [UpdateOne({"id": rec_id}, {"$set": {"reminded_days_left": days_left}}) for rec_id, days_left in reminded.items()],
+        ordered=False
+    )
+
+deadline_scheduler = DeadlineScheduler(
+    event_bus,
+    lambda: _load_notifications(datetime.now(timezone.utc)),
+    _load_reminded_days,
+    _save_reminded_days,
+    DEADLINE_REMINDER_INTERVAL_SECONDS
+)
+
+# ============= EVENT ROUTES =============
+
+@api_router.get("/events")
+async def stream_events(request: Request, current_user: User = Depends(get_current_user)):
+    """Server-Sent Events: audit_result, dashboard, recommendation, deadline_reminder, resync"""
+    last_event_id = request.headers.get("last-event-id")
+    
+    async def event_stream() -> AsyncIterator[bytes]:
+        with event_bus.subscribe(last_event_id) as subscription:
+            # Kirim sesuatu segera agar proxy/browser menganggap stream sudah terbuka
+            yield SSE_HEARTBEAT
+            while not await request.is_disconnected():
+                event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+                yield format_sse(event) if event else SSE_HEARTBEAT
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ============= REPORT ROUTES =============
 
-@api_router.post("/reports/generate")
+async def run_report_job(job: JobContext) -> Dict[str, Any]:
+    await job.progress(0, 1, "Menyusun laporan")
+    generated_at = datetime.now(timezone.utc)
+    inputs = await load_report_inputs(db)
+    version = report_version(inputs, generated_at)
+    report = await get_cached_report(db, version)
+    cached = report is not None
+    if not cached:
+        try:
+            pdf_data = await build_report_pdf(db, storage, generated_at, inputs)
+        except Exception as e:
+            logging.error(f"Error generating report: {str(e)}")
+            import traceback
+            logging.error(traceback.format_exc())
+            raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+        
+        filename = f"Laporan_Audit_SMK3_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        report = await store_cached_report(db, storage, version, pdf_data, filename)
+    
+    # File hasil job berumur terbatas (dihapus saat purge), jadi disalin dari laporan cache
+    grid_out = await storage.open(report['file_id'])
+    result_file = await job.store_file(storage.iter_chunks(grid_out), report['filename'], REPORT_MIME_TYPE)
+    await job.progress(1, 1)
+    return {"data": {"cached": cached}, "file": result_file}
+
+@api_router.post("/reports/generate", status_code=202)
 async def generate_report(current_user: User = Depends(get_current_user)):
-    try:
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=30,
-            alignment=1
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12
-        )
-        
-        story.append(Paragraph("Laporan Audit SMK3", title_style))
-        story.append(Paragraph(f"Tanggal: {datetime.now(timezone.utc).strftime('%d %B %Y')}", styles['Normal']))
-        story.append(Spacer(1, 0.3*inch))
-        
-        dashboard_response = await get_dashboard(current_user)
-        dashboard = dashboard_response if isinstance(dashboard_response, dict) else dashboard_response.model_dump()
-        
-        story.append(Paragraph("Ringkasan Audit", heading_style))
-        summary_data = [
-            ['Metrik', 'Nilai'],
-            ['Total Klausul', str(dashboard['total_clauses'])],
-            ['Klausul Teraudit', str(dashboard['audited_clauses'])],
-            ['Klausul Dinilai Auditor', str(dashboard['auditor_assessed_clauses'])],
-            ['', ''],
-            ['Pencapaian Audit (Auditor)', f"{dashboard['achievement_percentage']:.1f}%"],
-            ['Klausul Confirm', str(dashboard['confirm_count'])],
-            ['Klausul Non-Confirm Minor', str(dashboard['non_confirm_minor_count'])],
-            ['Klausul Non-Confirm Major', str(dashboard['non_confirm_major_count'])],
-            ['', ''],
-            ['Rata-rata Skor AI (Referensi)', f"{dashboard['average_score']:.2f}"]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 0.3*inch))
-        
-        story.append(Paragraph("Skor Per Kriteria", heading_style))
-        criteria_data = [['Kriteria', 'Pencapaian', 'Confirm', 'Status', 'Progress']]
-        
-        for cs in dashboard['criteria_scores']:
-            strength = "Memuaskan" if cs['strength'] == 'strong' else "Baik" if cs['strength'] == 'moderate' else "Kurang"
-            progress = f"{cs['audited_clauses']}/{cs['total_clauses']}"
-            achievement = f"{cs['achievement_percentage']:.1f}%"
-            confirm_info = f"{cs.get('confirm_count', 0)}"
-            
-            criteria_data.append([
-                cs['name'],
-                achievement,
-                confirm_info,
-                strength,
-                progress
-            ])
-        
-        criteria_table = Table(criteria_data, colWidths=[2*inch, 1*inch, 0.8*inch, 1*inch, 0.9*inch])
-        criteria_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
-        
-        story.append(criteria_table)
-        story.append(PageBreak())
-        
-        story.append(Paragraph("Detail Hasil Audit", heading_style))
-        
-        results = await db.audit_results.find({}, {"_id": 0}).to_list(500)
-        
-        for result in results:
-            clause = await db.clauses.find_one({"id": result['clause_id']}, {"_id": 0})
-            if clause:
-                story.append(Paragraph(f"<b>Klausul {clause['clause_number']}: {clause['title']}</b>", styles['Normal']))
-                
-                # Penilaian Auditor (jika ada)
-                if result.get('auditor_status'):
-                    status_text = {
-                        'confirm': '✓ Confirm (Sesuai)',
-                        'non-confirm-minor': '⚠ Non-Confirm Minor',
-                        'non-confirm-major': '✗ Non-Confirm Major'
-                    }.get(result['auditor_status'], result['auditor_status'])
-                    
-                    story.append(Paragraph(f"<b>Penilaian Auditor:</b> {status_text}", styles['Normal']))
-                    
-                    if result.get('auditor_notes'):
-                        story.append(Paragraph(f"<b>Catatan Auditor:</b> {result['auditor_notes']}", styles['Normal']))
-                    
-                    if result.get('agreed_date'):
-                        try:
-                            date_obj = datetime.fromisoformat(result['agreed_date'])
-                            date_str = date_obj.strftime('%d %B %Y')
-                        except:
-                            date_str = result['agreed_date']
-                        story.append(Paragraph(f"<b>Tanggal Kesepakatan:</b> {date_str}", styles['Normal']))
-                
-                # AI Analysis (referensi)
-                story.append(Paragraph(f"<b>Analisis AI (Referensi):</b>", styles['Normal']))
-                story.append(Paragraph(f"Status: {result['status']} | Skor: {result['score']:.2f}", styles['Normal']))
-                story.append(Paragraph(f"Reasoning: {result['reasoning'][:150]}...", styles['Normal']))
-                story.append(Spacer(1, 0.2*inch))
-        
-        doc.build(story)
-        
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        
-        pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-        
-        return {
-            "filename": f"Laporan_Audit_SMK3_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            "content": pdf_base64,
-            "content_type": "application/pdf"
-        }
-        
-    except Exception as e:
-        logging.error(f"Error generating report: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    """Antrekan pembuatan laporan PDF; unduh lewat /jobs/{job_id}/download setelah selesai"""
+    job = await job_queue.submit("report", {}, current_user.id)
+    return _job_response(job, status_code=202)
+
+@api_router.get("/reports/latest")
+async def download_latest_report(request: Request, current_user: User = Depends(get_current_user)):
+    """Stream laporan PDF terakhir jika data audit belum berubah sejak dibuat; 404 jika perlu dibuat ulang"""
+    version = report_version(await load_report_inputs(db), datetime.now(timezone.utc))
+    report = await get_cached_report(db, version)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No up-to-date report, generate one via POST /reports/generate")
+    return await _document_file_response(request, report, "attachment")
 
 # ============= SEED DATA ROUTE =============
 
@@ -1242,17 +1535,18 @@ async def seed_initial_data(current_user: User = Depends(get_current_user)):
     if existing_criteria > 0:
         return {"message": "Data already seeded", "criteria_count": existing_criteria, "clauses_count": await db.clauses.count_documents({})}
     
-    # Run populate script
-    import subprocess
-    result = subprocess.run(
-        ["python", "populate_smk3_data.py"],
-        cwd="/app/backend",
-        capture_output=True,
-        text=True
-    )
+    # Upsert katalog in-process (bulk_write, tidak lagi lewat subprocess)
+    try:
+        diffs = await populate_data(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to seed data: {str(e)}")
+    for label, diff in diffs.items():
+        logging.info(f"Seed data by {current_user.email}: {label} {diff.counts()}")
+        logging.debug(diff.format(label))
     
-    if result.returncode != 0:
-        raise HTTPException(status_code=500, detail=f"Failed to seed data: {result.stderr}")
+    await rebuild_dashboard_summary(db)
+    invalidate_notifications_cache()
+    event_bus.publish("resync", {})
     
     criteria_count = await db.criteria.count_documents({})
     clauses_count = await db.clauses.count_documents({})
@@ -1260,7 +1554,8 @@ async def seed_initial_data(current_user: User = Depends(get_current_user)):
     return {
         "message": "SMK3 data seeded successfully with knowledge base",
         "criteria_count": criteria_count,
-        "clauses_count": clauses_count
+        "clauses_count": clauses_count,
+        "diff": {label.lower(): diff.counts() for label, diff in diffs.items()}
     }
 
 # ============= MAIN =============
@@ -1273,6 +1568,8 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    # Nama file unduhan langsung (mis. /reports/latest) dan cursor halaman berikutnya dibaca frontend dari header
+    expose_headers=["Content-Disposition", NEXT_CURSOR_HEADER],
 )
 
 logging.basicConfig(
@@ -1281,6 +1578,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def ensure_storage_indexes():
+    await storage.ensure_indexes()
+    await analysis_cache.ensure_indexes(db)
+    await evidence_ingest.ensure_indexes(db)
+    await job_queue.ensure_indexes()
+    await indexes.ensure_indexes(db)
+
+@app.on_event("startup")
+async def migrate_datetimes_on_startup():
+    # Data lama menyimpan tanggal sebagai string ISO; query range & serialisasi memakai BSON datetime
+    migrated = await migrate_datetime_fields(db)
+    if migrated:
+        logging.info(f"Converted ISO date strings to BSON datetimes on {migrated} documents")
+
+job_queue.register("preprocess", run_preprocess_job)
+job_queue.register("analyze", run_analysis_job)
+job_queue.register("zip_export", run_zip_export_job)
+job_queue.register("report", run_report_job)
+job_queue.register(BATCH_JOB_TYPE, analysis_batches.run_job)
+
+@app.on_event("startup")
+async def start_job_workers():
+    await job_queue.start()
+    # Setelah job yang lease-nya habis dikembalikan ke antrean oleh job_queue.start
+    await analysis_batches.recover_orphaned()
+    deadline_scheduler.start()
+
+@app.on_event("startup")
+async def rebuild_dashboard_on_startup():
+    # Populate script menulis langsung ke MongoDB, jadi summary disegarkan saat start
+    await rebuild_dashboard_summary(db)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await job_queue.stop()
+    await deadline_scheduler.stop()
+    await llm_provider.aclose()
+    client.close()
+    password_hasher.shutdown()
\ No newline at end of file
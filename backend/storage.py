@@ -0,0 +1,195 @@
+"""
+Storage evidence berbasis GridFS yang non-blocking.
+
+Semua akses file memakai AsyncIOMotorGridFSBucket sehingga upload, download,
+preview, export ZIP dan analisis AI tidak lagi memblokir event loop uvicorn.
+Bucket default "fs" dipakai agar file yang sudah tersimpan lewat
+`gridfs.GridFS` tetap terbaca.
+
+Upload disimpan content-addressed: setiap isi file unik (SHA-256) hanya punya
+satu file GridFS yang dicatat di koleksi `blobs` beserta ref_count. Record
+`documents` menunjuk ke file bersama tersebut, dan file baru dihapus saat
+referensi terakhirnya dilepas.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import AsyncIterator, NamedTuple, Optional, Union
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket, AsyncIOMotorGridOut
+
+FileId = Union[str, ObjectId]
+
+
+class UploadTooLargeError(Exception):
+    """Upload melebihi batas ukuran yang dikonfigurasi"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds maximum upload size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class StoredFile(NamedTuple):
+    file_id: ObjectId
+    size: int
+    sha256: str
+
+
+def _object_id(file_id: FileId) -> ObjectId:
+    return file_id if isinstance(file_id, ObjectId) else ObjectId(file_id)
+
+
+class EvidenceStorage:
+    """Operasi file GridFS async untuk dokumen evidence"""
+
+    def __init__(self, database: AsyncIOMotorDatabase, bucket_name: str = "fs"):
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+        self.blobs = database.blobs
+
+    async def ensure_indexes(self) -> None:
+        await self.blobs.create_index("sha256", unique=True)
+
+    async def put(self, data: bytes, filename: str, content_type: Optional[str] = None) -> ObjectId:
+        """Simpan bytes utuh sebagai file GridFS baru"""
+        return await self.bucket.upload_from_stream(
+            filename,
+            data,
+            metadata={"contentType": content_type}
+        )
+
+    async def put_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: Optional[str] = None,
+        max_size: Optional[int] = None
+    ) -> StoredFile:
+        """Tulis file ke GridFS chunk demi chunk sambil menghitung ukuran dan SHA-256.
+
+        Memori yang dipakai hanya sebesar satu chunk. Jika ukuran melewati
+        `max_size`, chunk yang sudah tertulis dibuang dan UploadTooLargeError
+        dilempar.
+        """
+        grid_in = self.bucket.open_upload_stream(filename, metadata={"contentType": content_type})
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(max_size)
+                digest.update(chunk)
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return StoredFile(grid_in._id, size, digest.hexdigest())
+
+    async def store_upload(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: Optional[str] = None,
+        max_size: Optional[int] = None
+    ) -> StoredFile:
+        """Simpan upload secara content-addressed dan tambah satu referensi ke blob-nya.
+
+        Isi file tetap di-stream ke GridFS karena hash baru diketahui setelah
+        chunk terakhir; jika isi yang sama sudah ada, salinan baru langsung
+        dihapus dan file_id blob yang lama yang dikembalikan.
+        """
+        stored = await self.put_stream(chunks, filename, content_type, max_size)
+        
+        while True:
+            try:
+                blob = await self.blobs.find_one_and_update(
+                    {"sha256": stored.sha256},
+                    {
+                        "$inc": {"ref_count": 1},
+                        "$setOnInsert": {
+                            "file_id": str(stored.file_id),
+                            "size": stored.size,
+                            "created_at": datetime.now(timezone.utc)
+                        }
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                # Upload paralel dengan isi yang sama memenangkan upsert; ulangi sebagai $inc biasa
+                continue
+        
+        if blob["file_id"] != str(stored.file_id):
+            await self.delete(stored.file_id)
+        return StoredFile(ObjectId(blob["file_id"]), stored.size, stored.sha256)
+
+    async def release(self, file_id: FileId, sha256: Optional[str]) -> bool:
+        """Lepas satu referensi dokumen ke file; return True jika file GridFS ikut dihapus"""
+        if sha256:
+            blob = await self.blobs.find_one_and_update(
+                {"sha256": sha256, "file_id": str(file_id)},
+                {"$inc": {"ref_count": -1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if blob is not None:
+                if blob["ref_count"] > 0:
+                    return False
+                # Hanya hapus jika tidak ada upload baru yang mengambil referensi di antaranya
+                result = await self.blobs.delete_one({"_id": blob["_id"], "ref_count": {"$lte": 0}})
+                if result.deleted_count == 0:
+                    return False
+        
+        # Blob tanpa record di `blobs` (upload sebelum deduplikasi) dimiliki satu dokumen saja
+        await self.delete(file_id)
+        return True
+
+    async def purge(self, file_ids) -> int:
+        """Hapus seluruh file yang diberikan beserta semua record blob (dipakai hard reset)"""
+        deleted = 0
+        for file_id in set(str(f) for f in file_ids):
+            try:
+                await self.delete(file_id)
+                deleted += 1
+            except Exception as e:
+                logging.warning(f"Failed to delete file {file_id} from GridFS: {str(e)}")
+        await self.blobs.delete_many({})
+        return deleted
+
+    async def open(self, file_id: FileId) -> AsyncIOMotorGridOut:
+        """Buka file untuk dibaca; metadata (length, upload_date) langsung tersedia"""
+        return await self.bucket.open_download_stream(_object_id(file_id))
+
+    async def iter_chunks(self, grid_out: AsyncIOMotorGridOut) -> AsyncIterator[bytes]:
+        """Baca file per chunk GridFS tanpa memuat seluruh isi ke memori"""
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+
+    async def iter_range(self, grid_out: AsyncIOMotorGridOut, start: int, end: int) -> AsyncIterator[bytes]:
+        """Baca byte `start`..`end` (inklusif) langsung dari chunk GridFS yang relevan"""
+        await grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+
+    async def read(self, file_id: FileId) -> bytes:
+        """Baca seluruh isi file; hanya untuk konsumen yang memang butuh bytes utuh"""
+        grid_out = await self.open(file_id)
+        return await grid_out.read()
+
+    async def delete(self, file_id: FileId) -> None:
+        await self.bucket.delete(_object_id(file_id))
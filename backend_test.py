@@ -101,6 +101,19 @@ class SMK3AuditAPITester:
             })
             return False, {}
 
+
+    def wait_for_job(self, job, timeout=120):
+        """Poll a background job until it finishes; returns the final job or None"""
+        deadline = time.time() + timeout
+        headers = {'Authorization': f'Bearer {self.token}'}
+        while time.time() < deadline:
+            response = requests.get(f"{self.api_url}/jobs/{job['id']}", headers=headers)
+            job = response.json()
+            if job.get('status') in ('completed', 'failed', 'cancelled'):
+                return job
+            time.sleep(1)
+        print(f"   ❌ Job {job.get('id')} did not finish within {timeout}s")
+        return None
     def test_health_check(self):
         """Test API health check"""
         success, _ = self.run_test("Health Check", "GET", "", 200)
@@ -291,14 +304,19 @@ class SMK3AuditAPITester:
         
         print("   🤖 Starting AI analysis (this may take 10-15 seconds)...")
         
-        success, response = self.run_test(
+        success, job = self.run_test(
             "AI Audit Analysis",
             "POST",
             f"audit/analyze/{self.test_clause_id}",
-            200
+            202
         )
         
         if success:
+            job = self.wait_for_job(job)
+            success = bool(job) and job['status'] == 'completed'
+        
+        if success:
+            response = job['result']
             print(f"   ✅ AI Analysis completed")
             print(f"   📊 Score: {response.get('score', 0)}")
             print(f"   📋 Status: {response.get('status', 'Unknown')}")
@@ -399,24 +417,75 @@ class SMK3AuditAPITester:
         
         return success
 
+    def test_event_stream(self):
+        """Test SSE push: update rekomendasi muncul sebagai event `recommendation`"""
+        if not self.test_recommendation_id:
+            print("   ❌ No recommendation ID available for event stream testing")
+            return False
+        
+        self.token = self.auditee_token
+        headers = {'Authorization': f'Bearer {self.token}'}
+        self.tests_run += 1
+        print("\n🔍 Testing Event Stream...")
+        
+        success = False
+        try:
+            with requests.get(f"{self.api_url}/events", headers=headers, stream=True, timeout=30) as stream:
+                if stream.status_code == 200 and stream.headers.get('content-type', '').startswith('text/event-stream'):
+                    requests.put(
+                        f"{self.api_url}/recommendations/{self.test_recommendation_id}",
+                        json={"status": "in_progress"},
+                        headers=headers
+                    )
+                    deadline = time.time() + 20
+                    for line in stream.iter_lines(decode_unicode=True):
+                        if line == 'event: recommendation':
+                            success = True
+                            break
+                        if time.time() > deadline:
+                            break
+        except requests.exceptions.RequestException as e:
+            print(f"   Error: {str(e)}")
+        
+        if success:
+            self.tests_passed += 1
+        print(f"   {'✅' if success else '❌'} Recommendation event {'received' if success else 'not received'}")
+        return success
+
     def test_report_generation(self):
         """Test PDF report generation"""
         self.token = self.admin_token
         
         print("   📄 Generating PDF report (this may take a few seconds)...")
         
-        success, response = self.run_test(
+        success, job = self.run_test(
             "Generate PDF Report",
             "POST",
             "reports/generate",
-            200
+            202
         )
         
         if success:
-            filename = response.get('filename', 'Unknown')
-            content_length = len(response.get('content', ''))
-            print(f"   ✅ Report generated: {filename}")
-            print(f"   📄 Content size: {content_length} characters (base64)")
+            job = self.wait_for_job(job)
+            success = bool(job) and job['status'] == 'completed'
+        
+        if success:
+            download = requests.get(
+                f"{self.api_url}/jobs/{job['id']}/download",
+                headers={'Authorization': f'Bearer {self.token}'}
+            )
+            success = download.status_code == 200 and download.content.startswith(b'%PDF')
+            print(f"   ✅ Report generated: {job['result_file']['filename']}")
+            print(f"   📄 Content size: {len(download.content)} bytes")
+        
+        if success:
+            # Data audit belum berubah, jadi laporan terakhir bisa diunduh langsung
+            latest = requests.get(
+                f"{self.api_url}/reports/latest",
+                headers={'Authorization': f'Bearer {self.token}'}
+            )
+            success = latest.status_code == 200 and latest.headers.get('content-type') == 'application/pdf'
+            print(f"   {'✅' if success else '❌'} Cached report: {latest.status_code} ({len(latest.content)} bytes)")
         
         return success
 
@@ -437,6 +506,7 @@ class SMK3AuditAPITester:
             ("Dashboard Stats", self.test_dashboard_stats),
             ("Recommendations", self.test_recommendations),
             ("Notifications", self.test_notifications),
+            ("Event Stream", self.test_event_stream),
             ("Report Generation", self.test_report_generation)
         ]
         
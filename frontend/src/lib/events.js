@@ -0,0 +1,85 @@
+import { useEffect, useRef } from 'react';
+
+const RECONNECT_MIN_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Pecah satu blok SSE ("id: ..\nevent: ..\ndata: ..") menjadi event; komentar heartbeat diabaikan
+function parseBlock(block) {
+  const event = { id: null, type: 'message', data: '' };
+  for (const line of block.split('\n')) {
+    if (!line || line.startsWith(':')) continue;
+    const index = line.indexOf(':');
+    const field = index === -1 ? line : line.slice(0, index);
+    const value = index === -1 ? '' : line.slice(index + 1).replace(/^ /, '');
+    if (field === 'id') event.id = value;
+    else if (field === 'event') event.type = value;
+    else if (field === 'data') event.data += value;
+  }
+  return event.data ? event : null;
+}
+
+// Berlangganan GET /events. EventSource tidak bisa mengirim header Authorization,
+// jadi stream dibaca lewat fetch; reconnect otomatis dengan Last-Event-ID.
+// Return fungsi untuk berhenti berlangganan.
+export function subscribeEvents(API, onEvent) {
+  const controller = new AbortController();
+  let lastEventId = null;
+
+  const run = async () => {
+    let delay = RECONNECT_MIN_MS;
+    while (!controller.signal.aborted) {
+      try {
+        const headers = { Accept: 'text/event-stream' };
+        const token = localStorage.getItem('token');
+        if (token) headers.Authorization = `Bearer ${token}`;
+        if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+
+        const response = await fetch(`${API}/events`, { headers, signal: controller.signal });
+        if (response.status === 401) return;
+        if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+        delay = RECONNECT_MIN_MS;
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+          let index;
+          while ((index = buffer.indexOf('\n\n')) !== -1) {
+            const event = parseBlock(buffer.slice(0, index));
+            buffer = buffer.slice(index + 2);
+            if (!event) continue;
+            if (event.id) lastEventId = event.id;
+            try {
+              onEvent(event.type, JSON.parse(event.data));
+            } catch (error) {
+              console.error('Error handling event:', error);
+            }
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+      }
+      await sleep(delay);
+      delay = Math.min(delay * 2, RECONNECT_MAX_MS);
+    }
+  };
+
+  run();
+  return () => controller.abort();
+}
+
+// Hook: handlers = { audit_result: (data) => ..., dashboard: ..., resync: ... }
+export function useServerEvents(API, handlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => subscribeEvents(API, (type, data) => {
+    const handler = handlersRef.current[type];
+    if (handler) handler(data);
+  }), [API]);
+}
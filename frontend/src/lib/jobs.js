@@ -0,0 +1,59 @@
+import axios from 'axios';
+
+const FINISHED_STATUSES = ['completed', 'failed', 'cancelled'];
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Poll status job background sampai selesai; lempar Error jika gagal/dibatalkan
+export async function waitForJob(API, job, { onProgress, intervalMs = 1500 } = {}) {
+  let current = job;
+  while (!FINISHED_STATUSES.includes(current.status)) {
+    await sleep(intervalMs);
+    const response = await axios.get(`${API}/jobs/${current.id}`);
+    current = response.data;
+    if (onProgress) onProgress(current);
+  }
+
+  if (current.status !== 'completed') {
+    throw new Error(current.error || (current.status === 'cancelled' ? 'Job dibatalkan' : 'Job gagal'));
+  }
+  return current;
+}
+
+// Simpan blob hasil download ke file lokal lewat link sementara
+export function downloadBlob(data, mimeType, filename) {
+  const url = window.URL.createObjectURL(new Blob([data], { type: mimeType }));
+  const link = document.createElement('a');
+  link.href = url;
+  link.setAttribute('download', filename || 'download');
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  window.URL.revokeObjectURL(url);
+}
+
+// Ambil nama file dari header Content-Disposition (attachment; filename="...")
+export function filenameFromDisposition(header) {
+  const match = /filename="?([^";]+)"?/.exec(header || '');
+  return match ? match[1] : undefined;
+}
+
+// Unduh file hasil job (ZIP / PDF) lewat link bertoken berumur pendek, agar browser
+// streaming langsung ke disk alih-alih menampung seluruh file di memori sebagai Blob
+export async function downloadJobResult(API, job) {
+  const response = await axios.post(`${API}/jobs/${job.id}/download-link`);
+  const link = document.createElement('a');
+  link.href = `${API}/jobs/${job.id}/file?token=${encodeURIComponent(response.data.token)}`;
+  link.setAttribute('download', job.result_file?.filename || 'download');
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+}
+
+// Submit job, tunggu selesai, lalu unduh hasilnya
+export async function runDownloadJob(API, submitUrl, options = {}) {
+  const response = await axios.post(submitUrl);
+  const job = await waitForJob(API, response.data, options);
+  await downloadJobResult(API, job);
+  return job;
+}
@@ -0,0 +1,13 @@
+import axios from 'axios';
+
+// Ambil semua halaman endpoint daftar; cursor halaman berikutnya ada di header X-Next-Cursor
+export async function fetchAllPages(url, params = {}) {
+  const items = [];
+  let after;
+  do {
+    const response = await axios.get(url, { params: after ? { ...params, after } : params });
+    items.push(...response.data);
+    after = response.headers['x-next-cursor'];
+  } while (after);
+  return items;
+}
@@ -19,6 +19,9 @@ import { format } from 'date-fns';
 import { id as idLocale } from 'date-fns/locale';
 import { Upload, FileText, Trash2, Play, CheckCircle, XCircle, Loader2, Eye, Download, Archive, RefreshCw, Calendar as CalendarIcon, Save } from 'lucide-react';
 import { toast } from 'sonner';
+import { runDownloadJob, waitForJob } from '@/lib/jobs';
+import { useServerEvents } from '@/lib/events';
+import { fetchAllPages } from '@/lib/pagination';
 
 const AuditPage = () => {
   const { API, user } = useContext(AppContext);
@@ -58,6 +61,18 @@ const AuditPage = () => {
     }
   }, [selectedClause]);
 
+  // Hasil analisis / penilaian auditor klausul yang sedang dibuka di-push server
+  useServerEvents(API, {
+    audit_result: (data) => {
+      if (selectedClause && data.clause_id === selectedClause.id) {
+        setAuditResult(data.result);
+      }
+    },
+    resync: () => {
+      if (selectedClause) fetchAuditResult(selectedClause.id);
+    }
+  });
+
   useEffect(() => {
     if (auditResult) {
       setAuditorAssessment({
@@ -70,8 +85,7 @@ const AuditPage = () => {
 
   const fetchCriteria = async () => {
     try {
-      const response = await axios.get(`${API}/criteria`);
-      setCriteria(response.data);
+      setCriteria(await fetchAllPages(`${API}/criteria`));
     } catch (error) {
       toast.error('Gagal memuat kriteria');
     }
@@ -79,10 +93,10 @@ const AuditPage = () => {
 
   const fetchClauses = async (criteriaId) => {
     try {
-      const response = await axios.get(`${API}/clauses?criteria_id=${criteriaId}`);
-      setClauses(response.data);
-      if (response.data.length > 0) {
-        setSelectedClause(response.data[0]);
+      const data = await fetchAllPages(`${API}/clauses`, { criteria_id: criteriaId });
+      setClauses(data);
+      if (data.length > 0) {
+        setSelectedClause(data[0]);
       }
     } catch (error) {
       toast.error('Gagal memuat klausul');
@@ -91,8 +105,7 @@ const AuditPage = () => {
 
   const fetchDocuments = async (clauseId) => {
     try {
-      const response = await axios.get(`${API}/clauses/${clauseId}/documents`);
-      setDocuments(response.data);
+      setDocuments(await fetchAllPages(`${API}/clauses/${clauseId}/documents`));
     } catch (error) {
       console.error('Error fetching documents:', error);
     }
@@ -187,10 +200,13 @@ const AuditPage = () => {
     }
   };
 
-  const handleDownloadAllDocuments = () => {
+  const handleDownloadAllDocuments = async () => {
     if (!selectedClause) return;
-    const downloadUrl = `${API}/clauses/${selectedClause.id}/documents/download-all`;
-    window.open(downloadUrl, '_blank');
+    try {
+      await runDownloadJob(API, `${API}/clauses/${selectedClause.id}/documents/download-all`);
+    } catch (error) {
+      toast.error(error.response?.data?.detail || error.message || 'Gagal mengunduh dokumen');
+    }
   };
 
   const isPdfOrImage = (filename) => {
@@ -262,10 +278,11 @@ const AuditPage = () => {
     setAnalyzing(true);
     try {
       const response = await axios.post(`${API}/audit/analyze/${selectedClause.id}`);
-      setAuditResult(response.data);
+      const job = await waitForJob(API, response.data);
+      setAuditResult(job.result);
       toast.success('Analisis selesai!');
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Gagal menganalisis dokumen');
+      toast.error(error.response?.data?.detail || error.message || 'Gagal menganalisis dokumen');
     } finally {
       setAnalyzing(false);
     }
@@ -12,6 +12,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from '@/components/ui/accordion';
 import { Plus, BookOpen, Edit } from 'lucide-react';
 import { toast } from 'sonner';
+import { fetchAllPages } from '@/lib/pagination';
 
 const ClausesPage = () => {
   const { API, user } = useContext(AppContext);
@@ -35,12 +36,12 @@ const ClausesPage = () => {
 
   const fetchData = async () => {
     try {
-      const [criteriaRes, clausesRes] = await Promise.all([
-        axios.get(`${API}/criteria`),
-        axios.get(`${API}/clauses`)
+      const [criteriaList, clauseList] = await Promise.all([
+        fetchAllPages(`${API}/criteria`),
+        fetchAllPages(`${API}/clauses`)
       ]);
-      setCriteria(criteriaRes.data);
-      setClauses(clausesRes.data);
+      setCriteria(criteriaList);
+      setClauses(clauseList);
     } catch (error) {
       toast.error('Gagal memuat data');
     } finally {
@@ -11,6 +11,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from '@/components/ui/alert-dialog';
 import { Plus, Trash2, ListOrdered } from 'lucide-react';
 import { toast } from 'sonner';
+import { fetchAllPages } from '@/lib/pagination';
 
 const CriteriaPage = () => {
   const { API, user } = useContext(AppContext);
@@ -25,8 +26,7 @@ const CriteriaPage = () => {
 
   const fetchCriteria = async () => {
     try {
-      const response = await axios.get(`${API}/criteria`);
-      setCriteria(response.data);
+      setCriteria(await fetchAllPages(`${API}/criteria`));
     } catch (error) {
       toast.error('Gagal memuat kriteria');
     } finally {
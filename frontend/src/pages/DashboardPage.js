@@ -7,6 +7,8 @@ import { Progress } from '@/components/ui/progress';
 import { Button } from '@/components/ui/button';
 import { BarChart3, CheckCircle2, XCircle, FileCheck, TrendingUp, AlertTriangle, Download, Archive } from 'lucide-react';
 import { toast } from 'sonner';
+import { runDownloadJob } from '@/lib/jobs';
+import { useServerEvents } from '@/lib/events';
 
 const DashboardPage = () => {
   const { API } = useContext(AppContext);
@@ -19,6 +21,17 @@ const DashboardPage = () => {
     fetchNotifications();
   }, []);
 
+  // Statistik dan notifikasi diperbarui lewat push server, bukan polling
+  useServerEvents(API, {
+    dashboard: (data) => setStats(data),
+    recommendation: () => fetchNotifications(),
+    deadline_reminder: () => fetchNotifications(),
+    resync: () => {
+      fetchDashboard();
+      fetchNotifications();
+    }
+  });
+
   const fetchDashboard = async () => {
     try {
       const response = await axios.get(`${API}/audit/dashboard`);
@@ -39,16 +52,24 @@ const DashboardPage = () => {
     }
   };
 
-  const handleDownloadAllEvidence = () => {
-    const downloadUrl = `${API}/audit/download-all-evidence`;
-    window.open(downloadUrl, '_blank');
-    toast.success('Mengunduh semua evidence...');
+  const handleDownloadAllEvidence = async () => {
+    toast.info('Menyiapkan ZIP semua evidence...');
+    try {
+      await runDownloadJob(API, `${API}/audit/download-all-evidence`);
+      toast.success('Evidence berhasil diunduh!');
+    } catch (error) {
+      toast.error(error.response?.data?.detail || error.message || 'Gagal mengunduh evidence');
+    }
   };
 
-  const handleDownloadCriteriaEvidence = (criteriaId, criteriaName) => {
-    const downloadUrl = `${API}/audit/download-criteria-evidence/${criteriaId}`;
-    window.open(downloadUrl, '_blank');
-    toast.success(`Mengunduh evidence ${criteriaName}...`);
+  const handleDownloadCriteriaEvidence = async (criteriaId, criteriaName) => {
+    toast.info(`Menyiapkan ZIP evidence ${criteriaName}...`);
+    try {
+      await runDownloadJob(API, `${API}/audit/download-criteria-evidence/${criteriaId}`);
+      toast.success(`Evidence ${criteriaName} berhasil diunduh!`);
+    } catch (error) {
+      toast.error(error.response?.data?.detail || error.message || 'Gagal mengunduh evidence');
+    }
   };
 
   if (loading) {
@@ -13,6 +13,7 @@ import { Badge } from '@/components/ui/badge';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Plus, Calendar, CheckCircle, Clock, AlertCircle } from 'lucide-react';
 import { toast } from 'sonner';
+import { fetchAllPages } from '@/lib/pagination';
 
 const RecommendationsPage = () => {
   const { API, user } = useContext(AppContext);
@@ -32,12 +33,13 @@ const RecommendationsPage = () => {
 
   const fetchData = async () => {
     try {
-      const [recsRes, clausesRes] = await Promise.all([
-        axios.get(`${API}/recommendations`),
-        axios.get(`${API}/clauses`)
+      // Klausul hanya dipakai untuk label & pilihan form
+      const [recs, clauseList] = await Promise.all([
+        fetchAllPages(`${API}/recommendations`),
+        fetchAllPages(`${API}/clauses`, { fields: 'id,clause_number,title' })
       ]);
-      setRecommendations(recsRes.data);
-      setClauses(clausesRes.data);
+      setRecommendations(recs);
+      setClauses(clauseList);
     } catch (error) {
       toast.error('Gagal memuat data');
     } finally {
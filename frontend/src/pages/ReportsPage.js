@@ -6,6 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { FileText, Download, Loader2 } from 'lucide-react';
 import { toast } from 'sonner';
+import { downloadBlob, downloadJobResult, filenameFromDisposition, waitForJob } from '@/lib/jobs';
 
 const ReportsPage = () => {
   const { API } = useContext(AppContext);
@@ -14,22 +15,22 @@ const ReportsPage = () => {
   const handleGenerateReport = async () => {
     setGenerating(true);
     try {
-      const response = await axios.post(`${API}/reports/generate`);
-      const { filename, content } = response.data;
-      
-      const blob = new Blob([Uint8Array.from(atob(content), c => c.charCodeAt(0))], { type: 'application/pdf' });
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement('a');
-      a.href = url;
-      a.download = filename;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
+      // Laporan terakhir masih berlaku selama data audit belum berubah (404 jika perlu dibuat ulang)
+      const latest = await axios.get(`${API}/reports/latest`, {
+        responseType: 'blob',
+        validateStatus: (status) => status === 200 || status === 404
+      });
+      if (latest.status === 200) {
+        downloadBlob(latest.data, 'application/pdf', filenameFromDisposition(latest.headers['content-disposition']) || 'Laporan_Audit_SMK3.pdf');
+      } else {
+        const response = await axios.post(`${API}/reports/generate`);
+        const job = await waitForJob(API, response.data);
+        await downloadJobResult(API, job);
+      }
       
       toast.success('Laporan berhasil diunduh!');
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Gagal membuat laporan');
+      toast.error(error.response?.data?.detail || error.message || 'Gagal membuat laporan');
     } finally {
       setGenerating(false);
     }
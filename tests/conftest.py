@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modul backend diimpor langsung (mis. `import jobs`), sama seperti server.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
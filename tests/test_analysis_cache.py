@@ -0,0 +1,30 @@
+from analysis_cache import analysis_fingerprint
+
+CLAUSE = {"title": "Kebijakan K3", "description": "d", "knowledge_base": "kb"}
+PROMPTS = ["system {knowledge_base}", "user"]
+CONTEXT = {"budget_tokens": 100000, "max_map_calls": 8}
+
+
+def _fingerprint(documents, context=CONTEXT, model="stub"):
+    return analysis_fingerprint(CLAUSE, documents, PROMPTS, model, context)
+
+
+def test_fingerprint_ignores_document_order_and_duplicates():
+    a = {"id": "a", "sha256": "x"}
+    b = {"id": "b", "sha256": "y"}
+    assert _fingerprint([a, b]) == _fingerprint([b, a, {"id": "c", "sha256": "x"}])
+
+
+def test_fingerprint_changes_when_preprocessing_finishes():
+    raw = {"id": "a", "sha256": "x"}
+    preprocessed = {**raw, "preprocessing": {"artifact_key": "2:x:terms"}}
+    assert _fingerprint([raw]) != _fingerprint([preprocessed])
+    reprocessed = {**raw, "preprocessing": {"artifact_key": "3:x:terms"}}
+    assert _fingerprint([preprocessed]) != _fingerprint([reprocessed])
+
+
+def test_fingerprint_changes_with_context_budget_and_model():
+    documents = [{"id": "a", "file_id": "f1"}]
+    assert _fingerprint(documents) != _fingerprint(documents, context={**CONTEXT, "budget_tokens": 50000})
+    assert _fingerprint(documents) != _fingerprint(documents, context={**CONTEXT, "max_map_calls": 2})
+    assert _fingerprint(documents) != _fingerprint(documents, model="other")
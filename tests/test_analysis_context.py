@@ -0,0 +1,48 @@
+from analysis_context import IMAGE_TOKENS, estimate_cost, plan_context
+
+CLAUSE = {"title": "Kebijakan K3", "description": "Kebijakan tertulis", "knowledge_base": "kebijakan ditandatangani direksi"}
+
+
+def _doc(doc_id, filename, size, **extra):
+    return {"id": doc_id, "filename": filename, "mime_type": "application/octet-stream", "size": size, **extra}
+
+
+def _text_artifact(text):
+    return {"kind": "text", "pages": [{"text": text}]}
+
+
+def test_estimate_cost():
+    assert estimate_cost(_doc("a", "a.bin", 1600), None) == 100
+    assert estimate_cost({"id": "b", "mime_type": "image/png", "size": 10 ** 6}, None) == IMAGE_TOKENS
+    assert estimate_cost(_doc("c", "c.txt", 0), _text_artifact("x" * 400)) == 101
+
+
+def test_everything_fits_in_one_call():
+    documents = [_doc("a", "foto.bin", 160), _doc("b", "kebijakan_k3.bin", 160)]
+    plan = plan_context(CLAUSE, documents, {}, budget_tokens=100, max_batches=3)
+    assert not plan.is_map_reduce
+    assert plan.skipped == []
+    # Nama file yang cocok dengan kata kunci klausul didahulukan
+    assert [doc["id"] for doc in plan.documents(0)] == ["b", "a"]
+
+
+def test_duplicate_content_is_sent_once():
+    documents = [_doc("a", "a.bin", 160, sha256="x"), _doc("b", "b.bin", 160, sha256="x")]
+    plan = plan_context(CLAUSE, documents, {}, budget_tokens=100, max_batches=3)
+    assert [doc["id"] for doc in plan.documents(0)] == ["a"]
+
+
+def test_map_reduce_batches_and_skips_least_relevant():
+    artifacts = {
+        "a": _text_artifact("kebijakan direksi " * 20),
+        "b": _text_artifact("kebijakan lain " * 25),
+        "c": _text_artifact("kebijakan daftar hadir rapat " * 13),
+        "d": _text_artifact("lain lain " * 40),
+    }
+    documents = [_doc(doc_id, f"{doc_id}.txt", 0) for doc_id in "dcba"]
+    plan = plan_context(CLAUSE, documents, artifacts, budget_tokens=120, max_batches=2)
+
+    assert plan.is_map_reduce
+    assert [[item.doc["id"] for item in batch] for batch in plan.batches] == [["a"], ["b"]]
+    assert [item.doc["id"] for item in plan.skipped] == ["c", "d"]
+    assert all(sum(item.cost for item in batch) <= 120 for batch in plan.batches)
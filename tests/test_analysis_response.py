@@ -0,0 +1,59 @@
+import pytest
+
+from analysis_response import parse_analysis_response, parse_score
+
+
+@pytest.mark.parametrize("value, expected", [
+    (85, 85.0),
+    ("85", 85.0),
+    ("85/100", 85.0),
+    ("8.5/10", 85.0),
+    ("7,5 / 10", 75.0),
+    ("90%", 90.0),
+    ("Skor: 150", 100.0),
+    (-5, 0.0),
+])
+def test_parse_score(value, expected):
+    assert parse_score(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [None, True, "tidak ada"])
+def test_parse_score_without_number(value):
+    assert parse_score(value) is None
+
+
+def test_valid_json():
+    parsed = parse_analysis_response(
+        '{"status": "Sesuai", "score": 88, "reasoning": "Lengkap", '
+        '"feedback": "Baik", "improvement_suggestions": "-"}'
+    )
+    assert parsed.method == "json"
+    assert parsed.result.status == "Sesuai"
+    assert parsed.result.score == 88
+
+
+def test_broken_json_is_repaired():
+    text = 'Berikut hasilnya:\n```json\n{“status”: “Belum Sesuai”, "skor": "4/10", "alasan": "Kurang",}\n```'
+    parsed = parse_analysis_response(text)
+    assert parsed.method == "repaired_json"
+    assert parsed.result.status == "Belum Sesuai"
+    assert parsed.result.score == 40
+    assert parsed.result.reasoning == "Kurang"
+
+
+def test_labeled_text_fallback():
+    text = "Status: Belum Sesuai\nSkor: 8.5/10\nAlasan: Dokumen ada\ntetapi belum ditandatangani\nSaran Perbaikan: Lengkapi tanda tangan"
+    parsed = parse_analysis_response(text)
+    assert parsed.method == "text"
+    # Skor di atas batas kelulusan menjadikan status Sesuai
+    assert parsed.result.status == "Sesuai"
+    assert parsed.result.score == 85
+    assert parsed.result.reasoning == "Dokumen ada tetapi belum ditandatangani"
+    assert parsed.result.improvement_suggestions == "Lengkapi tanda tangan"
+
+
+def test_unstructured_text():
+    parsed = parse_analysis_response("Maaf, saya tidak dapat menilai dokumen ini.")
+    assert parsed.method == "unstructured"
+    assert parsed.result.status == "Belum Sesuai"
+    assert parsed.result.score == 0
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from jobs import JobQueue
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def _queue(**options) -> JobQueue:
+    db = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["jobs_test"]
+    # Storage hanya dipakai untuk file hasil job, yang tidak diuji di sini
+    return JobQueue(db, storage=None, retry_base_delay=0.0, **options)
+
+
+async def _make_due(queue: JobQueue, job_id: str) -> None:
+    await queue.db.jobs.update_one(
+        {"id": job_id},
+        {"$set": {"run_after": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+
+
+def test_failed_job_is_retried_then_completes():
+    async def scenario():
+        queue = _queue(max_attempts=3)
+        calls = []
+
+        async def flaky(job):
+            calls.append(job.params["n"])
+            if len(calls) == 1:
+                raise RuntimeError("temporary error")
+            return {"data": {"n": job.params["n"]}}
+
+        queue.register("flaky", flaky)
+        submitted = await queue.submit("flaky", {"n": 7}, "u1")
+
+        job = await queue._claim()
+        assert job["id"] == submitted["id"] and job["attempts"] == 1
+        assert job["lease_expires_at"] > datetime.now(timezone.utc)
+        await queue._execute(job)
+
+        retried = await queue.get(submitted["id"])
+        assert retried["status"] == "queued"
+        assert retried["error"] == "temporary error"
+        assert retried["worker_id"] is None
+
+        await _make_due(queue, submitted["id"])
+        job = await queue._claim()
+        assert job["attempts"] == 2
+        await queue._execute(job)
+
+        finished = await queue.get(submitted["id"])
+        assert finished["status"] == "completed"
+        assert finished["result"] == {"n": 7}
+        assert finished["expires_at"] > finished["finished_at"]
+        assert calls == [7, 7]
+
+    asyncio.run(scenario())
+
+
+def test_job_fails_after_max_attempts_and_client_errors_are_not_retried():
+    async def scenario():
+        queue = _queue(max_attempts=2)
+
+        async def broken(job):
+            raise RuntimeError("still broken")
+
+        async def rejected(job):
+            raise HTTPException(status_code=400, detail="Clause not found")
+
+        queue.register("broken", broken)
+        queue.register("rejected", rejected)
+        broken_job = await queue.submit("broken", {}, "u1")
+        for _ in range(2):
+            await _make_due(queue, broken_job["id"])
+            await queue._execute(await queue._claim())
+        failed = await queue.get(broken_job["id"])
+        assert failed["status"] == "failed"
+        assert failed["attempts"] == 2
+        assert failed["error_status_code"] == 500
+
+        rejected_job = await queue.submit("rejected", {}, "u1")
+        await queue._execute(await queue._claim())
+        failed = await queue.get(rejected_job["id"])
+        assert failed["status"] == "failed"
+        assert failed["attempts"] == 1
+        assert failed["error_status_code"] == 400
+
+    asyncio.run(scenario())
+
+
+def test_job_is_not_claimed_twice():
+    async def scenario():
+        queue = _queue()
+
+        async def noop(job):
+            return {}
+
+        queue.register("noop", noop)
+        await queue.submit("noop", {}, "u1")
+        assert await queue._claim() is not None
+        assert await queue._claim() is None
+
+    asyncio.run(scenario())
+
+
+def test_dedicated_worker_only_claims_its_job_type():
+    async def scenario():
+        queue = _queue(dedicated_workers={"preprocess": 1})
+
+        async def noop(job):
+            return {}
+
+        queue.register("zip_export", noop)
+        queue.register("preprocess", noop)
+        await queue.submit("zip_export", {}, "u1")
+        preprocess = await queue.submit("preprocess", {}, "u1")
+
+        # Slot preprocess tidak ikut mengambil export yang antre lebih dulu
+        job = await queue._claim(["preprocess"])
+        assert job["id"] == preprocess["id"]
+        assert "_id" not in job
+        assert await queue._claim(["preprocess"]) is None
+        assert (await queue._claim())["type"] == "zip_export"
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_requeued_or_failed():
+    async def scenario():
+        queue = _queue(max_attempts=2)
+
+        async def noop(job):
+            return {}
+
+        queue.register("noop", noop)
+        first = await queue.submit("noop", {}, "u1")
+        second = await queue.submit("noop", {}, "u1")
+        await queue._claim()
+        await queue._claim()
+
+        # Worker hilang: lease kedua job habis; job kedua sudah memakai semua percobaan
+        expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await queue.db.jobs.update_many({}, {"$set": {"lease_expires_at": expired}})
+        await queue.db.jobs.update_one({"id": second["id"]}, {"$set": {"attempts": 2}})
+
+        assert await queue.requeue_expired() == 1
+        requeued = await queue.get(first["id"])
+        assert requeued["status"] == "queued"
+        assert requeued["worker_id"] is None and requeued["lease_expires_at"] is None
+        failed = await queue.get(second["id"])
+        assert failed["status"] == "failed"
+        assert failed["error"] == "Worker stopped while running the job"
+
+        # Lease yang masih berlaku tidak disentuh
+        job = await queue._claim()
+        assert job["id"] == first["id"]
+        assert await queue.requeue_expired() == 0
+
+    asyncio.run(scenario())
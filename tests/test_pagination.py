@@ -0,0 +1,28 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from pagination import _after_filter, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    cursor = encode_cursor(["1.2", 3, oid])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, ["clause_number", "order", "_id"]) == ["1.2", 3, oid]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor(["a", "not-an-object-id"])])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, ["order", "_id"])
+    assert exc_info.value.status_code == 400
+
+
+def test_after_filter_compares_keys_in_order():
+    oid = ObjectId()
+    assert _after_filter(["_id"], [oid]) == {"_id": {"$gt": oid}}
+    assert _after_filter(["order", "_id"], [2, oid]) == {"$or": [
+        {"order": {"$gt": 2}},
+        {"order": 2, "_id": {"$gt": oid}},
+    ]}
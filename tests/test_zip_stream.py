@@ -0,0 +1,42 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+
+from zip_stream import ZipEntry, stream_zip
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _entries(files):
+    for path, data, modified_at in files:
+        yield ZipEntry(path, len(data), modified_at, _chunks(data))
+
+
+async def _collect(files) -> bytes:
+    return b"".join([chunk async for chunk in stream_zip(_entries(files))])
+
+
+def test_stream_zip_produces_valid_archive():
+    files = [
+        ("Kriteria 1/1.1.1/kebijakan.pdf", b"%PDF-1.4 " * 500, datetime(2024, 5, 1, 8, 30)),
+        ("Kriteria 1/1.1.2/foto.jpg", bytes(range(256)) * 10, None),
+        ("Kriteria 2/kosong.txt", b"", datetime(1970, 1, 1)),
+    ]
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(_collect(files))))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == [path for path, _, _ in files]
+    for path, data, _ in files:
+        assert archive.read(path) == data
+    assert archive.getinfo(files[0][0]).date_time == (2024, 5, 1, 8, 30, 0)
+    # Tanggal sebelum 1980 tidak bisa disimpan di ZIP
+    assert archive.getinfo(files[2][0]).date_time == (1980, 1, 1, 0, 0, 0)
+
+
+def test_stream_zip_without_entries():
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(_collect([]))))
+    assert archive.namelist() == []